@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Handler time of the /api/v1/health-chat emergency path.
+
+Calls the endpoint function directly (no HTTP) with emergency messages in
+every supported language against a throwaway database, and reports the
+per-call handler time: emergency triage, picking the pre-translated bundle,
+queueing the audit log row and rendering the pre-serialized body.
+
+Run from the backend directory:
+    python -m benchmarks.emergency_response --iterations 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from fastapi import BackgroundTasks
+
+import main as afiyalink
+from main import AfiyaLinkChatBot, HealthChatRequest, config
+from services.response_bundles import SUPPORTED_LANGUAGES
+
+MESSAGES = [
+    "I have crushing chest pain",
+    "my father is unconscious",
+    "she is having a seizure",
+    "I think it's an allergic reaction, my throat is closing",
+]
+
+
+def _percentiles(samples: List[float]) -> Dict:
+    samples = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return samples[min(len(samples) - 1, int(p * len(samples)))] * 1e6
+
+    return {'p50_us': percentile(0.50), 'p99_us': percentile(0.99), 'max_us': samples[-1] * 1e6}
+
+
+async def _run(iterations: int) -> Dict[str, Dict]:
+    results = {}
+    for language in SUPPORTED_LANGUAGES:
+        requests = [
+            HealthChatRequest(message=message, user_id="bench", language=language)
+            for message in MESSAGES
+        ]
+        handler: List[float] = []
+        for i in range(iterations):
+            request = requests[i % len(requests)]
+            started = time.perf_counter()
+            response = await afiyalink.health_chat(request, BackgroundTasks())
+            handler.append(time.perf_counter() - started)
+
+            body = json.loads(response.body)
+            if not body['emergency_alert'] or body['response'] != afiyalink.response_bundles.bundle('emergency', language).text:
+                raise AssertionError(f"Unexpected emergency response for {language}: {body}")
+
+        results[language] = _percentiles(handler)
+
+        # Let the write-behind log writer catch up between languages
+        await afiyalink.chatbot.database.flush_logs()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=5000, help="calls per language")
+    parser.add_argument('--budget-ms', type=float, default=1.0, help="p99 handler time to pass")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+
+        async def run():
+            afiyalink.chatbot = AfiyaLinkChatBot()
+            try:
+                return await _run(args.iterations)
+            finally:
+                await afiyalink.chatbot.database.flush_logs()
+                await afiyalink.chatbot.database.close()
+                await afiyalink.chatbot.ai_manager.close()
+
+        results = asyncio.run(run())
+
+    print(f"{'language':<10}{'p50 us':>10}{'p99 us':>10}{'max us':>10}")
+    for language, result in results.items():
+        print(f"{language:<10}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}{result['max_us']:>10.1f}")
+
+    worst = max(result['p99_us'] for result in results.values()) / 1000
+    verdict = "PASS" if worst < args.budget_ms else "FAIL"
+    print(f"{verdict}: worst p99 handler time {worst:.3f} ms (budget {args.budget_ms} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Event-loop stall benchmark for the chat pipeline's database access.
+
+Simulates concurrent chat turns (one symptom lookup + one interaction log
+write each) against a throwaway database whose disk access is artificially
+slow, while a ticker coroutine measures how late the event loop wakes it up.
+
+Run from the backend directory:
+    python -m benchmarks.event_loop_stall --turns 200 --concurrency 50 --disk-delay 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from main import MedicalDatabase
+from services.async_db import AsyncMedicalDatabase
+
+
+class SlowDiskDatabase(MedicalDatabase):
+    """MedicalDatabase whose reads and write transactions block for a fixed delay"""
+
+    def __init__(self, db_path: str, delay: float):
+        self.delay = delay
+        super().__init__(db_path)
+
+        fast_writer = self.pool.writer
+
+        @contextmanager
+        def slow_writer():
+            with fast_writer() as conn:
+                yield conn
+                time.sleep(self.delay)  # slow fsync on commit
+
+        self.pool.writer = slow_writer
+
+    def search_symptom(self, symptom: str):
+        time.sleep(self.delay)
+        return super().search_symptom(symptom)
+
+
+class BlockingFacade:
+    """Awaitable shim that calls the database directly (the pre-async behaviour)"""
+
+    def __init__(self, database: MedicalDatabase):
+        self.database = database
+
+    async def search_symptom(self, symptom: str):
+        return self.database.search_symptom(symptom)
+
+    async def log_interaction(self, *args):
+        self.database.log_interaction(*args)
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float, lags: List[float]):
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run(facade, turns: int, concurrency: int, interval: float) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    turn_latencies: List[float] = []
+
+    async def chat_turn(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await facade.search_symptom('headache')
+            await facade.log_interaction(f"bench_{i}", "I have a headache", "ok", "low", False)
+            turn_latencies.append(time.perf_counter() - started)
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_loop_lag(stop, interval, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(chat_turn(i) for i in range(turns)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+
+    lags.sort()
+    turn_latencies.sort()
+    return {
+        'elapsed_s': elapsed,
+        'loop_lag_ms_p50': lags[len(lags) // 2] * 1000 if lags else 0.0,
+        'loop_lag_ms_p99': lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+        'loop_lag_ms_max': lags[-1] * 1000 if lags else 0.0,
+        'turn_ms_mean': statistics.mean(turn_latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--disk-delay', type=float, default=0.02, help="seconds each read or commit blocks")
+    parser.add_argument('--tick', type=float, default=0.001, help="ticker interval in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = SlowDiskDatabase(os.path.join(tmp, 'bench.db'), args.disk_delay)
+
+        blocking = asyncio.run(_run(BlockingFacade(database), args.turns, args.concurrency, args.tick))
+
+        async def run_async():
+            facade = AsyncMedicalDatabase(database)
+            try:
+                return await _run(facade, args.turns, args.concurrency, args.tick)
+            finally:
+                await facade.close()
+
+        non_blocking = asyncio.run(run_async())
+        database.close()
+
+    print(f"{'mode':<12}{'elapsed s':>12}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}{'turn ms':>10}")
+    for name, result in (('blocking', blocking), ('async', non_blocking)):
+        print(f"{name:<12}{result['elapsed_s']:>12.3f}{result['loop_lag_ms_p50']:>12.2f}"
+              f"{result['loop_lag_ms_p99']:>12.2f}{result['loop_lag_ms_max']:>12.2f}{result['turn_ms_mean']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Offline load testing: fake upstream providers, a load generator and
+microbenchmarks, all reporting machine-readable JSON.
+
+    python -m benchmarks.loadtest.load      end-to-end load on /api/v1/health-chat and /translate
+    python -m benchmarks.loadtest.micro     per-component microbenchmarks
+    python -m benchmarks.loadtest.compare   diff two reports (e.g. from two commits)
+"""
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark reports, e.g. from the parent commit and this one.
+
+Every numeric result present in both reports is listed with its relative
+change. Latencies (`*_ms`, `*_us`) are better when lower; throughputs
+(`*_rps`, `ops_per_s`) when higher. A change in the worse direction beyond
+--threshold percent is flagged as a regression; with --fail-on-regression
+the exit status is 1 if there is any.
+
+Run from the backend directory:
+    python -m benchmarks.loadtest.compare base.json head.json --threshold 10
+"""
+
+import argparse
+import sys
+from typing import Dict, Iterator, Optional, Tuple
+
+from benchmarks.loadtest import report
+
+LOWER_IS_BETTER = ('_ms', '_us')
+HIGHER_IS_BETTER = ('_rps', 'ops_per_s')
+
+
+def _flatten(value, prefix: str = '') -> Iterator[Tuple[str, float]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _flatten(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, float(value)
+
+
+def _direction(key: str) -> Optional[int]:
+    """-1 if lower is better, 1 if higher is better, None if neither"""
+    if key.endswith(LOWER_IS_BETTER):
+        return -1
+    if key.endswith(HIGHER_IS_BETTER):
+        return 1
+    return None
+
+
+def compare(base: Dict, head: Dict, threshold: float) -> Dict[str, Dict]:
+    """Change of each comparable metric; `regression` is set beyond `threshold` percent"""
+    base_values = dict(_flatten(base['results']))
+    changes = {}
+    for key, value in _flatten(head['results']):
+        direction = _direction(key)
+        if direction is None or key not in base_values:
+            continue
+        before = base_values[key]
+        change = (value - before) / before * 100 if before else 0.0
+        changes[key] = {
+            'base': before,
+            'head': value,
+            'change_pct': change,
+            'regression': change * direction < -threshold,
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=10.0, help="percent change counted as a regression")
+    parser.add_argument('--match', default='', help="only metrics whose name contains this")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--output', help="write the comparison as JSON here ('-' for stdout)")
+    args = parser.parse_args()
+
+    base, head = report.load(args.base), report.load(args.head)
+    if base['benchmark'] != head['benchmark']:
+        parser.error(f"reports are from different benchmarks: {base['benchmark']} vs {head['benchmark']}")
+
+    changes = {key: change for key, change in compare(base, head, args.threshold).items() if args.match in key}
+    if args.output != '-':
+        print(f"base {base['environment']['commit'] or '?'}  head {head['environment']['commit'] or '?'}")
+        if base['parameters'] != head['parameters']:
+            print("warning: the reports were produced with different parameters")
+        print(f"{'metric':<64}{'base':>12}{'head':>12}{'change':>10}")
+        for key, change in changes.items():
+            flag = '  REGRESSION' if change['regression'] else ''
+            print(f"{key:<64}{change['base']:>12.2f}{change['head']:>12.2f}{change['change_pct']:>+9.1f}%{flag}")
+
+    regressions = [key for key, change in changes.items() if change['regression']]
+    report.write({
+        'schema': report.SCHEMA_VERSION,
+        'benchmark': f"{head['benchmark']}.compare",
+        'base': base['environment'],
+        'head': head['environment'],
+        'threshold_pct': args.threshold,
+        'changes': changes,
+        'regressions': regressions,
+    }, args.output)
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+In-process fakes of every upstream API the service calls.
+
+FakeUpstreams is one threaded HTTP server on localhost that speaks the wire
+format of each provider under its own path prefix:
+
+    /gemini/v1beta/models/<model>:generateContent    Gemini REST
+    /openai/v1/chat/completions                      OpenAI
+    /anthropic/v1/messages                           Anthropic
+    /openrouter/v1/chat/completions                  OpenRouter (refinement, incl. batch prompts)
+    /mymemory/get                                    MyMemory (the /translate endpoint)
+    /googletrans/translate                           stand-in for googletrans (chat replies)
+
+Every upstream answers after a delay drawn from its LatencyProfile and
+fails with a 503 at its failure rate. install() points a built chatbot and
+the translation service at the fakes: the OpenAI and OpenRouter calls go
+through the real openai SDK, while Gemini, Anthropic and googletrans get
+small clients shaped like their SDKs (those SDKs are optional and cannot be
+pointed at a plain HTTP endpoint).
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from services.lazy_loader import LazyGroup, LazyResource
+
+
+@dataclass
+class LatencyProfile:
+    median: float              # seconds
+    sigma: float = 0.35        # log-normal spread
+    tail_rate: float = 0.0     # chance of a slow response
+    tail_latency: float = 0.0  # seconds added to a slow response
+    failure_rate: float = 0.0
+
+    def sample(self, rng: random.Random) -> Tuple[float, bool]:
+        """(delay, failed) for one call"""
+        delay = rng.lognormvariate(0.0, self.sigma) * self.median
+        if rng.random() < self.tail_rate:
+            delay += self.tail_latency
+        return delay, rng.random() < self.failure_rate
+
+    def updated(self, spec: str) -> "LatencyProfile":
+        """Copy with fields overridden from "median=0.5,failure_rate=0.1" """
+        known = {field.name for field in fields(self)}
+        values = dict(self.__dict__)
+        for item in filter(None, spec.split(',')):
+            key, _, value = item.partition('=')
+            if key.strip() not in known:
+                raise ValueError(f"unknown latency profile field: {key!r}")
+            values[key.strip()] = float(value)
+        return LatencyProfile(**values)
+
+
+DEFAULT_PROFILES = {
+    'gemini': LatencyProfile(median=0.8, tail_rate=0.05, tail_latency=4.0, failure_rate=0.02),
+    'openai': LatencyProfile(median=1.0, tail_rate=0.02, tail_latency=3.0, failure_rate=0.01),
+    'anthropic': LatencyProfile(median=1.2, tail_rate=0.01, tail_latency=3.0, failure_rate=0.01),
+    'openrouter': LatencyProfile(median=0.6, tail_rate=0.02, tail_latency=2.0, failure_rate=0.01),
+    'mymemory': LatencyProfile(median=0.25, sigma=0.5, failure_rate=0.01),
+    'googletrans': LatencyProfile(median=0.15, sigma=0.5, failure_rate=0.01),
+}
+
+# Safe, disclaimed answer so it passes the response safety check
+AI_REPLY = ("Rest, drink plenty of fluids and keep track of how your symptoms change. "
+            "Please consult a doctor or healthcare professional if they get worse.")
+
+
+def _ai_reply(prompt: str) -> str:
+    """AI_REPLY made specific to the prompt, so translations of it are not all memory hits"""
+    return f"{AI_REPLY} (Reference {zlib.crc32(prompt.encode('utf-8')) % 100000:05d}.)"
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _refinement(prompt: str) -> str:
+    batch = re.search(r"Input:\s*(\[.*\])\s*$", prompt, re.DOTALL)
+    if batch:
+        items = json.loads(batch.group(1))
+        return json.dumps({"results": [{"id": item["id"], "text": f"Refined: {item['text']}"} for item in items]})
+    original = re.search(r'Original: "(.*)"', prompt, re.DOTALL)
+    return f"Refined: {original.group(1) if original else prompt}"
+
+
+def _chat_completion(body: Dict, content: str) -> Dict:
+    prompt = body['messages'][-1]['content']
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model") or "fake",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(content),
+                  "total_tokens": _tokens(prompt) + _tokens(content)},
+    }
+
+
+def _gemini(body: Dict) -> Dict:
+    prompt = body['contents'][-1]['parts'][0]['text']
+    reply = _ai_reply(prompt)
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": reply}]}, "finishReason": "STOP"}],
+        "usageMetadata": {"promptTokenCount": _tokens(prompt), "candidatesTokenCount": _tokens(reply)},
+    }
+
+
+def _anthropic(body: Dict) -> Dict:
+    prompt = body['messages'][-1]['content']
+    reply = _ai_reply(prompt)
+    return {
+        "id": "msg_fake",
+        "type": "message",
+        "role": "assistant",
+        "content": [{"type": "text", "text": reply}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": _tokens(prompt), "output_tokens": _tokens(reply)},
+    }
+
+
+def _mymemory(query: Dict) -> Dict:
+    target = query['langpair'][0].split('|')[-1]
+    return {"responseData": {"translatedText": f"[{target}] {query['q'][0]}", "match": 1},
+            "responseStatus": 200, "matches": []}
+
+
+def _googletrans(body: Dict) -> Dict:
+    return {"text": f"[{body['dest']}] {body['text']}", "src": body['src'], "dest": body['dest']}
+
+
+class FakeUpstreams:
+    """Threaded localhost server impersonating every upstream API"""
+
+    def __init__(self, profiles: Optional[Dict[str, LatencyProfile]] = None, scale: float = 1.0, seed: int = 7):
+        self.profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        self.scale = scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {name: {'calls': 0, 'failures': 0, 'delay_s': 0.0} for name in self.profiles}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def url(self, upstream: str) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/{upstream}"
+
+    def start(self) -> "FakeUpstreams":
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='fake-upstreams', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeUpstreams":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items() if stats['calls']}
+
+    def reset_stats(self):
+        with self._lock:
+            for stats in self._stats.values():
+                stats.update(calls=0, failures=0, delay_s=0.0)
+
+    def _call(self, upstream: str) -> Tuple[float, bool]:
+        with self._lock:
+            delay, failed = self.profiles[upstream].sample(self._rng)
+            delay *= self.scale
+            stats = self._stats[upstream]
+            stats['calls'] += 1
+            stats['failures'] += failed
+            stats['delay_s'] += delay
+        return delay, failed
+
+    def _handler(self):
+        upstreams = self
+
+        class FakeUpstreamHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._serve()
+
+            def do_POST(self):
+                self._serve()
+
+            def _serve(self):
+                url = urlsplit(self.path)
+                upstream, _, route = url.path.lstrip('/').partition('/')
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+
+                if upstream not in upstreams.profiles:
+                    return self._reply(404, {"error": {"message": f"no fake upstream {upstream!r}"}})
+
+                delay, failed = upstreams._call(upstream)
+                time.sleep(delay)
+                if failed:
+                    return self._reply(503, {"error": {"message": f"{upstream}: fake upstream overloaded",
+                                                       "type": "overloaded_error"}})
+
+                if upstream in ('openai', 'openrouter'):
+                    prompt = body['messages'][-1]['content']
+                    payload = _chat_completion(body, _ai_reply(prompt) if upstream == 'openai' else _refinement(prompt))
+                elif upstream == 'gemini':
+                    payload = _gemini(body)
+                elif upstream == 'anthropic':
+                    payload = _anthropic(body)
+                elif upstream == 'mymemory':
+                    payload = _mymemory(parse_qs(url.query))
+                else:
+                    payload = _googletrans(body)
+                self._reply(200, payload)
+
+            def _reply(self, status: int, payload: Dict):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (timeout, or a hedge that lost the race)
+
+        return FakeUpstreamHandler
+
+
+# ---- SDK-shaped clients for the providers whose SDKs cannot target the fakes ----
+
+class FakeGeminiModel:
+    """The slice of google.generativeai.GenerativeModel the chatbot uses"""
+
+    def __init__(self, http: httpx.AsyncClient, base_url: str, model: str = 'gemini-pro'):
+        self.http = http
+        self.url = f"{base_url}/v1beta/models/{model}:generateContent"
+
+    async def generate_content_async(self, prompt: str, request_options: Optional[Dict] = None):
+        timeout = (request_options or {}).get('timeout')
+        response = await self.http.post(self.url, json={"contents": [{"role": "user", "parts": [{"text": prompt}]}]},
+                                        timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        usage = data['usageMetadata']
+        return SimpleNamespace(
+            text=data['candidates'][0]['content']['parts'][0]['text'],
+            usage_metadata=SimpleNamespace(prompt_token_count=usage['promptTokenCount'],
+                                           candidates_token_count=usage['candidatesTokenCount']),
+        )
+
+
+class FakeAnthropicClient:
+    """The slice of anthropic.AsyncAnthropic the chatbot uses"""
+
+    def __init__(self, http: httpx.AsyncClient, base_url: str):
+        self.http = http
+        self.url = f"{base_url}/v1/messages"
+        self.messages = self
+
+    async def create(self, model: str, max_tokens: int, messages, timeout: Optional[float] = None):
+        response = await self.http.post(self.url, json={"model": model, "max_tokens": max_tokens, "messages": messages},
+                                        timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=block['text']) for block in data['content']],
+            usage=SimpleNamespace(input_tokens=data['usage']['input_tokens'],
+                                  output_tokens=data['usage']['output_tokens']),
+        )
+
+
+class FakeGoogleTranslator:
+    """Blocking googletrans.Translator stand-in (called from a worker thread)"""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.http = httpx.Client(timeout=timeout)
+        self.url = f"{base_url}/translate"
+
+    def translate(self, text: str, src: str = 'auto', dest: str = 'en'):
+        response = self.http.post(self.url, json={"text": text, "src": src, "dest": dest})
+        response.raise_for_status()
+        return SimpleNamespace(**response.json())
+
+
+def install(upstreams: FakeUpstreams, chatbot, main_module, translation_service,
+            providers: Tuple[str, ...] = ('gemini', 'openai', 'claude')) -> httpx.AsyncClient:
+    """Route the chatbot's AI models, translator and the translation service to the fakes.
+
+    Returns the HTTP client shared by the fake SDK clients; close it when done.
+    """
+    from openai import AsyncOpenAI
+
+    manager = chatbot.ai_manager
+    http = httpx.AsyncClient(limits=httpx.Limits(
+        max_connections=main_module.config.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=main_module.config.AI_HTTP_MAX_KEEPALIVE
+    ))
+    factories = {
+        'gemini': lambda: FakeGeminiModel(http, upstreams.url('gemini')),
+        'openai': lambda: AsyncOpenAI(api_key='fake', base_url=f"{upstreams.url('openai')}/v1",
+                                      http_client=http, max_retries=0),
+        'claude': lambda: FakeAnthropicClient(http, upstreams.url('anthropic')),
+    }
+    manager.models = LazyGroup(LazyResource(name, factories[name]) for name in providers)
+
+    main_module.translator = LazyResource('googletrans', lambda: FakeGoogleTranslator(upstreams.url('googletrans')))
+
+    translation_service.text_refining_model = 'fake/refiner'
+    translation_service.client = LazyResource('openrouter_client', lambda: AsyncOpenAI(
+        api_key='fake', base_url=f"{upstreams.url('openrouter')}/v1",
+        timeout=translation_service.refine_timeout, max_retries=0
+    ))
+    translation_service.MYMEMORY_URL = f"{upstreams.url('mymemory')}/get"
+    return http
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Load test of /api/v1/health-chat and /translate against fake upstreams.
+
+The app runs in this process behind an ASGI transport (no sockets between
+the load generator and the app) with a throwaway database; every AI
+provider, the refinement model and both translators are served by
+FakeUpstreams with the configured latency and failure profiles, so a run
+costs nothing. Requests follow a message mix (see workload.MIXES).
+
+By default the generator is closed-loop: --concurrency clients each send
+their next request as soon as the previous one is answered. With --rate it
+is open-loop instead: requests arrive as a Poisson process and latency is
+measured from the scheduled arrival, so queueing shows up in the tail.
+
+Run from the backend directory:
+    python -m benchmarks.loadtest.load --requests 2000 --concurrency 50 --output load.json
+    python -m benchmarks.loadtest.load --duration 60 --rate 40 --mix emergency_heavy \\
+        --profile openai=median=2.0,failure_rate=0.2 --scale 0.1
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.loadtest import report
+from benchmarks.loadtest.fake_upstreams import DEFAULT_PROFILES, FakeUpstreams, LatencyProfile, install
+from benchmarks.loadtest.workload import MIXES, Request, Workload
+
+
+class Recorder:
+    """Latencies and outcomes per request category"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, category: str, latency: float, status: str):
+        self.latencies[category].append(latency)
+        self.statuses[category][status] += 1
+
+    def results(self, elapsed: float) -> Dict:
+        categories = {}
+        for category, latencies in sorted(self.latencies.items()):
+            statuses = self.statuses[category]
+            categories[category] = {
+                **report.summarize(latencies),
+                'throughput_rps': len(latencies) / elapsed,
+                'errors': sum(count for status, count in statuses.items() if status != '200'),
+                'status': dict(statuses),
+            }
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            'elapsed_s': elapsed,
+            'throughput_rps': len(every) / elapsed,
+            'errors': sum(category['errors'] for category in categories.values()),
+            'overall': report.summarize(every),
+            'categories': categories,
+        }
+
+
+async def _send(client: httpx.AsyncClient, request: Request) -> str:
+    try:
+        response = await client.post(request.endpoint, json=request.payload)
+    except Exception as e:
+        return type(e).__name__
+    return str(response.status_code)
+
+
+async def _closed_loop(client, workload: Workload, recorder: Recorder, concurrency: int,
+                       requests: Optional[int], deadline: float):
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while time.perf_counter() < deadline and (remaining is None or remaining > 0):
+            if remaining is not None:
+                remaining -= 1
+            request = workload.next()
+            started = time.perf_counter()
+            status = await _send(client, request)
+            recorder.record(request.category, time.perf_counter() - started, status)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _open_loop(client, workload: Workload, recorder: Recorder, rate: float, concurrency: int,
+                     requests: Optional[int], deadline: float, seed: int):
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def one(request: Request, scheduled: float):
+        async with slots:
+            status = await _send(client, request)
+        recorder.record(request.category, time.perf_counter() - scheduled, status)
+
+    sent = 0
+    scheduled = time.perf_counter()
+    while scheduled < deadline and (requests is None or sent < requests):
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.ensure_future(one(workload.next(), scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        sent += 1
+        scheduled += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+
+def _app_stats(main) -> Dict:
+    chatbot = main.chatbot
+    stats = {
+        'routing': chatbot.ai_manager.routing_stats(),
+        'coalescing': chatbot.ai_manager.coalescing_stats(),
+        'translation_memory': chatbot.translation_memory.stats(),
+        'interaction_log': chatbot.database.get_log_writer_stats(),
+        'db_pool': chatbot.database.get_pool_stats(),
+        'ai_cost': chatbot.ai_manager.daily_cost,
+    }
+    if chatbot.response_cache is not None:
+        stats['response_cache'] = chatbot.response_cache.snapshot()
+    if main.metrics is not None:
+        stats['stages'] = main.metrics.summary()
+    return stats
+
+
+async def _run(args, profiles: Dict[str, LatencyProfile], db_path: str) -> Dict:
+    import main
+    from services import translation_service
+
+    main.config.DATABASE_PATH = db_path
+    main.config.DAILY_AI_COST_LIMIT = float('inf')
+    if args.no_caches:
+        main.config.RESPONSE_CACHE_ENABLED = False
+
+    with FakeUpstreams(profiles, scale=args.scale, seed=args.seed) as upstreams:
+        main.chatbot = await asyncio.to_thread(main.AfiyaLinkChatBot)
+        upstream_http = install(upstreams, main.chatbot, main, translation_service, tuple(args.providers.split(',')))
+        transport = httpx.ASGITransport(app=main.app)
+        client = httpx.AsyncClient(transport=transport, base_url='http://loadtest', timeout=None)
+        workload = Workload(MIXES[args.mix], translate_share=args.translate_share, users=args.users, seed=args.seed)
+        try:
+            if args.warmup:
+                await _closed_loop(client, workload, Recorder(), min(args.concurrency, args.warmup),
+                                   args.warmup, float('inf'))
+                upstreams.reset_stats()
+                if main.metrics is not None:
+                    main.metrics.reset()
+
+            recorder = Recorder()
+            started = time.perf_counter()
+            deadline = started + args.duration if args.duration else float('inf')
+            if args.rate:
+                await _open_loop(client, workload, recorder, args.rate, args.concurrency,
+                                 args.requests, deadline, args.seed)
+            else:
+                await _closed_loop(client, workload, recorder, args.concurrency, args.requests, deadline)
+            results = recorder.results(time.perf_counter() - started)
+            await main.chatbot.wait_background_tasks()
+            results['upstreams'] = upstreams.stats()
+            results['app'] = _app_stats(main)
+        finally:
+            await client.aclose()
+            await main.chatbot.database.flush_logs()
+            await main.chatbot.database.close()
+            await main.chatbot.ai_manager.close()
+            await upstream_http.aclose()
+            await translation_service.close()
+    return results
+
+
+def _print(results: Dict):
+    print(f"{'category':<14}{'requests':>10}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    rows = {**results['categories'], 'all': {**results['overall'], 'throughput_rps': results['throughput_rps'],
+                                            'errors': results['errors']}}
+    for category, stats in rows.items():
+        print(f"{category:<14}{stats['count']:>10}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.1f}"
+              f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['errors']:>8}")
+    print()
+    print(f"{'upstream':<14}{'calls':>10}{'failed':>8}{'mean delay ms':>15}")
+    for upstream, stats in results['upstreams'].items():
+        print(f"{upstream:<14}{stats['calls']:>10}{stats['failures']:>8}"
+              f"{stats['delay_s'] / stats['calls'] * 1000:>15.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, help="stop after this many requests")
+    parser.add_argument('--duration', type=float, help="stop after this many seconds")
+    parser.add_argument('--concurrency', type=int, default=50, help="clients (closed loop) or max in flight (open loop)")
+    parser.add_argument('--rate', type=float, help="open loop: mean arrivals per second")
+    parser.add_argument('--mix', choices=sorted(MIXES), default='realistic')
+    parser.add_argument('--translate-share', type=float, default=0.1, help="fraction of requests sent to /translate")
+    parser.add_argument('--users', type=int, default=200, help="distinct user ids (conversation sessions)")
+    parser.add_argument('--providers', default='gemini,openai,claude', help="AI models to register")
+    parser.add_argument('--profile', action='append', default=[], metavar='UPSTREAM=FIELD=VALUE,...',
+                        help=f"override a latency profile; upstreams: {', '.join(DEFAULT_PROFILES)}")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiplier applied to every fake latency")
+    parser.add_argument('--warmup', type=int, default=50, help="requests sent before measuring")
+    parser.add_argument('--no-caches', action='store_true', help="disable the response cache")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="write the JSON report here ('-' for stdout)")
+    args = parser.parse_args()
+    if args.requests is None and args.duration is None:
+        args.requests = 1000
+
+    profiles = {}
+    for override in args.profile:
+        upstream, _, spec = override.partition('=')
+        if upstream not in DEFAULT_PROFILES:
+            parser.error(f"unknown upstream {upstream!r}")
+        profiles[upstream] = profiles.get(upstream, DEFAULT_PROFILES[upstream]).updated(spec)
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(_run(args, profiles, os.path.join(tmp, 'loadtest.db')))
+
+    parameters = {key: value for key, value in vars(args).items() if key != 'output'}
+    parameters['profiles'] = {name: profile.__dict__ for name, profile in {**DEFAULT_PROFILES, **profiles}.items()}
+    if args.output != '-':
+        _print(results)
+    report.write(report.build('loadtest.load', parameters, results), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks of the per-message hot paths.
+
+Times SafetyValidator (input triage and the response re-check), the
+single-pass MessageAnalyzer over the workload message corpus, and MedicalDatabase lookups and interaction log writes against a
+throwaway database. Each benchmark runs --rounds rounds of --batch calls;
+per-call time is reported as the distribution over rounds, in microseconds.
+
+Run from the backend directory:
+    python -m benchmarks.loadtest.micro --rounds 200 --output micro.json
+    python -m benchmarks.loadtest.micro --only safety
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.loadtest import report
+from benchmarks.loadtest.workload import corpus
+
+REPLIES = [
+    "Rest, drink fluids and consult a doctor if the fever lasts more than three days.",
+    "Headaches are often caused by dehydration or stress. Please seek medical advice if it is severe.",
+    "This is definitely nothing to worry about, you don't need to see a doctor.",
+    "Paracetamol can be taken every 4 to 6 hours; ask a healthcare professional about the right dose.",
+]
+
+
+def _measure(call: Callable[[], object], rounds: int, batch: int) -> Dict:
+    for _ in range(batch):
+        call()  # warm caches and lazily built state
+    per_call: List[float] = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(batch):
+            call()
+        per_call.append((time.perf_counter() - started) / batch)
+
+    summary = report.summarize(per_call)
+    return {
+        'calls': rounds * batch,
+        'ops_per_s': rounds / sum(per_call),
+        # summarize() reports ms; per-call times read better in microseconds
+        **{key.replace('_ms', '_us'): value * 1000 for key, value in summary.items() if key.endswith('_ms')},
+    }
+
+
+def _cycle(items: List) -> Callable[[], object]:
+    return itertools.cycle(items).__next__
+
+
+def _benchmarks(chatbot) -> Dict[str, Dict[str, Callable[[], object]]]:
+    messages = [message for _, message in corpus()]
+    next_message = _cycle(messages)
+    next_reply = _cycle(REPLIES)
+    next_symptom = _cycle(list(chatbot.safety_validator.lexicon.symptoms))
+    next_condition = _cycle(['chest_pain', 'difficulty_breathing', 'severe_bleeding', 'unknown_condition'])
+    database = chatbot.database.database
+    validator = chatbot.safety_validator
+    row = ('micro_user', 'I have a headache', 'General information ...', 'low', False)
+
+    return {
+        'safety': {
+            'validate_input': lambda: validator.validate_input(next_message()),
+            'validate_inputs_x16': lambda: validator.validate_inputs(messages[:16]),
+            'validate_response': lambda: validator.validate_response(next_reply()),
+        },
+        'nlp': {
+            'analyze': lambda: validator.analyzer.analyze(next_message()),
+            'analyze_many_x16': lambda: validator.analyzer.analyze_many(messages[:16]),
+        },
+        'database': {
+            'search_symptom': lambda: database.search_symptom(next_symptom()),
+            'search_symptom_miss': lambda: database.search_symptom('not a known symptom'),
+            'get_emergency_protocol': lambda: database.get_emergency_protocol(next_condition()),
+            'log_interaction_enqueue': lambda: database.log_interaction(*row),
+            'log_interactions_x50': lambda: database.log_interactions([row] * 50),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=50, help="calls timed together in one round")
+    parser.add_argument('--only', action='append', choices=['safety', 'nlp', 'database'],
+                        help="run only these groups (repeatable)")
+    parser.add_argument('--output', help="write the JSON report here ('-' for stdout)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    import main as afiyalink
+
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        afiyalink.config.DATABASE_PATH = os.path.join(tmp, 'micro.db')
+        # Time the methods themselves, not the metrics wrappers around them
+        afiyalink.metrics = None
+        chatbot = afiyalink.AfiyaLinkChatBot()
+        try:
+            for group, benchmarks in _benchmarks(chatbot).items():
+                if args.only and group not in args.only:
+                    continue
+                for name, call in benchmarks.items():
+                    results[f"{group}.{name}"] = _measure(call, args.rounds, args.batch)
+        finally:
+            chatbot.database.database.close()
+
+    if args.output != '-':
+        print(f"{'benchmark':<40}{'ops/s':>12}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}")
+        for name, stats in results.items():
+            print(f"{name:<40}{stats['ops_per_s']:>12.0f}{stats['p50_us']:>10.1f}"
+                  f"{stats['p95_us']:>10.1f}{stats['p99_us']:>10.1f}")
+    parameters = {key: value for key, value in vars(args).items() if key != 'output'}
+    report.write(report.build('loadtest.micro', parameters, results), args.output)
+
+
+if __name__ == "__main__":
+    main()
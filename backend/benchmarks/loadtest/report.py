@@ -0,0 +1,92 @@
+"""
+Machine-readable benchmark reports.
+
+Every report is one JSON document with the same envelope, so reports from
+different commits can be diffed with benchmarks.loadtest.compare:
+
+    {"schema": 1, "benchmark": ..., "environment": {commit, python, ...},
+     "parameters": {...}, "results": {...}}
+
+Latencies are in milliseconds, rates per second.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+SCHEMA_VERSION = 1
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def summarize(samples: Sequence[float]) -> Dict:
+    """Count, mean and percentiles (ms) of latencies given in seconds"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        result = subprocess.run(['git', *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def environment() -> Dict:
+    """Where and on what code a report was produced"""
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def build(benchmark: str, parameters: Dict, results: Dict) -> Dict:
+    return {
+        'schema': SCHEMA_VERSION,
+        'benchmark': benchmark,
+        'environment': environment(),
+        'parameters': parameters,
+        'results': results,
+    }
+
+
+def write(report: Dict, path: Optional[str]):
+    """Write to `path`, or to stdout for "-"; nothing when no path is given"""
+    if not path:
+        return
+    text = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+    if path == '-':
+        sys.stdout.write(text + '\n')
+    else:
+        Path(path).write_text(text + '\n', encoding='utf-8')
+
+
+def load(path: str) -> Dict:
+    report = json.loads(Path(path).read_text(encoding='utf-8'))
+    if report.get('schema') != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported report schema {report.get('schema')!r}")
+    return report
@@ -0,0 +1,116 @@
+"""
+Request mixes for the load generator and the microbenchmarks.
+
+Messages are grouped by the path they exercise: emergencies (triage and the
+pre-translated bundle), symptoms (symptom extraction, database and AI
+answers), medication questions and general questions (intent routing,
+rule-based and AI answers). A mix gives each category's share of traffic.
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+MESSAGES: Dict[str, List[str]] = {
+    'emergency': [
+        "I have crushing chest pain and my left arm is numb",
+        "my father is unconscious and not responding",
+        "she is having a seizure right now",
+        "I think it's an allergic reaction, my throat is closing",
+        "I took an overdose of my sleeping pills",
+        "severe bleeding from a cut on my leg that won't stop",
+        "I want to kill myself",
+        "my son is choking on food",
+    ],
+    'symptom': [
+        "I have a headache since yesterday",
+        "fever and cough for three days",
+        "my stomach hurts after I eat",
+        "I feel dizzy when I stand up",
+        "sore throat and runny nose",
+        "I have back pain in the morning",
+        "my child has diarrhea and is very tired",
+        "I have a rash on my arm that itches",
+        "I have been feeling nauseous and have no appetite",
+        "my joints ache and I have a mild fever",
+    ],
+    'medication': [
+        "can I take ibuprofen with paracetamol?",
+        "what is the right dose of paracetamol for a child?",
+        "is it safe to take antibiotics with milk?",
+        "I missed a dose of my blood pressure medication, what should I do?",
+        "what are the side effects of metformin?",
+        "can I take medicine for a cold while fasting?",
+    ],
+    'general': [
+        "how can I sleep better?",
+        "what foods are good for diabetes?",
+        "how much water should I drink every day?",
+        "I need to book an appointment with a doctor",
+        "how do I stay healthy while fasting in Ramadan?",
+        "what vaccines does a newborn need?",
+        "tips to reduce stress at work",
+    ],
+}
+
+MIXES: Dict[str, Dict[str, float]] = {
+    # Roughly the production traffic shape
+    'realistic': {'emergency': 0.03, 'symptom': 0.50, 'medication': 0.17, 'general': 0.30},
+    'emergency_heavy': {'emergency': 0.50, 'symptom': 0.30, 'medication': 0.10, 'general': 0.10},
+    'symptom_only': {'symptom': 1.0},
+    'general_only': {'general': 1.0},
+}
+
+# Share of requests per language; non-English replies go through translation
+LANGUAGES: Dict[str, float] = {'en': 0.55, 'ar': 0.2, 'fr': 0.15, 'ur': 0.1}
+
+# /translate request texts
+TRANSLATE_TEXTS = [
+    "i have bad hedache since yesterday",
+    "my child got fever and dont eat",
+    "stomach hurting after eat food",
+    "i feel dizzy when i stand up fast",
+    "cough with yelow mucus for 3 days",
+    "my mother blood pressure is high today",
+]
+TRANSLATE_PAIRS = [('en', 'ar'), ('en', 'fr'), ('en', 'ur'), ('en', 'sw')]
+
+
+@dataclass(frozen=True)
+class Request:
+    category: str
+    endpoint: str
+    payload: Dict
+
+
+class Workload:
+    """Seeded stream of requests following a mix"""
+
+    def __init__(self, mix: Dict[str, float], translate_share: float = 0.0, users: int = 200, seed: int = 7):
+        unknown = set(mix) - set(MESSAGES)
+        if unknown:
+            raise ValueError(f"unknown message categories: {', '.join(sorted(unknown))}")
+        self.categories, self.weights = zip(*mix.items())
+        self.translate_share = translate_share
+        self.users = users
+        self.rng = random.Random(seed)
+
+    def next(self) -> Request:
+        rng = self.rng
+        if rng.random() < self.translate_share:
+            source, target = rng.choice(TRANSLATE_PAIRS)
+            return Request('translate', '/translate', {
+                'text': rng.choice(TRANSLATE_TEXTS), 'source_language': source, 'target_language': target,
+            })
+
+        category = rng.choices(self.categories, self.weights)[0]
+        return Request(category, '/api/v1/health-chat', {
+            'message': rng.choice(MESSAGES[category]),
+            'user_id': f"loadtest_{rng.randrange(self.users)}",
+            'language': rng.choices(list(LANGUAGES), list(LANGUAGES.values()))[0],
+        })
+
+
+def corpus() -> List[Tuple[str, str]]:
+    """Every (category, message), for the microbenchmarks"""
+    return [(category, message) for category, messages in MESSAGES.items() for message in messages]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Interaction log write throughput: one INSERT + COMMIT per turn versus the
+batched write-behind InteractionLogWriter.
+
+Run from the backend directory:
+    python -m benchmarks.log_writer_throughput --rows 20000 --producers 8
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from main import MedicalDatabase, config
+from services.interaction_log_writer import INSERT_INTERACTION_SQL
+
+ROW = ("bench_user", "I have a headache and feel tired", "General information ...", "low", False)
+
+
+def _per_row_commit(database: MedicalDatabase, rows: int, producers: int) -> float:
+    per_producer = rows // producers
+
+    def produce():
+        for _ in range(per_producer):
+            with database.pool.writer() as conn:
+                conn.execute(INSERT_INTERACTION_SQL, ROW)
+
+    return _timed(produce, producers)
+
+
+def _write_behind(database: MedicalDatabase, rows: int, producers: int) -> float:
+    per_producer = rows // producers
+
+    def produce():
+        for _ in range(per_producer):
+            database.log_interaction(*ROW)
+
+    started = time.perf_counter()
+    _timed(produce, producers)
+    database.flush_logs(timeout=60)
+    return time.perf_counter() - started
+
+
+def _timed(target, producers: int) -> float:
+    threads = [threading.Thread(target=target) for _ in range(producers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--producers', type=int, default=8)
+    parser.add_argument('--policy', default='block', help="log buffer overflow policy")
+    args = parser.parse_args()
+
+    config.LOG_OVERFLOW_POLICY = args.policy
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = MedicalDatabase(os.path.join(tmp, 'bench.db'))
+        try:
+            per_row = _per_row_commit(database, args.rows, args.producers)
+            batched = _write_behind(database, args.rows, args.producers)
+            stats = database.get_log_writer_stats()
+        finally:
+            database.close()
+
+    print(f"{'mode':<16}{'seconds':>10}{'rows/s':>12}")
+    print(f"{'per-row commit':<16}{per_row:>10.3f}{args.rows / per_row:>12.0f}")
+    print(f"{'write-behind':<16}{batched:>10.3f}{args.rows / batched:>12.0f}")
+    print(f"batches={stats['batches']} dropped={stats['dropped']} failed={stats['failed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tail latency of AI provider routing against in-process fake providers.
+
+Each fake provider answers after a log-normal delay, with a small chance of
+a slow tail response and of an outright error. The same request stream is
+sent through AIModelManager twice: once with strict sequential fallback in
+cost order (the previous behaviour) and once with latency-aware routing,
+hedging and circuit breakers.
+
+Run from the backend directory:
+    python -m benchmarks.provider_routing --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+from main import AIModelManager, config
+
+
+@dataclass
+class FakeProvider:
+    name: str
+    median: float              # seconds
+    sigma: float = 0.35        # log-normal spread
+    tail_rate: float = 0.0     # chance of a slow response
+    tail_latency: float = 0.0  # seconds added to a slow response
+    failure_rate: float = 0.0
+
+    async def generate(self, rng: random.Random, scale: float) -> str:
+        delay = rng.lognormvariate(0.0, self.sigma) * self.median
+        if rng.random() < self.tail_rate:
+            delay += self.tail_latency
+        await asyncio.sleep(delay * scale)
+        if rng.random() < self.failure_rate:
+            raise RuntimeError(f"{self.name}: upstream 503")
+        return f"{self.name} answer - please consult a doctor"
+
+
+PROVIDERS = {
+    'gemini': FakeProvider('gemini', median=0.8, tail_rate=0.08, tail_latency=6.0, failure_rate=0.02),
+    'openai': FakeProvider('openai', median=1.0, tail_rate=0.02, tail_latency=4.0, failure_rate=0.01),
+    'claude': FakeProvider('claude', median=1.2, tail_rate=0.01, tail_latency=3.0, failure_rate=0.01),
+}
+
+
+class FakeProviderManager(AIModelManager):
+    """AIModelManager whose provider calls go to FakeProvider instances"""
+
+    def __init__(self, providers: Dict[str, FakeProvider], scale: float, seed: int):
+        self.fake_providers = providers
+        self.scale = scale
+        self.rng = random.Random(seed)
+        super().__init__()
+
+    def setup_models(self):
+        self.models = dict(self.fake_providers)
+
+    async def _request(self, model_name: str, prompt: str, timeout: float):
+        async with self.call_slots:
+            return await self.models[model_name].generate(self.rng, self.scale), None
+
+
+def _configure(routed: bool, scale: float):
+    config.AI_HEDGING_ENABLED = routed
+    config.AI_HEDGE_DEFAULT_DELAY = 3.0 * scale
+    config.AI_HEDGE_MIN_DELAY = 0.25 * scale
+    # Sequential baseline: static order and no circuit breaking
+    config.AI_ROUTER_MIN_SAMPLES = 20 if routed else 10 ** 9
+    config.AI_BREAKER_FAILURE_THRESHOLD = 5 if routed else 10 ** 9
+    config.AI_BREAKER_COOLDOWN = 30.0 * scale
+    config.MAX_RESPONSE_TIME = 30.0 * scale
+    config.AI_PROVIDER_TIMEOUTS = {name: 10.0 * scale for name in PROVIDERS}
+    config.DAILY_AI_COST_LIMIT = float('inf')
+
+
+async def _run(manager: AIModelManager, requests: int, concurrency: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            response, _ = await manager.generate_response(f"benchmark prompt {i}", max_cost=1.0)
+            latencies.append(time.perf_counter() - started)
+            if response is None:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    routing = manager.routing_stats()
+    return {
+        'elapsed_s': elapsed,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1] * 1000,
+        'failures': failures,
+        'hedges_sent': routing['hedges_sent'],
+        'hedges_won': routing['hedges_won'],
+        'cost': manager.daily_cost,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--scale', type=float, default=0.05, help="multiplier applied to every fake latency")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    results = {}
+    for mode, routed in (('sequential', False), ('routed', True)):
+        _configure(routed, args.scale)
+        manager = FakeProviderManager(PROVIDERS, args.scale, args.seed)
+        results[mode] = asyncio.run(_run(manager, args.requests, args.concurrency))
+
+    # Latencies are reported at the simulated (unscaled) time
+    unscale = 1.0 / args.scale
+    print(f"{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+          f"{'failed':>8}{'hedges':>8}{'won':>6}{'cost':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<12}{result['p50_ms'] * unscale:>10.0f}{result['p95_ms'] * unscale:>10.0f}"
+              f"{result['p99_ms'] * unscale:>10.0f}{result['max_ms'] * unscale:>10.0f}{result['failures']:>8}"
+              f"{result['hedges_sent']:>8}{result['hedges_won']:>6}{result['cost']:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
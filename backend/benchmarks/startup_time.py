@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of the service, broken down by phase.
+
+Each trial is a fresh interpreter (so module imports are really cold) that
+times, in order: importing main, building the chatbot (database migrations
+and seed data, safety rules, AI model registry, caches) and the background
+warm-up of the optional components that are now loaded on first use (NLP
+models, provider SDKs and clients, translator). The server accepts traffic
+after the import, is ready after the chatbot is built, and is fully warm
+after the warm-up; before the components were made lazy, all of that
+happened before the first request was accepted.
+
+By default every trial starts from an empty database (first boot); with
+--reuse-db the database is created once and reused (a restart).
+
+Run from the backend directory:
+    python -m benchmarks.startup_time --trials 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = r'''
+import asyncio, json, logging, sys, time
+started = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import main
+imported = time.perf_counter()
+logging.disable(logging.CRITICAL)
+main.config.DATABASE_PATH = sys.argv[2]
+
+async def run():
+    built = time.perf_counter()
+    main.chatbot = await asyncio.to_thread(main.AfiyaLinkChatBot)
+    ready = time.perf_counter()
+    components = await main.warm_up(main.optional_components())
+    warm = time.perf_counter()
+    await main.chatbot.database.flush_logs()
+    await main.chatbot.database.close()
+    await main.chatbot.ai_manager.close()
+    await main.translation_service.close()
+    return {
+        'import_main': imported - started,
+        **{f"chatbot.{phase}": seconds for phase, seconds in main.chatbot.startup_phases.items()},
+        'warmup_wall': warm - ready,
+        **{f"component.{name}": stats['load_ms'] / 1000 for name, stats in components.items() if stats['available']},
+        'accepting': imported - started,
+        'ready': imported - started + ready - built,
+        'warm': imported - started + warm - built,
+    }
+
+print(json.dumps(asyncio.run(run())))
+'''
+
+
+def _trial(db_path: str, workdir: str) -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, str(BACKEND_DIR), db_path],
+        cwd=workdir, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--reuse-db', action='store_true', help="time restarts against an existing database")
+    args = parser.parse_args()
+
+    trials: List[Dict[str, float]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'startup.db')
+        if args.reuse_db:
+            _trial(db_path, tmp)
+        for trial in range(args.trials):
+            if not args.reuse_db:
+                db_path = os.path.join(tmp, f'startup_{trial}.db')
+            trials.append(_trial(db_path, tmp))
+
+    phases = list(dict.fromkeys(key for trial in trials for key in trial))
+    medians = {phase: statistics.median(trial.get(phase, 0.0) for trial in trials) for phase in phases}
+    milestones = ('accepting', 'ready', 'warm')
+
+    print(f"{'phase (median of %d)' % len(trials):<32}{'ms':>10}")
+    for phase, seconds in medians.items():
+        if phase in milestones:
+            continue
+        print(f"  {phase:<30}{seconds * 1000:>10.1f}")
+    print()
+    for milestone in milestones:
+        print(f"{milestone:<32}{medians[milestone] * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Symptom search benchmark: the legacy LIKE query versus FTS5 + BM25.
+
+Builds throwaway databases with N synthetic symptom rows (default 10k, 100k
+and 1M) and times a fixed mix of queries against both search paths.
+
+Run from the backend directory:
+    python -m benchmarks.symptom_search --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from main import MedicalDatabase
+from services import symptom_search
+
+LIKE_SQL = '''
+    SELECT * FROM symptoms
+    WHERE symptom LIKE ? OR description LIKE ?
+    ORDER BY reliability_score DESC
+    LIMIT 1
+'''
+
+BODY_PARTS = ['head', 'chest', 'back', 'stomach', 'throat', 'knee', 'eye', 'ear', 'skin', 'neck', 'joint', 'tooth']
+QUALITIES = ['ache', 'pain', 'swelling', 'itching', 'burning', 'numbness', 'stiffness', 'cramp', 'rash', 'bleeding']
+CAUSES = ['infection', 'strain', 'stress', 'allergy', 'injury', 'dehydration', 'inflammation', 'virus', 'fatigue']
+QUERIES = ['headache', 'chest pain', 'fever', 'stomach cramp', 'skin rash itching', 'knee swelling injury', 'zzz']
+
+
+def _synthetic_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(count):
+        part, quality = rng.choice(BODY_PARTS), rng.choice(QUALITIES)
+        causes = ', '.join(rng.sample(CAUSES, 3))
+        yield (
+            f'{part}_{quality}_{i}',
+            f'{quality.capitalize()} affecting the {part} area',
+            causes,
+            'rest, fluids, monitor symptoms',
+            'if symptoms persist or worsen',
+            f'severe {quality} with {rng.choice(CAUSES)}',
+            rng.choice(['low', 'medium', 'high']),
+            None,
+            round(rng.uniform(0.5, 1.0), 3),
+        )
+
+
+def _load(database: MedicalDatabase, count: int):
+    with database.pool.writer() as conn:
+        conn.executemany('''
+            INSERT INTO symptoms
+            (symptom, description, possible_causes, self_care_advice, when_to_see_doctor,
+             emergency_indicators, severity_level, cultural_considerations, reliability_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', _synthetic_rows(count))
+
+
+def _time_queries(run: Callable[[str], object], repeat: int) -> Dict:
+    samples: List[float] = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            run(query)
+            samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        'mean_ms': statistics.mean(samples) * 1000,
+        'p95_ms': samples[int(len(samples) * 0.95)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}{'load s':>10}{'LIKE mean ms':>14}{'LIKE p95 ms':>13}{'FTS mean ms':>13}{'FTS p95 ms':>12}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            database = MedicalDatabase(os.path.join(tmp, 'bench.db'))
+            try:
+                started = time.perf_counter()
+                _load(database, size)
+                load_time = time.perf_counter() - started
+
+                with database.pool.reader() as conn:
+                    like = _time_queries(
+                        lambda q: conn.execute(LIKE_SQL, (f'%{q}%', f'%{q}%')).fetchone(), args.repeat)
+                    fts = _time_queries(
+                        lambda q: symptom_search.search(conn, q, args.top_k), args.repeat)
+            finally:
+                database.close()
+
+        print(f"{size:>10}{load_time:>10.1f}{like['mean_ms']:>14.2f}{like['p95_ms']:>13.2f}"
+              f"{fts['mean_ms']:>13.2f}{fts['p95_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
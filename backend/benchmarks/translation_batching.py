@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Throughput of translation refinement with and without micro-batching.
+
+Starts a local stub of an OpenAI-compatible chat completions server whose
+latency is a fixed per-call overhead plus a small per-sentence cost, with a
+limited number of concurrent calls (like a provider rate limit). Batch
+prompts are answered with the structured JSON reply the batch template asks
+for. The same set of short texts is then refined through
+`translation_service.refine_medical_text` by concurrent client tasks, once
+with one completion per text and once through the batching queue.
+
+Run from the backend directory:
+    python -m benchmarks.translation_batching --requests 400 --concurrency 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+SAMPLE_TEXTS = [
+    "i have bad hedache since yesterday",
+    "my child got fever and dont eat",
+    "stomach hurting after eat food",
+    "i feel dizzy when i stand up fast",
+    "cough with yelow mucus for 3 days",
+    "my back pain is worst in morning",
+    "cant sleep good because itching skin",
+    "my mother blood pressure is high today",
+]
+
+
+def make_stub_handler(base_latency: float, per_item_latency: float, slots: threading.Semaphore, counters: Dict):
+    class StubCompletionsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            prompt = body['messages'][-1]['content']
+
+            batch = re.search(r"Input:\s*(\[.*\])\s*$", prompt, re.DOTALL)
+            if batch:
+                items = json.loads(batch.group(1))
+                content = json.dumps({"results": [{"id": item["id"], "text": f"Refined: {item['text']}"} for item in items]})
+            else:
+                original = re.search(r'Original: "(.*)"', prompt, re.DOTALL)
+                items = [None]
+                content = f"Refined: {original.group(1) if original else prompt}"
+
+            with slots:
+                time.sleep(base_latency + per_item_latency * len(items))
+            with counters['lock']:
+                counters['calls'] += 1
+
+            payload = json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                          "total_tokens": (len(prompt) + len(content)) // 4},
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return StubCompletionsHandler
+
+
+async def _run(translation_service, requests: int, concurrency: int, counters: Dict) -> Dict:
+    texts = [f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})" for i in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    wrong = 0
+    counters['calls'] = 0
+
+    async def one(text: str):
+        nonlocal wrong
+        async with semaphore:
+            started = time.perf_counter()
+            refined = await translation_service.refine_medical_text(text)
+            latencies.append(time.perf_counter() - started)
+            if refined != f"Refined: {text}":
+                wrong += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(text) for text in texts))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+        'throughput': requests / elapsed,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'upstream_calls': counters['calls'],
+        'mismatched': wrong,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=40)
+    parser.add_argument('--base-latency', type=float, default=0.15, help="seconds of overhead per upstream call")
+    parser.add_argument('--per-item-latency', type=float, default=0.01, help="seconds per sentence in a call")
+    parser.add_argument('--upstream-slots', type=int, default=8, help="concurrent calls the stub will serve")
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--max-wait-ms', type=float, default=20.0)
+    args = parser.parse_args()
+
+    counters = {'calls': 0, 'lock': threading.Lock()}
+    handler = make_stub_handler(args.base_latency, args.per_item_latency,
+                                threading.Semaphore(args.upstream_slots), counters)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # translation_service builds its client from the environment at import time
+    os.environ['OPENROUTER_BASE_URL'] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ['OPENROUTER_API_KEY'] = "stub"
+    os.environ['TEXT_REFINING_MODEL'] = "stub-model"
+    from services import translation_service
+
+    async def run_modes() -> Dict:
+        results = {}
+        # Upstream calls are capped by the stub's slots, not by the service
+        translation_service.refine_slots = asyncio.Semaphore(args.concurrency)
+        for mode, batched in (('per-request', False), ('batched', True)):
+            translation_service.refine_batching_enabled = batched
+            translation_service.refine_batch_max_size = args.batch_size
+            translation_service.refine_batch_max_wait = args.max_wait_ms / 1000
+            results[mode] = await _run(translation_service, args.requests, args.concurrency, counters)
+        await translation_service.close()
+        return results
+
+    try:
+        results = asyncio.run(run_modes())
+    finally:
+        server.shutdown()
+
+    print(f"{'mode':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'calls':>8}{'wrong':>8}")
+    for mode, result in results.items():
+        print(f"{mode:<14}{result['throughput']:>10.1f}{result['p50_ms']:>10.0f}{result['p95_ms']:>10.0f}"
+              f"{result['upstream_calls']:>8}{result['mismatched']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,30 +32,49 @@ No import issues, no folder structure problems - just works!
 
 import os
 import json
-import sqlite3
 import asyncio
 import logging
 import time
 import hashlib
-import re
 import traceback
 import threading
+import inspect
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Tuple, Any
+from typing import Dict, List, Optional, Union, Tuple, Any, AsyncIterator, Callable, Sequence
 from enum import Enum
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from contextlib import asynccontextmanager
 from functools import wraps
 
 # FastAPI and web components
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel, Field, validators, field_validator
 import uvicorn
 
 from fastapi.middleware.cors import CORSMiddleware
 
+from services.db_pool import SQLitePool
+from services.async_db import AsyncMedicalDatabase
+from services.interaction_log_writer import InteractionLogWriter
+from services.medical_index import MedicalReferenceIndex
+from services import symptom_search
+from services.migrations import run_migrations, seed_dataset, fts_enabled
+from services.response_cache import ResponseCache
+from services.single_flight import SingleFlight
+from services.provider_router import ProviderRouter, NoProviderAvailable, AllProvidersFailed, ProviderSkipped
+from services.cost_ledger import CostLedger, BudgetExceeded, estimate_tokens
+from services.conversation_memory import ConversationStore, SQLiteConversationStore, Turn, history_within_budget
+from services import translation_service
+from services.translation_memory import TranslationMemory
+from services import response_bundles
+from services import metrics as metrics_module
+from services.metrics import MetricsRegistry, instrument
+from services.lazy_loader import LazyGroup, LazyResource, lazy_import, warm_up
+from services.safety_scanner import SafetyScanner, StreamingSafetyValidator, UnsafeStreamError, guarded_stream
+from services.message_analyzer import Analysis, Lexicon, MessageAnalyzer, load_lexicon
+
 # Basic system monitoring
 try:
     import psutil
@@ -63,53 +82,42 @@ except ImportError:
     psutil = None
     print("⚠️  psutil not installed - system monitoring disabled")
 
-# Free NLP components
-try:
+# Optional heavy components are loaded on first use (or by the background warm-up)
+def _load_spacy_model():
     import spacy
-    nlp_model = spacy.load("en_core_web_sm")
-except (ImportError, OSError):
-    nlp_model = None
-    print("⚠️  spaCy not available - using basic text processing")
+    return spacy.load("en_core_web_sm")
 
-try:
+def _load_sentiment_analyzer():
     import nltk
     from nltk.sentiment import SentimentIntensityAnalyzer
-    nltk.download('vader_lexicon', quiet=True)
-    sentiment_analyzer = SentimentIntensityAnalyzer()
-except ImportError:
-    sentiment_analyzer = None
-    print("⚠️  NLTK not available - sentiment analysis disabled")
+    try:
+        return SentimentIntensityAnalyzer()
+    except LookupError:
+        # Lexicon not on disk yet - the only case that needs the network
+        nltk.download('vader_lexicon', quiet=True)
+        return SentimentIntensityAnalyzer()
 
-# AI Models (optional)
-try:
-    import openai
-    openai_available = True
-except ImportError:
-    openai_available = False
-    print("ℹ️  OpenAI not installed")
+def _load_translator():
+    from googletrans import Translator
+    return Translator()
 
-try:
-    import google.generativeai as genai
-    gemini_available = True
-except ImportError:
-    gemini_available = False
-    print("ℹ️  Google Gemini not installed")
+# Free NLP components
+nlp_model = LazyResource('spacy', _load_spacy_model)
+sentiment_analyzer = LazyResource('nltk_vader', _load_sentiment_analyzer)
+
+# AI provider SDKs (optional)
+openai_sdk = lazy_import('openai_sdk', 'openai')
+gemini_sdk = lazy_import('gemini_sdk', 'google.generativeai')
+anthropic_sdk = lazy_import('anthropic_sdk', 'anthropic')
 
 try:
-    from anthropic import Anthropic
-    claude_available = True
+    import httpx
+    httpx_available = True
 except ImportError:
-    claude_available = False
-    print("ℹ️  Claude not installed")
+    httpx_available = False
 
 # Translation (optional)
-try:
-    from googletrans import Translator
-    translator = Translator()
-    translation_available = True
-except ImportError:
-    translation_available = False
-    print("ℹ️  Translation not available")
+translator = LazyResource('googletrans', _load_translator)
 
 # Configure logging
 logging.basicConfig(
@@ -128,12 +136,51 @@ class Config:
 
     # Database
     DATABASE_PATH = "afiyalink.db"
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '4'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '5.0'))
+
+    # Interaction log write-behind buffer
+    LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '500'))
+    LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '0.05'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_OVERFLOW_POLICY = os.getenv('LOG_OVERFLOW_POLICY', 'drop_oldest')
+
+    # In-memory reference data index
+    REFERENCE_INDEX_CHECK_INTERVAL = float(os.getenv('REFERENCE_INDEX_CHECK_INTERVAL', '1.0'))
+
+    # Symptom search: "index" (in-memory substring match) or "fts" (FTS5 + BM25)
+    SYMPTOM_SEARCH_MODE = os.getenv('SYMPTOM_SEARCH_MODE', 'index')
+    SYMPTOM_SEARCH_TOP_K = int(os.getenv('SYMPTOM_SEARCH_TOP_K', '5'))
 
     # AI Models
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     CLAUDE_API_KEY = os.getenv('CLAUDE_API_KEY')
 
+    # Cache of validated AI answers (exact + TF-IDF similarity tiers)
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2000'))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', str(6 * 3600)))
+    RESPONSE_CACHE_SIMILARITY = float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0.8'))
+
+    # Translation memory for non-English replies
+    TRANSLATION_MEMORY_MAX_ENTRIES = int(os.getenv('TRANSLATION_MEMORY_MAX_ENTRIES', '5000'))
+    TRANSLATION_PREWARM_ENABLED = os.getenv('TRANSLATION_PREWARM_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    TRANSLATION_PREWARM_LANGUAGES = [lang.strip() for lang in os.getenv('TRANSLATION_PREWARM_LANGUAGES', 'ar,fr,ur').split(',') if lang.strip()]
+
+    # Multi-turn conversation memory: "memory" (per worker), "sqlite" (shared by workers) or "off"
+    CONVERSATION_MEMORY_BACKEND = os.getenv('CONVERSATION_MEMORY_BACKEND', 'memory').lower()
+    CONVERSATION_MAX_TURNS = int(os.getenv('CONVERSATION_MAX_TURNS', '10'))
+    CONVERSATION_MAX_SESSIONS = int(os.getenv('CONVERSATION_MAX_SESSIONS', '10000'))
+    CONVERSATION_MAX_BYTES = int(os.getenv('CONVERSATION_MAX_BYTES', str(16 * 1024 * 1024)))
+    CONVERSATION_TTL = float(os.getenv('CONVERSATION_TTL', '1800'))
+    CONVERSATION_HISTORY_TOKENS = int(os.getenv('CONVERSATION_HISTORY_TOKENS', '600'))
+
+    # Batch chat endpoint
+    BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '50'))
+    BATCH_AI_CONCURRENCY = int(os.getenv('BATCH_AI_CONCURRENCY', '8'))
+
     # Cost control
     DAILY_AI_COST_LIMIT = float(os.getenv('DAILY_AI_COST_LIMIT', '10.0'))
 
@@ -141,12 +188,41 @@ class Config:
     EMERGENCY_RESPONSE_TIME_LIMIT = 5.0
     MAX_RESPONSE_TIME = 30.0
 
+    # AI provider calls - each timeout is further capped by what is left of MAX_RESPONSE_TIME
+    AI_PROVIDER_TIMEOUTS = {
+        'gemini': float(os.getenv('GEMINI_TIMEOUT', '15.0')),
+        'openai': float(os.getenv('OPENAI_TIMEOUT', '20.0')),
+        'claude': float(os.getenv('CLAUDE_TIMEOUT', '20.0')),
+    }
+    AI_MAX_CONCURRENT_CALLS = int(os.getenv('AI_MAX_CONCURRENT_CALLS', '256'))
+    AI_COALESCE_REQUESTS = os.getenv('AI_COALESCE_REQUESTS', 'true').lower() in ('1', 'true', 'yes')
+    AI_HTTP_MAX_CONNECTIONS = int(os.getenv('AI_HTTP_MAX_CONNECTIONS', '256'))
+    AI_HTTP_MAX_KEEPALIVE = int(os.getenv('AI_HTTP_MAX_KEEPALIVE', '64'))
+
+    # Latency-aware provider routing
+    AI_HEDGING_ENABLED = os.getenv('AI_HEDGING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    AI_HEDGE_DEFAULT_DELAY = float(os.getenv('AI_HEDGE_DEFAULT_DELAY', '3.0'))
+    AI_HEDGE_MIN_DELAY = float(os.getenv('AI_HEDGE_MIN_DELAY', '0.25'))
+    AI_ROUTER_WINDOW = int(os.getenv('AI_ROUTER_WINDOW', '200'))
+    AI_ROUTER_MIN_SAMPLES = int(os.getenv('AI_ROUTER_MIN_SAMPLES', '20'))
+    AI_BREAKER_FAILURE_THRESHOLD = int(os.getenv('AI_BREAKER_FAILURE_THRESHOLD', '5'))
+    AI_BREAKER_COOLDOWN = float(os.getenv('AI_BREAKER_COOLDOWN', '30.0'))
+
+    # Startup: optional components (NLP models, provider SDKs) load in the background once serving
+    STARTUP_WARMUP_ENABLED = os.getenv('STARTUP_WARMUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+    # Per-stage latency metrics at /api/v1/metrics; when off nothing is instrumented
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
     # Safety
     ENABLE_SAFETY_VALIDATION = True
     ENABLE_EMERGENCY_DETECTION = True
 
 config = Config()
 
+# Prometheus-format metrics registry; None when metrics are switched off
+metrics = MetricsRegistry() if config.METRICS_ENABLED else None
+
 # ==================== ENUMS AND DATA CLASSES ====================
 class RiskLevel(Enum):
     LOW = "low"
@@ -188,77 +264,52 @@ class SafetyValidationResult:
     warnings: List[str]
     emergency_detected: bool
     human_intervention_required: bool
+    matched_rules: List[str] = field(default_factory=list)
 
 # ==================== DATABASE SYSTEM ====================
 class MedicalDatabase:
     """Simple, reliable medical database"""
 
-    def __init__(self, db_path: str = None):
+    # Bump whenever the built-in seed data below changes
+    SEED_DATASET_VERSION = "1"
+
+    def __init__(self, db_path: str = None, pool_size: int = None):
         self.db_path = db_path or config.DATABASE_PATH
+        self.pool = SQLitePool(
+            self.db_path,
+            pool_size=pool_size or config.DB_POOL_SIZE,
+            timeout=config.DB_POOL_TIMEOUT
+        )
+        self.fts_available = False
         self.init_database()
         self.populate_medical_data()
+        self.reference_index = MedicalReferenceIndex(
+            self.pool,
+            check_interval=config.REFERENCE_INDEX_CHECK_INTERVAL
+        )
+        self.reference_index.load()
+        self.log_writer = InteractionLogWriter(
+            self.pool,
+            max_batch_size=config.LOG_BATCH_SIZE,
+            flush_interval=config.LOG_FLUSH_INTERVAL,
+            max_queue_size=config.LOG_QUEUE_SIZE,
+            overflow_policy=config.LOG_OVERFLOW_POLICY
+        )
 
     def init_database(self):
-        """Initialize database tables"""
+        """Apply pending schema migrations"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Symptoms table
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS symptoms (
-                                                                   id INTEGER PRIMARY KEY,
-                                                                   symptom TEXT UNIQUE NOT NULL,
-                                                                   description TEXT NOT NULL,
-                                                                   possible_causes TEXT NOT NULL,
-                                                                   self_care_advice TEXT NOT NULL,
-                                                                   when_to_see_doctor TEXT NOT NULL,
-                                                                   emergency_indicators TEXT,
-                                                                   severity_level TEXT NOT NULL,
-                                                                   cultural_considerations TEXT,
-                                                                   reliability_score REAL DEFAULT 1.0
-                           )
-                           ''')
-
-            # Emergency protocols table
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS emergency_protocols (
-                                                                              id INTEGER PRIMARY KEY,
-                                                                              condition TEXT UNIQUE NOT NULL,
-                                                                              immediate_actions TEXT NOT NULL,
-                                                                              warning_signs TEXT NOT NULL,
-                                                                              emergency_numbers TEXT NOT NULL,
-                                                                              cultural_considerations TEXT
-                           )
-                           ''')
-
-            # Interaction logs
-            cursor.execute('''
-                           CREATE TABLE IF NOT EXISTS interaction_logs (
-                                                                           id INTEGER PRIMARY KEY,
-                                                                           user_id TEXT,
-                                                                           query TEXT,
-                                                                           response TEXT,
-                                                                           risk_level TEXT,
-                                                                           emergency_alert BOOLEAN,
-                                                                           timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                           )
-                           ''')
-
-            conn.commit()
-            conn.close()
-            logger.info(" Database initialized successfully")
+            applied = run_migrations(self.pool)
+            self.fts_available = fts_enabled(self.pool)
+            logger.info(f" Database initialized successfully ({applied} migrations applied)")
 
         except Exception as e:
             logger.error(f"❌ Database initialization failed: {e}")
             raise
 
     def populate_medical_data(self):
-        """Add basic medical knowledge"""
+        """Add basic medical knowledge (only when SEED_DATASET_VERSION changes)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
             # Basic symptoms with high reliability
             symptoms_data = [
                 ('headache', 'Pain in the head or neck area',
@@ -307,13 +358,6 @@ class MedicalDatabase:
                  0.90)
             ]
 
-            cursor.executemany('''
-                INSERT OR REPLACE INTO symptoms 
-                (symptom, description, possible_causes, self_care_advice, when_to_see_doctor, 
-                 emergency_indicators, severity_level, cultural_considerations, reliability_score)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', symptoms_data)
-
             # Emergency protocols
             emergency_data = [
                 ('chest_pain',
@@ -335,76 +379,63 @@ class MedicalDatabase:
                  'Saving life is paramount in Islamic teaching.')
             ]
 
-            cursor.executemany('''
-                INSERT OR REPLACE INTO emergency_protocols 
-                (condition, immediate_actions, warning_signs, emergency_numbers, cultural_considerations)
-                VALUES (?, ?, ?, ?, ?)
-            ''', emergency_data)
-
-            conn.commit()
-            conn.close()
-            logger.info("Medical data populated successfully")
+            def write_seed_data(cursor) -> int:
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO symptoms 
+                    (symptom, description, possible_causes, self_care_advice, when_to_see_doctor, 
+                     emergency_indicators, severity_level, cultural_considerations, reliability_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', symptoms_data)
+
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO emergency_protocols 
+                    (condition, immediate_actions, warning_signs, emergency_numbers, cultural_considerations)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', emergency_data)
+                return len(symptoms_data) + len(emergency_data)
+
+            if seed_dataset(self.pool, 'core_medical_data', self.SEED_DATASET_VERSION, write_seed_data):
+                logger.info("Medical data populated successfully")
+            else:
+                logger.info("Medical data already at current version - seeding skipped")
 
         except Exception as e:
             logger.error(f"❌ Failed to populate medical data: {e}")
 
     def search_symptom(self, symptom: str) -> Optional[Dict]:
-        """Search for symptom information"""
+        """Search for symptom information, best match only"""
+        results = self.search_symptoms(symptom, limit=1)
+        return results[0] if results else None
+
+    def search_symptoms(self, query: str, limit: int = None, mode: str = None) -> List[Dict]:
+        """Top-k symptom matches using the configured search mode"""
+        limit = limit or config.SYMPTOM_SEARCH_TOP_K
+        mode = mode or config.SYMPTOM_SEARCH_MODE
+
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                           SELECT * FROM symptoms
-                           WHERE symptom LIKE ? OR description LIKE ?
-                           ORDER BY reliability_score DESC
-                               LIMIT 1
-                           ''', (f'%{symptom}%', f'%{symptom}%'))
-
-            result = cursor.fetchone()
-            conn.close()
-
-            if result:
-                return {
-                    'symptom': result[1],
-                    'description': result[2],
-                    'possible_causes': result[3],
-                    'self_care_advice': result[4],
-                    'when_to_see_doctor': result[5],
-                    'emergency_indicators': result[6],
-                    'severity_level': result[7],
-                    'cultural_considerations': result[8],
-                    'reliability_score': result[9]
-                }
-            return None
+            if mode == 'fts' and self.fts_available:
+                with self.pool.reader() as conn:
+                    return symptom_search.search(conn, query, limit)
+
+            # Substring match on symptom or description, ranked by reliability
+            results = self.reference_index.search_symptoms(query, limit=limit)
+            for result in results:
+                result.pop('id', None)
+            return results
 
         except Exception as e:
             logger.error(f"Database search error: {e}")
-            return None
+            return []
 
     def get_emergency_protocol(self, condition: str) -> Optional[Dict]:
         """Get emergency protocol"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                           SELECT * FROM emergency_protocols
-                           WHERE condition LIKE ?
-                               LIMIT 1
-                           ''', (f'%{condition}%',))
-
-            result = cursor.fetchone()
-            conn.close()
-
-            if result:
-                return {
-                    'condition': result[1],
-                    'immediate_actions': result[2],
-                    'warning_signs': result[3],
-                    'emergency_numbers': result[4],
-                    'cultural_considerations': result[5]
-                }
+            results = self.reference_index.search_protocols(condition, limit=1)
+
+            if results:
+                result = results[0]
+                result.pop('id', None)
+                return result
             return None
 
         except Exception as e:
@@ -412,43 +443,63 @@ class MedicalDatabase:
             return None
 
     def log_interaction(self, user_id: str, query: str, response: str, risk_level: str, emergency_alert: bool):
-        """Log user interaction"""
+        """Queue user interaction for the batched log writer"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            if not self.log_writer.submit(user_id, query, response, risk_level, emergency_alert):
+                logger.warning("Interaction log buffer full - log entry dropped")
 
-            cursor.execute('''
-                           INSERT INTO interaction_logs
-                               (user_id, query, response, risk_level, emergency_alert)
-                           VALUES (?, ?, ?, ?, ?)
-                           ''', (user_id, query, response, risk_level, emergency_alert))
+        except Exception as e:
+            logger.error(f"Failed to log interaction: {e}")
 
-            conn.commit()
-            conn.close()
+    def log_interactions(self, rows: List[Tuple[str, str, str, str, bool]]):
+        """Write a group of interactions in a single transaction.
 
+        If that write fails the rows go through the buffered writer instead,
+        so emergency rows still reach the audit trail.
+        """
+        try:
+            if self.log_writer.write_rows(rows):
+                return
         except Exception as e:
-            logger.error(f"Failed to log interaction: {e}")
+            logger.error(f"Failed to write interaction group: {e}")
+
+        for row in rows:
+            self.log_interaction(*row)
+
+    def flush_logs(self, timeout: float = 5.0) -> bool:
+        """Wait until all queued interaction logs are written"""
+        return self.log_writer.flush(timeout)
+
+    def get_pool_stats(self) -> Dict:
+        """Connection pool sizing and wait-time statistics"""
+        return self.pool.stats()
+
+    def get_log_writer_stats(self) -> Dict:
+        """Interaction log buffer statistics"""
+        return self.log_writer.stats()
+
+    def get_reference_index_stats(self) -> Dict:
+        """In-memory reference index statistics"""
+        return self.reference_index.stats()
+
+    def close(self):
+        """Flush pending logs and release all pooled connections"""
+        self.log_writer.close()
+        self.pool.close()
 
 # ==================== SAFETY VALIDATION ====================
 class SafetyValidator:
     """Comprehensive safety validation for healthcare responses"""
 
-    def __init__(self):
+    def __init__(self, lexicon: Optional[Lexicon] = None):
+        # Message rules (all languages) come from the lexicon data file
+        self.lexicon = lexicon or load_lexicon()
+
         # Critical emergency keywords
-        self.emergency_keywords = [
-            'chest pain', 'heart attack', 'stroke', 'cant breathe', 'difficulty breathing',
-            'severe bleeding', 'unconscious', 'suicide', 'overdose', 'allergic reaction',
-            'choking', 'poisoning', 'seizure', 'paralysis', 'loss of vision'
-        ]
+        self.emergency_keywords = list(self.lexicon.emergency)
 
         # High-risk patterns
-        self.high_risk_patterns = [
-            r'(want to|going to) (die|kill|harm)',
-            r'severe .* pain',
-            r'can\'?t (breathe|see|move|feel)',
-            r'blood .* (vomit|stool|urine)',
-            r'temperature .* (above|over) .* (39|102)'
-        ]
+        self.high_risk_patterns = list(self.lexicon.high_risk)
 
         # Forbidden advice patterns
         self.forbidden_advice = [
@@ -458,30 +509,55 @@ class SafetyValidator:
             r'you (don\'?t need|shouldn\'?t see) .* (doctor|hospital)'
         ]
 
+        # Phrases that count as an appropriate medical disclaimer
+        self.disclaimer_phrases = [
+            'consult', 'doctor', 'healthcare professional', 'medical advice'
+        ]
+
+        self.compile_rules()
+
+    def compile_rules(self):
+        """(Re)compile the rule lists: message rules into the analyzer, response rules into the scanner"""
+        self.analyzer = MessageAnalyzer(replace(
+            self.lexicon,
+            emergency=tuple(self.emergency_keywords),
+            high_risk=tuple(self.high_risk_patterns)
+        ))
+        self.scanner = SafetyScanner(
+            keywords={'disclaimer': self.disclaimer_phrases},
+            patterns={'forbidden_advice': self.forbidden_advice}
+        )
+
     def validate_input(self, text: str) -> SafetyValidationResult:
         """Validate user input for safety concerns"""
-        text_lower = text.lower()
+        return self.assess(self.analyzer.analyze(text))
+
+    def validate_inputs(self, texts: List[str]) -> List[SafetyValidationResult]:
+        """validate_input for a batch of messages with one scan over all of them"""
+        return [self.assess(analysis) for analysis in self.analyzer.analyze_many(texts)]
+
+    def assess(self, analysis: Analysis) -> SafetyValidationResult:
+        """Input safety verdict from a message analysis"""
         warnings = []
         safety_level = SafetyLevel.SAFE
         emergency_detected = False
         human_intervention_required = False
 
+        emergency_hits = analysis.emergency
+        matched_rules = [f"{hit.category}:{hit.rule}" for hit in emergency_hits]
+
         # Check for emergency keywords
-        for keyword in self.emergency_keywords:
-            if keyword in text_lower:
-                emergency_detected = True
-                safety_level = SafetyLevel.CRITICAL
-                human_intervention_required = True
-                warnings.append(f"Emergency keyword detected: {keyword}")
-                break
+        if emergency_hits:
+            emergency_detected = True
+            safety_level = SafetyLevel.CRITICAL
+            human_intervention_required = True
+            warnings.append(f"Emergency keyword detected: {emergency_hits[0].rule}")
 
         # Check high-risk patterns
-        if not emergency_detected:
-            for pattern in self.high_risk_patterns:
-                if re.search(pattern, text_lower):
-                    safety_level = SafetyLevel.WARNING
-                    warnings.append(f"High-risk pattern detected")
-                    break
+        if not emergency_detected and analysis.high_risk:
+            safety_level = SafetyLevel.WARNING
+            warnings.append(f"High-risk pattern detected")
+            matched_rules.extend(f"{hit.category}:{hit.rule}" for hit in analysis.high_risk)
 
         is_safe = safety_level in [SafetyLevel.SAFE, SafetyLevel.CAUTION]
         confidence = 0.95 if emergency_detected else 0.8
@@ -492,178 +568,639 @@ class SafetyValidator:
             confidence=confidence,
             warnings=warnings,
             emergency_detected=emergency_detected,
-            human_intervention_required=human_intervention_required
+            human_intervention_required=human_intervention_required,
+            matched_rules=matched_rules
         )
 
     def validate_response(self, response: str) -> bool:
         """Validate AI-generated response for safety"""
         response_lower = response.lower()
+        hits = self.scanner.by_category(self.scanner.scan(response_lower, ('forbidden_advice', 'disclaimer')))
 
         # Check for forbidden advice
-        for pattern in self.forbidden_advice:
-            if re.search(pattern, response_lower):
-                return False
+        if hits.get('forbidden_advice'):
+            return False
 
         # Check for appropriate disclaimers
-        disclaimer_phrases = [
-            'consult', 'doctor', 'healthcare professional', 'medical advice'
-        ]
+        return bool(hits.get('disclaimer'))
 
-        has_disclaimer = any(phrase in response_lower for phrase in disclaimer_phrases)
-        return has_disclaimer
+    def stream_validator(self, holdback: int = 64) -> StreamingSafetyValidator:
+        """Incremental validate_response for a token-streamed AI answer"""
+        return StreamingSafetyValidator(self.scanner, holdback=holdback)
 
 # ==================== AI MODEL MANAGER ====================
+class ModelStream:
+    """Async iterator over the text chunks of one provider's streamed answer.
+
+    `cost` starts as the reserved worst case and becomes the settled cost
+    once the stream has finished: `settle` is called with the streamed text
+    when the chunks run out or the stream is closed, and returns that cost.
+    """
+
+    def __init__(self, model_name: str, chunks, cost: float, settle: Optional[Callable[[str], float]] = None):
+        self.model_name = model_name
+        self.cost = cost
+        self.text = ""
+        self._chunks = self._settled(chunks, settle) if settle else chunks
+
+    async def _settled(self, chunks, settle: Callable[[str], float]):
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+            self.cost = settle(self.text)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        chunk = await self._chunks.__anext__()
+        self.text += chunk
+        return chunk
+
+    async def aclose(self):
+        await self._chunks.aclose()
+
 class AIModelManager:
-    """Manages AI models with cost control and fallbacks"""
+    """Manages AI models with cost control and fallbacks.
+
+    Every provider is called through its native async client, so a slow
+    LLM round trip never blocks the event loop. OpenAI and Claude share one
+    pooled HTTP client, in-flight calls are capped by a semaphore and each
+    call is bounded by its provider timeout and the remaining
+    MAX_RESPONSE_TIME budget. Provider choice, hedging and circuit breaking
+    are delegated to ProviderRouter, and concurrent identical prompts share
+    one upstream call.
+    """
+
+    MODEL_ORDER = ['gemini', 'openai', 'claude']
+
+    # USD per 1K tokens: (input, output)
+    MODEL_PRICING = {
+        'gemini': (0.000125, 0.000375),
+        'openai': (0.0005, 0.0015),
+        'claude': (0.00025, 0.00125),
+    }
+    MAX_OUTPUT_TOKENS = 400
 
-    def __init__(self):
+    def __init__(self, cost_ledger: Optional[CostLedger] = None):
         self.models = {}
-        self.daily_cost = 0.0
+        self.cost_ledger = cost_ledger or CostLedger(daily_limit=config.DAILY_AI_COST_LIMIT)
+        self.http_client = None
+        self.call_slots = asyncio.Semaphore(config.AI_MAX_CONCURRENT_CALLS)
+        self.single_flight = SingleFlight()
+        self._settlements = set()
+        self.router = ProviderRouter(
+            self.MODEL_ORDER,
+            window=config.AI_ROUTER_WINDOW,
+            min_samples=config.AI_ROUTER_MIN_SAMPLES,
+            hedging=config.AI_HEDGING_ENABLED,
+            hedge_default_delay=config.AI_HEDGE_DEFAULT_DELAY,
+            hedge_min_delay=config.AI_HEDGE_MIN_DELAY,
+            failure_threshold=config.AI_BREAKER_FAILURE_THRESHOLD,
+            cooldown=config.AI_BREAKER_COOLDOWN
+        )
         self.setup_models()
 
     def setup_models(self):
-        """Initialize available AI models"""
-        # OpenAI GPT
-        if openai_available and config.OPENAI_API_KEY:
-            try:
-                openai.api_key = config.OPENAI_API_KEY
-                self.models['openai'] = openai
-                logger.info("OpenAI initialized")
-            except Exception as e:
-                logger.warning(f"OpenAI initialization failed: {e}")
+        """Register the configured AI models; SDKs and clients load on first use"""
+        # Pooled HTTP client shared by the OpenAI and Claude SDKs
+        if httpx_available and (config.OPENAI_API_KEY or config.CLAUDE_API_KEY):
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.AI_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.AI_HTTP_MAX_KEEPALIVE
+                ),
+                timeout=httpx.Timeout(config.MAX_RESPONSE_TIME, connect=5.0)
+            )
 
-        # Google Gemini
-        if gemini_available and config.GEMINI_API_KEY:
-            try:
-                genai.configure(api_key=config.GEMINI_API_KEY)
-                self.models['gemini'] = genai.GenerativeModel('gemini-pro')
-                logger.info("Gemini initialized")
-            except Exception as e:
-                logger.warning(f"Gemini initialization failed: {e}")
+        factories = {
+            'openai': (config.OPENAI_API_KEY, self._create_openai),
+            'gemini': (config.GEMINI_API_KEY, self._create_gemini),
+            'claude': (config.CLAUDE_API_KEY, self._create_claude),
+        }
+        self.models = LazyGroup(
+            LazyResource(name, factory) for name, (api_key, factory) in factories.items() if api_key
+        )
 
-        # Claude
-        if claude_available and config.CLAUDE_API_KEY:
-            try:
-                self.models['claude'] = Anthropic(api_key=config.CLAUDE_API_KEY)
-                logger.info("Claude initialized")
-            except Exception as e:
-                logger.warning(f"Claude initialization failed: {e}")
+    def _create_openai(self):
+        # No SDK retries, a failure falls through to the next model instead
+        sdk = openai_sdk.get()
+        if sdk is None:
+            return None
+        client = sdk.AsyncOpenAI(
+            api_key=config.OPENAI_API_KEY,
+            http_client=self.http_client,
+            max_retries=0
+        )
+        logger.info("OpenAI initialized")
+        return client
+
+    def _create_gemini(self):
+        genai = gemini_sdk.get()
+        if genai is None:
+            return None
+        genai.configure(api_key=config.GEMINI_API_KEY)
+        model = genai.GenerativeModel('gemini-pro')
+        logger.info("Gemini initialized")
+        return model
+
+    def _create_claude(self):
+        sdk = anthropic_sdk.get()
+        if sdk is None:
+            return None
+        client = sdk.AsyncAnthropic(
+            api_key=config.CLAUDE_API_KEY,
+            http_client=self.http_client,
+            max_retries=0
+        )
+        logger.info("Claude initialized")
+        return client
+
+    async def close(self):
+        """Release pooled provider connections"""
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    @property
+    def daily_cost(self) -> float:
+        """Today's (UTC) AI spend across every worker, as last seen (no I/O; for reporting)"""
+        return self.cost_ledger.last_spent_today()
+
+    async def spent_today(self) -> float:
+        """Today's (UTC) AI spend, read from SQLite off the event loop when the cache is stale"""
+        spent = self.cost_ledger.cached_spent_today()
+        if spent is None:
+            spent = await asyncio.to_thread(self.cost_ledger.spent_today)
+        return spent
+
+    async def within_budget(self) -> bool:
+        return await self.spent_today() < self.cost_ledger.daily_limit
+
+    def price(self, model_name: str, prompt_tokens: int, completion_tokens: int) -> float:
+        input_price, output_price = self.MODEL_PRICING[model_name]
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1000
+
+    def estimate_cost(self, model_name: str, prompt: str) -> float:
+        """Worst-case cost of a call: the prompt plus a full-length answer"""
+        return self.price(model_name, estimate_tokens(prompt), self.MAX_OUTPUT_TOKENS)
+
+    async def _reserve(self, model_name: str, amount: float) -> str:
+        return await asyncio.to_thread(self.cost_ledger.reserve, model_name, amount)
+
+    def _settle_later(self, day: str, model_name: str, reserved: float, cost: float,
+                      prompt_tokens: int, completion_tokens: int):
+        """Settle from a cancelled task, where awaiting is no longer possible"""
+        task = asyncio.ensure_future(asyncio.to_thread(
+            self.cost_ledger.settle, day, model_name, reserved, cost, prompt_tokens, completion_tokens
+        ))
+        self._settlements.add(task)
+        task.add_done_callback(self._settlements.discard)
+
+    async def wait_settlements(self):
+        """Let pending cost settlements finish (before the database is closed)"""
+        await asyncio.gather(*self._settlements, return_exceptions=True)
+
+    def _timeout(self, model_name: str, deadline: float) -> float:
+        """Provider timeout, cut short by what is left of the response budget"""
+        provider_timeout = config.AI_PROVIDER_TIMEOUTS.get(model_name, config.MAX_RESPONSE_TIME)
+        return min(provider_timeout, deadline - time.monotonic())
 
     async def generate_response(self, prompt: str, max_cost: float = 0.01) -> Tuple[Optional[str], float]:
-        """Generate AI response with cost control"""
+        """Generate AI response with cost control.
+
+        Concurrent calls with the same prompt are coalesced into one upstream
+        request; only the caller that started it is charged its cost.
+        """
+        if not config.AI_COALESCE_REQUESTS:
+            return await self._generate_response(prompt, max_cost)
 
-        if self.daily_cost >= config.DAILY_AI_COST_LIMIT:
+        fingerprint = hashlib.sha256(f"{max_cost}\x00{prompt}".encode('utf-8')).hexdigest()
+        (response, cost), shared = await self.single_flight.do(
+            fingerprint, lambda: self._generate_response(prompt, max_cost)
+        )
+        return response, 0.0 if shared else cost
+
+    async def _generate_response(self, prompt: str, max_cost: float) -> Tuple[Optional[str], float]:
+        if not await self.within_budget():
             logger.info("Daily AI cost limit reached")
             return None, 0.0
 
-        # Try models in order of cost-effectiveness
-        for model_name in ['gemini', 'openai', 'claude']:
-            if model_name in self.models:
-                try:
-                    response, cost = await self._call_model(model_name, prompt)
-                    if cost <= max_cost:
-                        self.daily_cost += cost
-                        return response, cost
-                except Exception as e:
-                    logger.warning(f"AI model {model_name} failed: {e}")
-                    continue
-
-        return None, 0.0
-
-    async def _call_model(self, model_name: str, prompt: str) -> Tuple[str, float]:
-        """Call specific AI model"""
-
-        if model_name == 'gemini':
-            response = self.models['gemini'].generate_content(prompt)
-            cost = len(prompt.split()) * 0.00001
-            return response.text, cost
-
-        elif model_name == 'openai':
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=400,
-                temperature=0.3
-            )
-            cost = len(prompt.split()) * 0.0002
-            return response.choices[0].message.content, cost
-
-        elif model_name == 'claude':
-            response = self.models['claude'].messages.create(
-                model="claude-3-haiku-20240307",
-                max_tokens=400,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            cost = len(prompt.split()) * 0.00025
-            return response.content[0].text, cost
+        deadline = time.monotonic() + config.MAX_RESPONSE_TIME
 
-        else:
-            raise ValueError(f"Unknown model: {model_name}")
+        # Models within budget, in order of cost-effectiveness; the router re-ranks them by latency
+        candidates = [name for name in self.MODEL_ORDER
+                      if name in self.models and self.estimate_cost(name, prompt) <= max_cost]
+
+        async def request(model_name: str) -> Tuple[str, float]:
+            timeout = self._timeout(model_name, deadline)
+            if timeout <= 0:
+                raise asyncio.TimeoutError("AI response time budget exhausted")
+            try:
+                return await self._call_model(model_name, prompt, timeout)
+            except BudgetExceeded as e:
+                raise ProviderSkipped(str(e)) from e
+
+        try:
+            model_name, (response, cost), started = await self.router.call(candidates, request)
+        except NoProviderAvailable:
+            logger.warning("No AI model available (circuit breakers open)")
+            return None, 0.0
+        except AllProvidersFailed as e:
+            logger.warning(f"AI models failed: {e}")
+            return None, 0.0
+
+        return response, cost
+
+    def routing_stats(self) -> Dict:
+        return self.router.snapshot()
+
+    def coalescing_stats(self) -> Dict:
+        return {'enabled': config.AI_COALESCE_REQUESTS, **self.single_flight.stats()}
+
+    async def _call_model(self, model_name: str, prompt: str, timeout: Optional[float] = None) -> Tuple[str, float]:
+        """Call specific AI model within its timeout and the daily budget.
+
+        The worst-case cost is reserved in the ledger first and settled to
+        the real token cost afterwards; raises BudgetExceeded if the
+        reservation does not fit in today's budget.
+        """
+        if timeout is None:
+            timeout = config.AI_PROVIDER_TIMEOUTS.get(model_name, config.MAX_RESPONSE_TIME)
+
+        reserved = self.estimate_cost(model_name, prompt)
+        day = await self._reserve(model_name, reserved)
+        try:
+            # Waiting for a free slot counts against the timeout too
+            response, usage = await asyncio.wait_for(self._request(model_name, prompt, timeout), timeout)
+        except asyncio.CancelledError:
+            # A hedge that lost the race may still be billed for its prompt
+            prompt_tokens = estimate_tokens(prompt)
+            self._settle_later(day, model_name, reserved, self.price(model_name, prompt_tokens, 0), prompt_tokens, 0)
+            raise
+        except Exception:
+            await asyncio.to_thread(self.cost_ledger.release, day, model_name, reserved)
+            raise
+
+        prompt_tokens, completion_tokens = usage or (estimate_tokens(prompt), estimate_tokens(response))
+        cost = self.price(model_name, prompt_tokens, completion_tokens)
+        await asyncio.to_thread(self.cost_ledger.settle, day, model_name, reserved, cost, prompt_tokens, completion_tokens)
+        return response, cost
+
+    @staticmethod
+    def _usage(model_name: str, response) -> Optional[Tuple[int, int]]:
+        """(prompt_tokens, completion_tokens) reported by the provider, if any"""
+        try:
+            if model_name == 'gemini':
+                usage = response.usage_metadata
+                return usage.prompt_token_count, usage.candidates_token_count
+            elif model_name == 'openai':
+                return response.usage.prompt_tokens, response.usage.completion_tokens
+            elif model_name == 'claude':
+                return response.usage.input_tokens, response.usage.output_tokens
+        except AttributeError:
+            pass
+        return None
+
+    async def _request(self, model_name: str, prompt: str, timeout: float) -> Tuple[str, Optional[Tuple[int, int]]]:
+        client = await self.models.aget(model_name)
+        async with self.call_slots:
+            if model_name == 'gemini':
+                response = await client.generate_content_async(
+                    prompt,
+                    request_options={"timeout": timeout}
+                )
+                return response.text, self._usage(model_name, response)
+
+            elif model_name == 'openai':
+                response = await client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=400,
+                    temperature=0.3,
+                    timeout=timeout
+                )
+                return response.choices[0].message.content, self._usage(model_name, response)
+
+            elif model_name == 'claude':
+                response = await client.messages.create(
+                    model="claude-3-haiku-20240307",
+                    max_tokens=400,
+                    messages=[{"role": "user", "content": prompt}],
+                    timeout=timeout
+                )
+                return response.content[0].text, self._usage(model_name, response)
+
+            else:
+                raise ValueError(f"Unknown model: {model_name}")
+
+    async def stream_response(self, prompt: str, max_cost: float = 0.01) -> Optional[ModelStream]:
+        """Open a streamed AI response with cost control.
+
+        Falls through to the next model only if a model fails (or times out)
+        before its first chunk; once text has been produced the stream is
+        committed.
+        """
+
+        if not await self.within_budget():
+            logger.info("Daily AI cost limit reached")
+            return None
+
+        deadline = time.monotonic() + config.MAX_RESPONSE_TIME
+        candidates = [name for name in self.MODEL_ORDER
+                      if name in self.models and self.estimate_cost(name, prompt) <= max_cost]
+
+        # Streams are not hedged, but follow the router's ranking and circuit breakers
+        for model_name in self.router.rank(candidates):
+            timeout = self._timeout(model_name, deadline)
+            if timeout <= 0:
+                logger.warning("AI response time budget exhausted")
+                break
+
+            reserved = self.estimate_cost(model_name, prompt)
+            try:
+                day = await self._reserve(model_name, reserved)
+            except BudgetExceeded:
+                logger.info("Daily AI cost limit reached")
+                return None
+            if not self.router.acquire(model_name):
+                await asyncio.to_thread(self.cost_ledger.release, day, model_name, reserved)
+                continue
+
+            chunks = self._stream_model(model_name, prompt, timeout)
+            try:
+                first = await asyncio.wait_for(chunks.__anext__(), timeout)
+            except StopAsyncIteration:
+                self.router.record_failure(model_name)
+                logger.warning(f"AI model {model_name} returned an empty stream")
+            except asyncio.TimeoutError:
+                await chunks.aclose()
+                self.router.record_failure(model_name)
+                logger.warning(f"AI model {model_name} timed out after {timeout:.1f}s")
+            except Exception as e:
+                await chunks.aclose()
+                self.router.record_failure(model_name)
+                logger.warning(f"AI model {model_name} failed: {e}")
+            except BaseException:
+                await chunks.aclose()
+                self.router.record_cancelled(model_name)
+                prompt_tokens = estimate_tokens(prompt)
+                self._settle_later(day, model_name, reserved, self.price(model_name, prompt_tokens, 0), prompt_tokens, 0)
+                raise
+            else:
+                # Time to first chunk is not comparable with full-response latency
+                self.router.record_success(model_name)
+                return ModelStream(
+                    model_name, self._after_first(first, chunks), reserved,
+                    settle=lambda text: self._settle_stream(day, model_name, prompt, reserved, text)
+                )
+
+            await asyncio.to_thread(self.cost_ledger.release, day, model_name, reserved)
+
+        return None
+
+    @staticmethod
+    async def _after_first(first: str, chunks):
+        """The already received first chunk followed by the rest of the stream"""
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    def _settle_stream(self, day: str, model_name: str, prompt: str, reserved: float, text: str) -> float:
+        """Settle a stream's reservation from the text it produced; returns the cost"""
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        cost = self.price(model_name, prompt_tokens, completion_tokens)
+        self._settle_later(day, model_name, reserved, cost, prompt_tokens, completion_tokens)
+        return cost
+
+    async def _stream_model(self, model_name: str, prompt: str, timeout: float):
+        """Stream text chunks from a specific AI model.
+
+        `timeout` is handed to the client, where it bounds every network
+        read, so a stalled stream fails instead of hanging.
+        """
+        client = await self.models.aget(model_name)
+        async with self.call_slots:
+            if model_name == 'gemini':
+                response = await client.generate_content_async(
+                    prompt,
+                    stream=True,
+                    request_options={"timeout": timeout}
+                )
+                async for chunk in response:
+                    if chunk.text:
+                        yield chunk.text
+
+            elif model_name == 'openai':
+                stream = await client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=400,
+                    temperature=0.3,
+                    stream=True,
+                    timeout=timeout
+                )
+                try:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await stream.close()
+
+            elif model_name == 'claude':
+                async with client.messages.stream(
+                    model="claude-3-haiku-20240307",
+                    max_tokens=400,
+                    messages=[{"role": "user", "content": prompt}],
+                    timeout=timeout
+                ) as stream:
+                    async for text in stream.text_stream:
+                        if text:
+                            yield text
+
+            else:
+                raise ValueError(f"Unknown model: {model_name}")
 
 # ==================== MAIN CHATBOT CLASS ====================
 class AfiyaLinkChatBot:
     """Main healthcare chatbot with reliability and safety"""
 
-    def __init__(self):
-        self.database = MedicalDatabase()
-        self.safety_validator = SafetyValidator()
-        self.ai_manager = AIModelManager()
-        self.conversation_memory = {}
+    # English originals of the pre-translated bundles in data/emergency_responses.json
+    EMERGENCY_RESPONSE = response_bundles.bundle('emergency', 'en').text
+    SAFE_FALLBACK_RESPONSE = response_bundles.bundle('fallback', 'en').text
+
+    # Appended to replies for Islamic cultural background, keyed by intent
+    CULTURAL_NOTES = {
+        'medication': "🕌 Islamic Note: Most medications are halal when medically necessary. During Ramadan, consult your doctor about timing.",
+        'symptom_check': "🕌 Islamic Tradition: The Prophet (PBUH) recommended natural remedies like black seed and honey for healing.",
+        'emergency': "🕌 Islamic Principle: Preserving life (hifz al-nafs) is one of the highest priorities in Islam.",
+    }
+
+    def __init__(self, safety_validator: Optional[SafetyValidator] = None):
+        # Seconds spent in each part of construction, reported by /ready
+        self.startup_phases: Dict[str, float] = {}
+        mark = time.perf_counter()
+
+        def lap(phase: str):
+            nonlocal mark
+            now = time.perf_counter()
+            self.startup_phases[phase] = now - mark
+            mark = now
+
+        medical_database = MedicalDatabase()
+        self.database = AsyncMedicalDatabase(medical_database)
+        lap('database')
+        self.safety_validator = safety_validator or SafetyValidator()
+        lap('safety_rules')
+        self.ai_manager = AIModelManager(CostLedger(medical_database.pool, daily_limit=config.DAILY_AI_COST_LIMIT))
+        lap('ai_models')
+        self.response_cache = ResponseCache(
+            max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=config.RESPONSE_CACHE_MAX_BYTES,
+            ttl=config.RESPONSE_CACHE_TTL,
+            similarity_threshold=config.RESPONSE_CACHE_SIMILARITY
+        ) if config.RESPONSE_CACHE_ENABLED else None
+        self.translation_memory = TranslationMemory(medical_database.pool, max_entries=config.TRANSLATION_MEMORY_MAX_ENTRIES)
+        translation_service.translation_memory = self.translation_memory
+        lap('caches')
+        self.conversation_memory = self._create_conversation_memory(medical_database.pool)
+        self._background_tasks = set()
         self.request_count = 0
         self.emergency_count = 0
         self.start_time = datetime.now()
+        if metrics is not None:
+            self.instrument(metrics)
 
         logger.info("AfiyaLink Healthcare Chatbot initialized")
 
+    def instrument(self, registry: MetricsRegistry):
+        """Time each processing stage, provider call and database operation.
+
+        Wraps the methods on these instances only; without this call the
+        request path carries no instrumentation at all.
+        """
+        stages = registry.histogram('stage_duration_seconds', "Time spent in each chat processing stage", ('stage',))
+        stage_calls = registry.counter('stage_calls_total', "Chat processing stage calls by outcome", ('stage', 'outcome'))
+        for target, method, stage in (
+            (self, '_analyze', 'message_analysis'),
+            (self, '_analyze_batch', 'message_analysis_batch'),
+            (self, '_history', 'conversation_history'),
+            (self, '_generate_response', 'response_generation'),
+            (self.ai_manager, 'generate_response', 'llm'),
+            (self.ai_manager, 'stream_response', 'llm_stream_open'),
+            (self, '_try_database_response', 'database_response'),
+            (self.safety_validator, 'validate_response', 'safety_recheck'),
+            (self, '_cultural_note', 'cultural_adaptation'),
+            (self, '_translate', 'translation'),
+            (self, '_machine_translate', 'machine_translation'),
+            (self.database, 'log_interaction', 'log_write'),
+            (self.database, 'log_interactions', 'log_write_batch'),
+        ):
+            instrument(target, method, stages, stage, outcomes=stage_calls)
+
+        providers = registry.histogram('provider_call_duration_seconds', "AI provider call latency", ('provider',))
+        instrument(self.ai_manager, '_call_model', providers, label_from_args=lambda model_name, *args, **kwargs: model_name)
+
+        # The blocking database work itself, as run in the executor threads
+        operations = registry.histogram('db_operation_duration_seconds', "SQLite operation latency", ('operation',))
+        medical_database = self.database.database
+        for target, method, operation in (
+            (medical_database, 'search_symptom', 'search_symptom'),
+            (medical_database, 'get_emergency_protocol', 'get_emergency_protocol'),
+            (medical_database, 'log_interactions', 'log_interactions'),
+            (medical_database.log_writer, '_write', 'interaction_log_flush'),
+            (self.translation_memory, 'put', 'translation_memory_write'),
+        ):
+            instrument(target, method, operations, operation)
+
+        registry.add_collector(self._metric_families)
+
+    def _metric_families(self) -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+        """Counters the components keep anyway, read at scrape time"""
+        families = [
+            ('requests_total', 'counter', "Chat messages processed", [({}, self.request_count)]),
+            ('emergencies_total', 'counter', "Messages triaged as emergencies", [({}, self.emergency_count)]),
+            ('ai_cost_today_dollars', 'gauge', "AI spend today (UTC) across all workers", [({}, self.ai_manager.daily_cost)]),
+        ]
+
+        lookups = []
+        ratios = []
+        if self.response_cache is not None:
+            cache = self.response_cache.snapshot()
+            lookups += [({'cache': 'response', 'result': result}, cache[key])
+                        for result, key in (('exact_hit', 'exact_hits'), ('similar_hit', 'similar_hits'), ('miss', 'misses'))]
+            ratios.append(({'cache': 'response'}, cache['hit_rate']))
+        memory = self.translation_memory.stats()
+        lookups += [({'cache': 'translation_memory', 'result': result}, memory[key])
+                    for result, key in (('memory_hit', 'memory_hits'), ('disk_hit', 'disk_hits'), ('miss', 'misses'))]
+        ratios.append(({'cache': 'translation_memory'}, memory['hit_rate']))
+        families.append(('cache_lookups_total', 'counter', "Cache lookups by result", lookups))
+        families.append(('cache_hit_ratio', 'gauge', "Cache hit ratio since start", ratios))
+
+        routing = self.ai_manager.routing_stats()['providers']
+        families.append(('provider_requests_total', 'counter', "AI provider requests by outcome (streamed and hedged included)", [
+            ({'provider': name, 'outcome': outcome}, value)
+            for name, stats in routing.items()
+            for outcome, value in (('success', stats['requests'] - stats['failures']), ('failure', stats['failures']))
+        ]))
+        families.append(('provider_circuit_open', 'gauge', "1 while the provider's circuit breaker is open", [
+            ({'provider': name}, 1.0 if stats['circuit'] == 'open' else 0.0) for name, stats in routing.items()
+        ]))
+
+        pool = self.database.get_pool_stats()
+        families.append(('db_pool_wait_seconds', 'gauge', "Connection pool wait time over the recent window", [
+            ({'connection': connection, 'stat': stat}, pool[connection][f'wait_ms_{stat}'] / 1000)
+            for connection in ('reader', 'writer') for stat in ('p50', 'p95', 'p99', 'max')
+        ]))
+        families.append(('db_pool_timeouts_total', 'counter', "Connection pool acquisitions that timed out", [
+            ({'connection': connection}, pool[connection]['timeouts']) for connection in ('reader', 'writer')
+        ]))
+
+        log_writer = self.database.get_log_writer_stats()
+        families.append(('interaction_log_queue_depth', 'gauge', "Interaction log rows waiting to be written",
+                         [({}, log_writer['queue_depth'])]))
+        families.append(('interaction_log_rows_total', 'counter', "Interaction log rows by outcome", [
+            ({'outcome': outcome}, log_writer[outcome]) for outcome in ('written', 'dropped', 'failed')
+        ]))
+        return families
+
     async def process_message(self, message: str, user_id: str, language: str = "en", cultural_background: str = "general") -> ChatResponse:
         """Main message processing with full reliability"""
         start_time = time.time()
         request_id = f"req_{int(time.time() * 1000)}"
         self.request_count += 1
 
-        logger.info(f"Processing query {request_id}: {message[:50]}...")
-
         try:
-            # Step 1: Immediate emergency triage
-            safety_check = self.safety_validator.validate_input(message)
+            # Step 1: Immediate emergency triage - nothing slow runs before this returns.
+            # The same single pass over the message yields symptoms, intent and routing.
+            analysis = self._analyze(message)
+            safety_check = self.safety_validator.assess(analysis)
 
             if safety_check.emergency_detected:
                 self.emergency_count += 1
-                response = await self._handle_emergency(safety_check, request_id)
+                response = await self._handle_emergency(safety_check, request_id, language)
                 response.response_time = time.time() - start_time
 
-                # Log emergency
-                self.database.log_interaction(user_id, message, response.response, "critical", True)
+                # Log emergency (in-memory enqueue; emergency rows never wait for buffer space)
+                await self.database.log_interaction(user_id, message, response.response, "critical", True)
+                self._remember_turn(user_id, message, response.response)
                 return response
 
-            # Step 2: Extract symptoms and intent
-            symptoms = self._extract_symptoms(message)
-            intent = self._classify_intent(message)
-
-            # Step 3: Generate response with fallback levels
-            response = await self._generate_response(message, symptoms, intent, language, cultural_background, request_id)
-
-            # Step 4: Final safety validation
-            if response.used_ai_model:
-                if not self.safety_validator.validate_response(response.response):
-                    response = await self._safe_fallback_response(request_id)
-
-            # Step 5: Cultural adaptation
-            if cultural_background.lower() in ['islamic', 'muslim']:
-                response.response = self._add_cultural_context(response.response, symptoms, intent)
-
-            # Step 6: Translation if needed
-            if language != "en" and translation_available:
-                try:
-                    translated = translator.translate(response.response, dest=language)
-                    response.response = translated.text
-                except:
-                    pass  # Keep English if translation fails
+            logger.info(f"Processing query {request_id}: {message[:50]}...")
 
+            # Steps 3-6: Generate, validate and localize the reply
+            history = await self._history(user_id)
+            response = await self._answer(message, analysis, language, cultural_background, request_id, history)
             response.response_time = time.time() - start_time
+            self._remember_turn(user_id, message, response.response)
 
             # Log interaction
-            self.database.log_interaction(
+            await self.database.log_interaction(
                 user_id, message, response.response,
                 response.risk_level.value, response.emergency_alert
             )
@@ -675,7 +1212,7 @@ class AfiyaLinkChatBot:
             response_time = time.time() - start_time
 
             return ChatResponse(
-                response="I apologize for the technical issue. For any health concerns, please consult with a qualified healthcare professional or contact emergency services if urgent.",
+                response=response_bundles.bundle('error', language).text,
                 intent="error",
                 confidence=0.0,
                 risk_level=RiskLevel.LOW,
@@ -685,31 +1222,227 @@ class AfiyaLinkChatBot:
                 request_id=request_id
             )
 
-    async def _handle_emergency(self, safety_check: SafetyValidationResult, request_id: str) -> ChatResponse:
-        """Handle emergency situations immediately"""
-        logger.critical(f"🚨 EMERGENCY DETECTED in {request_id}")
+    async def _answer(self, message: str, analysis: Analysis, language: str, cultural_background: str, request_id: str, history: Sequence[Turn] = ()) -> ChatResponse:
+        """Steps 3-6 of process_message for a message that passed emergency triage"""
+        # Step 3: Generate response with fallback levels
+        response = await self._generate_response(message, analysis, language, cultural_background, request_id, history=history)
+
+        # Step 4: Final safety validation
+        if response.used_ai_model:
+            if not self.safety_validator.validate_response(response.response):
+                response = await self._safe_fallback_response(request_id)
+
+        # Steps 5-6: Cultural adaptation and translation
+        response.response = await self._localize_response(response.response, analysis.symptoms, analysis.intent, language, cultural_background)
+        return response
+
+    async def process_batch(self, requests: List[Tuple[str, str, str, str]]) -> List[Union[ChatResponse, Exception]]:
+        """process_message for many (message, user_id, language, cultural_background) items.
+
+        Message analysis (triage, symptoms, intent) runs as one scan over the whole batch,
+        identical questions are answered once, the rest are answered
+        concurrently (at most BATCH_AI_CONCURRENCY at a time) and every log
+        row is written in a single transaction. Results come back in request
+        order; an item that failed is returned as its exception. Batch items
+        are answered without conversation history and are not remembered.
+        """
+        start_time = time.time()
+        batch_id = f"req_{int(start_time * 1000)}"
+        self.request_count += len(requests)
+
+        messages = [message for message, _, _, _ in requests]
+        analyses = self._analyze_batch(messages)
+        safety_checks = [self.safety_validator.assess(analysis) for analysis in analyses]
+
+        results: List[Union[ChatResponse, Exception, None]] = [None] * len(requests)
+        unique: Dict[Tuple[str, str, str], List[int]] = {}
+        for index, ((message, _, language, cultural_background), safety_check) in enumerate(zip(requests, safety_checks)):
+            if safety_check.emergency_detected:
+                self.emergency_count += 1
+                results[index] = await self._handle_emergency(safety_check, f"{batch_id}_{index}", language)
+            else:
+                unique.setdefault((message, language, cultural_background), []).append(index)
+
+        logger.info(f"Processing batch {batch_id}: {len(requests)} items, "
+                    f"{len(requests) - sum(map(len, unique.values()))} emergencies, {len(unique)} distinct questions")
+
+        slots = asyncio.Semaphore(config.BATCH_AI_CONCURRENCY)
+
+        async def answer(key: Tuple[str, str, str], first: int) -> ChatResponse:
+            message, language, cultural_background = key
+            async with slots:
+                return await self._answer(message, analyses[first], language, cultural_background, f"{batch_id}_{first}")
+
+        answers = await asyncio.gather(*(answer(key, indexes[0]) for key, indexes in unique.items()),
+                                       return_exceptions=True)
+
+        response_time = time.time() - start_time
+        for indexes, answered in zip(unique.values(), answers):
+            if isinstance(answered, Exception):
+                logger.error(f"Error processing batch item {batch_id}_{indexes[0]}: {answered}")
+            for index in indexes:
+                if isinstance(answered, Exception):
+                    results[index] = answered
+                else:
+                    # Duplicates share the answer but keep their own request id
+                    results[index] = replace(answered, request_id=f"{batch_id}_{index}")
+
+        log_rows = []
+        for (message, user_id, _, _), result in zip(requests, results):
+            if isinstance(result, ChatResponse):
+                result.response_time = response_time
+                log_rows.append((user_id, message, result.response, result.risk_level.value, result.emergency_alert))
+        await self.database.log_interactions(log_rows)
+
+        return results
+
+    async def stream_message(self, message: str, user_id: str, language: str = "en", cultural_background: str = "general") -> AsyncIterator[Tuple[str, Dict]]:
+        """Streaming variant of process_message yielding (event, data) frames.
+
+        Frames: 'triage' (sent before any slow work), 'token' (AI text as the
+        model produces it, English only), 'message' (full text, replacing any
+        tokens already sent) and a final 'done' with the response metadata.
+        """
+        start_time = time.time()
+        request_id = f"req_{int(time.time() * 1000)}"
+        self.request_count += 1
 
-        emergency_response = """🚨 MEDICAL EMERGENCY DETECTED 🚨
+        logger.info(f"Streaming query {request_id}: {message[:50]}...")
 
-CALL EMERGENCY SERVICES IMMEDIATELY:
-• US: 911
-• UK: 999
-• EU: 112
-• India: 102
+        try:
+            # Step 1: Immediate emergency triage, from the single analysis pass
+            analysis = self._analyze(message)
+            safety_check = self.safety_validator.assess(analysis)
 
-IMMEDIATE ACTIONS:
-• Stay calm and call for help
-• Follow dispatcher instructions exactly
-• Stay with the person if safe to do so
-• Be prepared for CPR if trained
-• Do not move the person unless in immediate danger
+            if safety_check.emergency_detected:
+                self.emergency_count += 1
+                yield "triage", {
+                    "request_id": request_id,
+                    "emergency_alert": True,
+                    "safety_level": safety_check.safety_level.value,
+                    "warnings": safety_check.warnings
+                }
 
-⚠️ TIME IS CRITICAL - EVERY SECOND COUNTS
+                response = await self._handle_emergency(safety_check, request_id, language)
+                yield "message", {"text": response.response}
 
-This is a life-threatening situation requiring immediate professional medical intervention."""
+                response.response_time = time.time() - start_time
+                await self.database.log_interaction(user_id, message, response.response, "critical", True)
+                self._remember_turn(user_id, message, response.response)
+                yield "done", self._stream_metadata(response)
+                return
+
+            # Step 2: Symptoms and intent come from the same analysis
+            symptoms = analysis.symptoms
+            intent = analysis.intent
+            yield "triage", {
+                "request_id": request_id,
+                "emergency_alert": False,
+                "safety_level": safety_check.safety_level.value,
+                "intent": intent,
+                "symptoms": symptoms
+            }
+
+            # Step 3: Stream the AI response, validating it as it arrives
+            response = None
+            sent_text = ""
+            history = await self._history(user_id)
+            if self.ai_manager.models and not history:
+                response = self._cached_ai_response(message, language, cultural_background, symptoms)
+
+            if response is None and self.ai_manager.models and await self.ai_manager.within_budget():
+                stream = await self.ai_manager.stream_response(self._build_ai_prompt(message, language, cultural_background, history))
+                if stream:
+                    # Translated answers can only be sent once complete
+                    send_tokens = language == "en" or translator.failed
+                    validator = self.safety_validator.stream_validator()
+                    try:
+                        async for text in guarded_stream(validator, stream):
+                            if send_tokens:
+                                sent_text += text
+                                yield "token", {"text": text}
+                    except UnsafeStreamError as e:
+                        logger.warning(f"Streamed AI response rejected in {request_id}: {e}")
+
+                    # Step 4: Final safety validation
+                    if validator.is_safe:
+                        if self.response_cache is not None and not history:
+                            self.response_cache.put(message, language, cultural_background, validator.text, stream.cost, symptoms)
+                        response = ChatResponse(
+                            response=validator.text,
+                            intent="health_query",
+                            confidence=0.85,
+                            risk_level=RiskLevel.LOW,
+                            used_ai_model="ai_enhanced",
+                            cost_estimate=stream.cost
+                        )
+                    else:
+                        if self.response_cache is not None and not history:
+                            self.response_cache.record_rejected()
+                        response = await self._safe_fallback_response(request_id)
+                        response.cost_estimate = stream.cost
+
+            # Database and rule-based levels are not streamed
+            if response is None:
+                response = await self._generate_response(message, analysis, "en", cultural_background, request_id, use_ai=False)
+            response.request_id = response.request_id or request_id
+
+            # Steps 5-6: Cultural adaptation and translation
+            response.response = await self._localize_response(response.response, symptoms, intent, language, cultural_background)
+            if sent_text and response.response.startswith(sent_text):
+                remainder = response.response[len(sent_text):]
+                if remainder:
+                    yield "token", {"text": remainder}
+            else:
+                yield "message", {"text": response.response}
 
+            response.response_time = time.time() - start_time
+
+            # Log interaction
+            await self.database.log_interaction(
+                user_id, message, response.response,
+                response.risk_level.value, response.emergency_alert
+            )
+            self._remember_turn(user_id, message, response.response)
+
+            yield "done", self._stream_metadata(response)
+
+        except Exception as e:
+            logger.error(f"Error streaming query {request_id}: {e}")
+            yield "error", {"text": response_bundles.bundle('error', language).text}
+            yield "done", self._stream_metadata(ChatResponse(
+                response="",
+                intent="error",
+                confidence=0.0,
+                risk_level=RiskLevel.LOW,
+                requires_human_intervention=True,
+                response_time=time.time() - start_time,
+                request_id=request_id
+            ))
+
+    def _stream_metadata(self, response: ChatResponse) -> Dict:
+        """Final frame of a streamed response"""
+        return {
+            "intent": response.intent,
+            "confidence": response.confidence,
+            "risk_level": response.risk_level.value,
+            "emergency_alert": response.emergency_alert,
+            "requires_human_intervention": response.requires_human_intervention,
+            "used_ai_model": response.used_ai_model,
+            "cost_estimate": response.cost_estimate,
+            "response_time": response.response_time,
+            "request_id": response.request_id
+        }
+
+    async def _handle_emergency(self, safety_check: SafetyValidationResult, request_id: str, language: str = "en") -> ChatResponse:
+        """Handle emergency situations immediately.
+
+        The text comes pre-translated from the emergency bundle; the alert
+        itself is logged by the endpoint's background task once the
+        response has gone out.
+        """
         return ChatResponse(
-            response=emergency_response,
+            response=response_bundles.bundle('emergency', language).text,
             intent="emergency",
             confidence=1.0,
             risk_level=RiskLevel.CRITICAL,
@@ -718,45 +1451,46 @@ This is a life-threatening situation requiring immediate professional medical in
             request_id=request_id
         )
 
-    async def _generate_response(self, message: str, symptoms: List[str], intent: str, language: str, cultural_background: str, request_id: str) -> ChatResponse:
+    async def _generate_response(self, message: str, analysis: Analysis, language: str, cultural_background: str, request_id: str, use_ai: bool = True, history: Sequence[Turn] = ()) -> ChatResponse:
         """Generate response with multiple fallback levels"""
+        symptoms = analysis.symptoms
 
         # Level 1: Try AI-enhanced response
-        if self.ai_manager.models and self.ai_manager.daily_cost < config.DAILY_AI_COST_LIMIT:
-            ai_response = await self._try_ai_response(message, language, cultural_background)
+        if use_ai and self.ai_manager.models and await self.ai_manager.within_budget():
+            ai_response = await self._try_ai_response(message, language, cultural_background, symptoms, history)
             if ai_response:
                 return ai_response
 
         # Level 2: Database-driven response
         if symptoms:
-            db_response = await self._try_database_response(symptoms[0], intent, request_id)
+            db_response = await self._try_database_response(symptoms[0], analysis.intent, request_id)
             if db_response:
                 return db_response
 
         # Level 3: Rule-based response (always works)
-        return await self._rule_based_response(message, intent, request_id)
+        return await self._rule_based_response(analysis, request_id)
 
-    async def _try_ai_response(self, message: str, language: str, cultural_background: str) -> Optional[ChatResponse]:
-        """Try to generate AI-enhanced response"""
-        try:
-            prompt = f"""You are AfiyaLink, a reliable healthcare assistant. Follow these CRITICAL safety guidelines:
+    async def _try_ai_response(self, message: str, language: str, cultural_background: str, symptoms: Optional[List[str]] = None, history: Sequence[Turn] = ()) -> Optional[ChatResponse]:
+        """Try to generate AI-enhanced response.
 
-SAFETY REQUIREMENTS:
-1. NEVER provide definitive diagnoses
-2. ALWAYS recommend consulting healthcare professionals
-3. Include appropriate medical disclaimers
-4. Be culturally sensitive, especially for Islamic healthcare needs
-5. Provide general information only
-
-User Query: "{message}"
-Language: {language}
-Cultural Background: {cultural_background}
+        With conversation history the answer depends on more than the
+        message, so the response cache is neither read nor written.
+        """
+        if symptoms is None:
+            symptoms = self._extract_symptoms(message)
 
-Respond with reliable, safe, general health information (under 300 words) while emphasizing professional medical consultation."""
+        try:
+            if not history:
+                cached = self._cached_ai_response(message, language, cultural_background, symptoms)
+                if cached:
+                    return cached
 
+            prompt = self._build_ai_prompt(message, language, cultural_background, history)
             ai_response, cost = await self.ai_manager.generate_response(prompt)
 
             if ai_response:
+                if not history:
+                    self._cache_ai_response(message, language, cultural_background, symptoms, ai_response, cost)
                 return ChatResponse(
                     response=ai_response,
                     intent="health_query",
@@ -771,10 +1505,119 @@ Respond with reliable, safe, general health information (under 300 words) while
 
         return None
 
+    def _cached_ai_response(self, message: str, language: str, cultural_background: str, symptoms: List[str]) -> Optional[ChatResponse]:
+        """Previously validated AI answer to an equivalent question"""
+        if self.response_cache is None:
+            return None
+
+        cached = self.response_cache.get(message, language, cultural_background, symptoms)
+        if not cached:
+            return None
+
+        logger.info(f"AI response cache {cached.tier} hit (similarity {cached.similarity:.2f})")
+        return ChatResponse(
+            response=cached.response,
+            intent="health_query",
+            confidence=0.85,
+            risk_level=RiskLevel.LOW,
+            used_ai_model="ai_cached",
+            cost_estimate=0.0
+        )
+
+    def _cache_ai_response(self, message: str, language: str, cultural_background: str, symptoms: List[str], response: str, cost: float):
+        """Cache an AI answer, but only if it passes response validation"""
+        if self.response_cache is None:
+            return
+
+        if self.safety_validator.validate_response(response):
+            self.response_cache.put(message, language, cultural_background, response, cost, symptoms)
+        else:
+            self.response_cache.record_rejected()
+
+    def get_response_cache_stats(self) -> Dict:
+        """Hit rate and money saved, next to what was actually spent"""
+        if self.response_cache is None:
+            return {'enabled': False}
+
+        stats = self.response_cache.snapshot()
+        spent = self.ai_manager.daily_cost
+        saved = stats['cost_saved']
+        return {
+            'enabled': True,
+            **stats,
+            'daily_ai_cost': spent,
+            'savings_ratio': saved / (saved + spent) if saved + spent else 0.0
+        }
+
+    def _build_ai_prompt(self, message: str, language: str, cultural_background: str, history: Sequence[Turn] = ()) -> str:
+        """Safety-framed prompt for the AI models"""
+        conversation = ""
+        if history:
+            exchanges = "\n".join(f'User: "{turn.user_text}"\nAfiyaLink: "{turn.reply}"' for turn in history)
+            conversation = f"Earlier in this conversation (oldest first):\n{exchanges}\n\n"
+
+        return f"""You are AfiyaLink, a reliable healthcare assistant. Follow these CRITICAL safety guidelines:
+
+SAFETY REQUIREMENTS:
+1. NEVER provide definitive diagnoses
+2. ALWAYS recommend consulting healthcare professionals
+3. Include appropriate medical disclaimers
+4. Be culturally sensitive, especially for Islamic healthcare needs
+5. Provide general information only
+
+{conversation}User Query: "{message}"
+Language: {language}
+Cultural Background: {cultural_background}
+
+Respond with reliable, safe, general health information (under 300 words) while emphasizing professional medical consultation."""
+
+    @staticmethod
+    def _create_conversation_memory(pool):
+        """Session store for the configured backend, or None when disabled"""
+        backend = config.CONVERSATION_MEMORY_BACKEND
+        if backend == 'off':
+            return None
+        if backend == 'sqlite':
+            return SQLiteConversationStore(pool, max_turns=config.CONVERSATION_MAX_TURNS, ttl=config.CONVERSATION_TTL)
+        if backend != 'memory':
+            logger.warning(f"Unknown CONVERSATION_MEMORY_BACKEND '{backend}' - using in-process memory")
+        return ConversationStore(
+            max_turns=config.CONVERSATION_MAX_TURNS,
+            max_sessions=config.CONVERSATION_MAX_SESSIONS,
+            max_bytes=config.CONVERSATION_MAX_BYTES,
+            ttl=config.CONVERSATION_TTL
+        )
+
+    async def _history(self, user_id: str) -> List[Turn]:
+        """Recent turns of the user's conversation that fit the prompt's history budget"""
+        store = self.conversation_memory
+        # Only AI answers use the history
+        if store is None or not self.ai_manager.models:
+            return []
+        turns = await asyncio.to_thread(store.recent, user_id) if store.blocking else store.recent(user_id)
+        return history_within_budget(turns, config.CONVERSATION_HISTORY_TOKENS, estimate_tokens)
+
+    def _remember_turn(self, user_id: str, message: str, reply: str):
+        """Add a turn to the user's conversation without holding up the reply"""
+        store = self.conversation_memory
+        if store is None:
+            return
+        if not store.blocking:
+            store.append(user_id, message, reply)
+            return
+        task = asyncio.create_task(asyncio.to_thread(store.append, user_id, message, reply))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def wait_background_tasks(self):
+        """Let pending conversation writes and AI cost settlements finish (before the database is closed)"""
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        await self.ai_manager.wait_settlements()
+
     async def _try_database_response(self, symptom: str, intent: str, request_id: str) -> Optional[ChatResponse]:
         """Try to generate database-driven response"""
         try:
-            symptom_info = self.database.search_symptom(symptom)
+            symptom_info = await self.database.search_symptom(symptom)
 
             if symptom_info and symptom_info.get('reliability_score', 0) > 0.7:
                 response_text = self._format_symptom_response(symptom_info)
@@ -792,23 +1635,21 @@ Respond with reliable, safe, general health information (under 300 words) while
 
         return None
 
-    async def _rule_based_response(self, message: str, intent: str, request_id: str) -> ChatResponse:
+    async def _rule_based_response(self, analysis: Analysis, request_id: str) -> ChatResponse:
         """Generate rule-based response (always works)"""
 
-        message_lower = message.lower()
-
-        if any(word in message_lower for word in ['pain', 'hurt', 'ache', 'feel', 'sick']):
+        if analysis.route == 'symptom':
             response = self._generate_symptom_response()
-        elif any(word in message_lower for word in ['appointment', 'book', 'schedule', 'doctor']):
+        elif analysis.route == 'appointment':
             response = self._generate_appointment_response()
-        elif any(word in message_lower for word in ['medicine', 'medication', 'drug', 'pill']):
+        elif analysis.route == 'medication':
             response = self._generate_medication_response()
         else:
             response = self._generate_general_response()
 
         return ChatResponse(
             response=response,
-            intent=intent,
+            intent=analysis.intent,
             confidence=0.7,
             risk_level=RiskLevel.LOW,
             request_id=request_id
@@ -816,23 +1657,8 @@ Respond with reliable, safe, general health information (under 300 words) while
 
     async def _safe_fallback_response(self, request_id: str) -> ChatResponse:
         """Ultimate safe fallback response"""
-        response = """I apologize, but I'm experiencing technical difficulties.
-
-For any health concerns:
-🏥 Please consult with a qualified healthcare professional
-📞 Contact your doctor or healthcare provider
-🚨 For emergencies, call emergency services immediately
-
-Emergency Numbers:
-• US: 911
-• UK: 999
-• EU: 112
-• India: 102
-
-Your health and safety are the top priority."""
-
         return ChatResponse(
-            response=response,
+            response=self.SAFE_FALLBACK_RESPONSE,
             intent="system_fallback",
             confidence=1.0,
             risk_level=RiskLevel.LOW,
@@ -840,39 +1666,21 @@ Your health and safety are the top priority."""
             request_id=request_id
         )
 
-    def _extract_symptoms(self, text: str) -> List[str]:
-        """Extract potential symptoms from text"""
-        common_symptoms = [
-            'headache', 'fever', 'cough', 'pain', 'nausea', 'fatigue', 'dizzy',
-            'chest pain', 'back pain', 'stomach ache', 'sore throat', 'runny nose',
-            'shortness of breath', 'difficulty breathing'
-        ]
-
-        text_lower = text.lower()
-        found_symptoms = []
+    def _analyze(self, text: str) -> Analysis:
+        """Triage hits, symptoms, intent and route of a message in one pass"""
+        return self.safety_validator.analyzer.analyze(text)
 
-        for symptom in common_symptoms:
-            if symptom in text_lower:
-                found_symptoms.append(symptom)
+    def _analyze_batch(self, texts: List[str]) -> List[Analysis]:
+        """_analyze for many texts with one scan over all of them"""
+        return self.safety_validator.analyzer.analyze_many(texts)
 
-        return found_symptoms
+    def _extract_symptoms(self, text: str) -> List[str]:
+        """Extract potential symptoms from text"""
+        return self._analyze(text).symptoms
 
     def _classify_intent(self, text: str) -> str:
         """Simple intent classification"""
-        text_lower = text.lower()
-
-        if any(word in text_lower for word in ['emergency', 'urgent', 'help', 'severe']):
-            return 'emergency'
-        elif any(word in text_lower for word in ['pain', 'hurt', 'sick', 'feel']):
-            return 'symptom_check'
-        elif any(word in text_lower for word in ['appointment', 'book', 'schedule']):
-            return 'appointment'
-        elif any(word in text_lower for word in ['medicine', 'medication', 'drug']):
-            return 'medication'
-        elif any(word in text_lower for word in ['halal', 'haram', 'islamic', 'ramadan']):
-            return 'cultural_health'
-        else:
-            return 'general_health'
+        return self._analyze(text).intent
 
     def _format_symptom_response(self, symptom_info: Dict) -> str:
         """Format symptom information into user response"""
@@ -981,20 +1789,92 @@ For medication emergencies or severe side effects, seek immediate medical attent
 
 Please feel free to ask specific health-related questions, and I'll provide reliable, general information while always recommending professional medical consultation when appropriate."""
 
-    def _add_cultural_context(self, response: str, symptoms: List[str], intent: str) -> str:
-        """Add Islamic cultural context to responses"""
+    async def _localize_response(self, response: str, symptoms: List[str], intent: str, language: str, cultural_background: str) -> str:
+        """Cultural adaptation followed by translation"""
+        note = None
+        if cultural_background.lower() in ['islamic', 'muslim']:
+            note = self._cultural_note(response, symptoms, intent)
+
+        # The reply and the note are translated separately so both stay reusable from translation memory
+        response = await self._translate(response, language)
+        if note:
+            response += "\n\n" + await self._translate(note, language)
+
+        return response
+
+    def _cultural_note(self, response: str, symptoms: List[str], intent: str) -> Optional[str]:
+        """Islamic cultural context to add to a response, if any"""
         if intent == 'medication' and 'cultural note' not in response.lower():
-            response += "\n\n🕌 Islamic Note: Most medications are halal when medically necessary. During Ramadan, consult your doctor about timing."
+            return self.CULTURAL_NOTES['medication']
 
         elif intent == 'symptom_check' and any(symptom in ['fever', 'headache'] for symptom in symptoms):
-            response += "\n\n🕌 Islamic Tradition: The Prophet (PBUH) recommended natural remedies like black seed and honey for healing."
+            return self.CULTURAL_NOTES['symptom_check']
 
         elif intent == 'emergency':
-            response += "\n\n🕌 Islamic Principle: Preserving life (hifz al-nafs) is one of the highest priorities in Islam."
+            return self.CULTURAL_NOTES['emergency']
 
-        return response
+        return None
+
+    async def _translate(self, text: str, language: str) -> str:
+        """English text in `language`, from translation memory when possible"""
+        if language == "en" or translator.failed:
+            return text
+
+        translated = await self.translation_memory.translate(text, "en", language, self._machine_translate)
+        return translated or text  # Keep English if translation fails
 
-    def get_system_status(self) -> Dict:
+    async def _machine_translate(self, text: str, source: str, target: str) -> Optional[str]:
+        client = await translator.aget()
+        if client is None:
+            return None
+
+        try:
+            translated = await asyncio.to_thread(client.translate, text, src=source, dest=target)
+            if inspect.isawaitable(translated):
+                # googletrans 4.0.2+ is async
+                translated = await translated
+            return translated.text
+        except Exception as e:
+            logger.warning(f"Translation to {target} failed: {e}")
+            return None
+
+    async def _static_responses(self) -> List[str]:
+        """Every canned reply text, including formatted database answers"""
+        texts = [
+            self.EMERGENCY_RESPONSE,
+            self.SAFE_FALLBACK_RESPONSE,
+            self._generate_symptom_response(),
+            self._generate_appointment_response(),
+            self._generate_medication_response(),
+            self._generate_general_response(),
+            *self.CULTURAL_NOTES.values(),
+        ]
+        for symptom in self.safety_validator.lexicon.symptoms:
+            symptom_info = await self.database.search_symptom(symptom)
+            if symptom_info and symptom_info.get('reliability_score', 0) > 0.7:
+                texts.append(self._format_symptom_response(symptom_info))
+        return texts
+
+    async def prewarm_translations(self, languages: List[str]) -> int:
+        """Fill translation memory with every canned reply in `languages`"""
+        if await translator.aget() is None:
+            return 0
+
+        started = time.time()
+        # Reviewed translations of the bundled responses take precedence over machine translation
+        for (kind, language), bundle in response_bundles.BUNDLES.items():
+            if language != "en":
+                english = response_bundles.bundle(kind, "en").text
+                if await self.translation_memory.lookup(english, "en", language) != bundle.text:
+                    await asyncio.to_thread(self.translation_memory.put, english, "en", language, bundle.text)
+
+        texts = await self._static_responses()
+        added = await self.translation_memory.prewarm(texts, "en", languages, self._machine_translate)
+        logger.info(f"Translation memory pre-warmed: {added} new translations of {len(texts)} texts "
+                    f"into {', '.join(languages)} in {time.time() - started:.1f}s")
+        return added
+
+    async def get_system_status(self) -> Dict:
         """Get system health and statistics"""
         uptime_hours = (datetime.now() - self.start_time).total_seconds() / 3600
 
@@ -1021,9 +1901,18 @@ Please feel free to ask specific health-related questions, and I'll provide reli
             'emergency_responses': self.emergency_count,
             'memory_usage_percent': memory_usage,
             'cpu_usage_percent': cpu_usage,
-            'daily_ai_cost': self.ai_manager.daily_cost,
+            'daily_ai_cost': await self.ai_manager.spent_today(),
+            'ai_cost_ledger': await asyncio.to_thread(self.ai_manager.cost_ledger.summary),
+            'translation_memory': self.translation_memory.stats(),
+            'conversation_memory': self.conversation_memory.stats() if self.conversation_memory is not None else {'enabled': False},
             'ai_models_available': len(self.ai_manager.models),
+            'ai_routing': self.ai_manager.routing_stats(),
+            'ai_coalescing': self.ai_manager.coalescing_stats(),
+            'response_cache': self.get_response_cache_stats(),
             'database_status': 'healthy',
+            'database_pool': self.database.get_pool_stats(),
+            'interaction_log_writer': self.database.get_log_writer_stats(),
+            'reference_index': self.database.get_reference_index_stats(),
             'last_check': datetime.now().isoformat()
         }
 
@@ -1032,25 +1921,77 @@ Please feel free to ask specific health-related questions, and I'll provide reli
 # Global chatbot instance
 chatbot = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan management"""
+# Emergency triage needs no database, so it works while the chatbot is still starting
+triage_validator = SafetyValidator()
+
+# Readiness, separate from /health (which only says the process is up)
+startup_state = {
+    'ready': False,
+    'error': None,
+    'seconds_to_ready': None,
+    'phases': {},
+}
+
+def optional_components() -> List[LazyResource]:
+    """Everything loaded on first use that the warm-up should load ahead of time"""
+    components = [nlp_model, sentiment_analyzer, translator, translation_service.client]
+    if chatbot is not None:
+        components.extend(chatbot.ai_manager.models.resources())
+    return components
+
+async def start_chatbot(started: float):
+    """Build the chatbot off the event loop, then warm everything else in parallel"""
     global chatbot
 
-    # Startup
-    logger.info("Starting AfiyaLink Healthcare Chatbot...")
-
     try:
-        chatbot = AfiyaLinkChatBot()
-        logger.info("AfiyaLink Healthcare Chatbot started successfully")
-        yield
-
+        chatbot = await asyncio.to_thread(AfiyaLinkChatBot, triage_validator)
     except Exception as e:
+        startup_state['error'] = str(e)
         logger.error(f"❌ Startup failed: {e}")
-        raise
+        return
+
+    startup_state['phases'] = chatbot.startup_phases
+    startup_state['seconds_to_ready'] = time.perf_counter() - started
+    startup_state['ready'] = True
+    logger.info(f"AfiyaLink Healthcare Chatbot ready in {startup_state['seconds_to_ready']:.2f}s")
+
+    warmups = []
+    if config.STARTUP_WARMUP_ENABLED:
+        warmups.append(warm_up(optional_components()))
+    # Translate canned replies in the background; requests are served meanwhile
+    if config.TRANSLATION_PREWARM_ENABLED and config.TRANSLATION_PREWARM_LANGUAGES:
+        warmups.append(chatbot.prewarm_translations(config.TRANSLATION_PREWARM_LANGUAGES))
+
+    for result in await asyncio.gather(*warmups, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.warning(f"Background warm-up failed: {result}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan management.
+
+    The server starts accepting traffic straight away; the chatbot (database
+    migrations, seed data, indexes) is built in the background and /ready
+    reports when it can serve chat requests.
+    """
+    # Startup
+    logger.info("Starting AfiyaLink Healthcare Chatbot...")
+    startup_task = asyncio.create_task(start_chatbot(time.perf_counter()))
+    yield
 
     # Shutdown
     logger.info("Shutting down AfiyaLink Healthcare Chatbot...")
+    startup_task.cancel()
+    try:
+        await startup_task
+    except asyncio.CancelledError:
+        pass
+    if chatbot:
+        await chatbot.wait_background_tasks()
+        await chatbot.database.flush_logs()
+        await chatbot.database.close()
+        await chatbot.ai_manager.close()
+    await translation_service.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -1069,6 +2010,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Medical text translation (/translate)
+app.include_router(translate_router.router)
+
 # ==================== REQUEST/RESPONSE MODELS ====================
 
 class HealthChatRequest(BaseModel):
@@ -1095,6 +2039,18 @@ class HealthChatResponse(BaseModel):
     response_time: float
     request_id: str
 
+class HealthChatBatchRequest(BaseModel):
+    items: List[HealthChatRequest] = Field(..., min_length=1, max_length=config.BATCH_MAX_ITEMS)
+
+class HealthChatBatchItem(BaseModel):
+    index: int
+    result: Optional[HealthChatResponse] = None
+    error: Optional[str] = None
+
+class HealthChatBatchResponse(BaseModel):
+    results: List[HealthChatBatchItem]
+    response_time: float
+
 # ==================== API ENDPOINTS ====================
 
 @app.get("/")
@@ -1115,9 +2071,13 @@ async def root():
         ],
         "endpoints": {
             "health_chat": "/api/v1/health-chat",
+            "health_chat_stream": "/api/v1/health-chat/stream",
+            "health_chat_batch": "/api/v1/health-chat/batch",
             "emergency": "/api/v1/emergency",
             "system_status": "/api/v1/system-status",
-            "health_check": "/health"
+            "metrics": "/api/v1/metrics",
+            "health_check": "/health",
+            "readiness_check": "/ready"
         },
         "setup": "Single file implementation - no import issues!"
     }
@@ -1133,6 +2093,18 @@ async def health_check():
         "chatbot_ready": chatbot is not None
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once chat requests can be served, 503 until then"""
+    body = {
+        "ready": startup_state['ready'],
+        "error": startup_state['error'],
+        "seconds_to_ready": startup_state['seconds_to_ready'],
+        "startup_phases": startup_state['phases'],
+        "warmup": {component.name: component.stats() for component in optional_components()},
+    }
+    return JSONResponse(content=body, status_code=200 if startup_state['ready'] else 503)
+
 @app.post("/api/v1/health-chat", response_model=HealthChatResponse)
 async def health_chat(
         request: HealthChatRequest,
@@ -1141,6 +2113,18 @@ async def health_chat(
     """Main healthcare chat endpoint"""
 
     if not chatbot:
+        # Still starting up: emergencies are answered anyway, everything else waits
+        if triage_validator.validate_input(request.message).emergency_detected:
+            request_id = f"req_{int(time.time() * 1000)}"
+            background_tasks.add_task(
+                log_emergency_alert,
+                user_id=request.user_id,
+                query=request.message,
+                response_id=request_id
+            )
+            bundle = response_bundles.bundle('emergency', request.language)
+            return Response(content=bundle.render_json(0.0, request_id), media_type="application/json")
+
         raise HTTPException(
             status_code=503,
             detail="Healthcare chatbot service temporarily unavailable"
@@ -1163,6 +2147,12 @@ async def health_chat(
                 query=request.message,
                 response_id=result.request_id
             )
+            # Pre-serialized body: no model validation or JSON encoding on the emergency path
+            bundle = response_bundles.bundle('emergency', request.language)
+            return Response(
+                content=bundle.render_json(result.response_time, result.request_id),
+                media_type="application/json"
+            )
 
         return HealthChatResponse(
             response=result.response,
@@ -1184,28 +2174,142 @@ async def health_chat(
             detail="System error - for medical emergencies call emergency services immediately"
         )
 
+@app.post("/api/v1/health-chat/batch", response_model=HealthChatBatchResponse)
+async def health_chat_batch(
+        request: HealthChatBatchRequest,
+        background_tasks: BackgroundTasks
+):
+    """Batch healthcare chat endpoint; results are in request order"""
+
+    if not chatbot:
+        raise HTTPException(
+            status_code=503,
+            detail="Healthcare chatbot service temporarily unavailable"
+        )
+
+    start_time = time.time()
+    try:
+        results = await chatbot.process_batch([
+            (item.message, item.user_id, item.language, item.cultural_background)
+            for item in request.items
+        ])
+    except Exception as e:
+        logger.error(f"Critical error in batch health chat: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="System error - for medical emergencies call emergency services immediately"
+        )
+
+    items = []
+    for index, (item, result) in enumerate(zip(request.items, results)):
+        if isinstance(result, Exception):
+            items.append(HealthChatBatchItem(
+                index=index,
+                error="Processing failed - for medical emergencies call emergency services immediately"
+            ))
+            continue
+
+        # Log emergency alerts in background
+        if result.emergency_alert:
+            background_tasks.add_task(
+                log_emergency_alert,
+                user_id=item.user_id,
+                query=item.message,
+                response_id=result.request_id
+            )
+        items.append(HealthChatBatchItem(index=index, result=HealthChatResponse(
+            response=result.response,
+            intent=result.intent,
+            confidence=result.confidence,
+            risk_level=result.risk_level.value,
+            emergency_alert=result.emergency_alert,
+            requires_human_intervention=result.requires_human_intervention,
+            used_ai_model=result.used_ai_model,
+            cost_estimate=result.cost_estimate,
+            response_time=result.response_time,
+            request_id=result.request_id
+        )))
+
+    return HealthChatBatchResponse(results=items, response_time=time.time() - start_time)
+
+@app.post("/api/v1/health-chat/stream")
+async def health_chat_stream(
+        request: HealthChatRequest,
+        background_tasks: BackgroundTasks
+):
+    """Streaming healthcare chat endpoint (Server-Sent Events)"""
+
+    if not chatbot:
+        raise HTTPException(
+            status_code=503,
+            detail="Healthcare chatbot service temporarily unavailable"
+        )
+
+    async def event_stream():
+        emergency = False
+        async for event, data in chatbot.stream_message(
+            message=request.message,
+            user_id=request.user_id,
+            language=request.language,
+            cultural_background=request.cultural_background
+        ):
+            # Log emergency alerts in background once the stream completes
+            if event == "triage" and data.get("emergency_alert"):
+                emergency = True
+                background_tasks.add_task(
+                    log_emergency_alert,
+                    user_id=request.user_id,
+                    query=request.message,
+                    response_id=data["request_id"]
+                )
+            if emergency and event == "message":
+                # The emergency text is a bundle whose SSE frame is encoded once at startup
+                yield response_bundles.bundle('emergency', request.language).sse_message
+                continue
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks
+    )
+
+def format_sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# Static payload, encoded once
+EMERGENCY_ENDPOINT_BODY = json.dumps({
+    "message": "🚨 MEDICAL EMERGENCY 🚨",
+    "immediate_actions": [
+        "Call emergency services IMMEDIATELY",
+        "US: 911 | UK: 999 | EU: 112 | India: 102",
+        "Stay with the person if safe to do so",
+        "Follow dispatcher instructions exactly",
+        "Be prepared for CPR if trained"
+    ],
+    "critical_reminder": "TIME IS CRITICAL - EVERY SECOND COUNTS",
+    "response_time": "immediate",
+    "reliability": "maximum"
+}, ensure_ascii=False).encode('utf-8')
+
 @app.post("/api/v1/emergency")
 async def emergency_endpoint():
     """Immediate emergency response"""
-    return {
-        "message": "🚨 MEDICAL EMERGENCY 🚨",
-        "immediate_actions": [
-            "Call emergency services IMMEDIATELY",
-            "US: 911 | UK: 999 | EU: 112 | India: 102",
-            "Stay with the person if safe to do so",
-            "Follow dispatcher instructions exactly",
-            "Be prepared for CPR if trained"
-        ],
-        "critical_reminder": "TIME IS CRITICAL - EVERY SECOND COUNTS",
-        "response_time": "immediate",
-        "reliability": "maximum"
-    }
+    return Response(content=EMERGENCY_ENDPOINT_BODY, media_type="application/json")
+
+@app.get("/api/v1/metrics")
+async def get_metrics():
+    """Stage latencies, provider, cache and database metrics in Prometheus text format"""
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    return Response(content=metrics.render(), media_type=metrics_module.CONTENT_TYPE)
 
 @app.get("/api/v1/system-status")
 async def get_system_status():
     """Get system health and reliability metrics"""
     if chatbot:
-        return chatbot.get_system_status()
+        return await chatbot.get_system_status()
     return {"status": "service_not_ready"}
 
 # ==================== BACKGROUND TASKS ====================
@@ -1,13 +1,63 @@
+import asyncio
+import json
+from typing import AsyncIterator, Dict
+
 from fastapi import APIRouter
-from .schemas.translate_schema import TranslateRequest
-from .services.translation_service import refine_medical_text, simple_translate
+from fastapi.responses import StreamingResponse
+from schemas.translate_schema import TranslateRequest
+from services.translation_service import refine_medical_text, simple_translate
 
 router = APIRouter()
 
+def format_sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def fast_translation_events(request: TranslateRequest) -> AsyncIterator[str]:
+    """Translate the raw text while it is being refined; the provisional result streams first"""
+    provisional = asyncio.ensure_future(
+        simple_translate(request.text, request.source_language, request.target_language)
+    )
+    refinement = asyncio.ensure_future(refine_medical_text(request.text))
+    final = None
+    sent_provisional = False
+    try:
+        while final is None or not final.done():
+            waiting = [task for task in (provisional, refinement, final) if task is not None and not task.done()]
+            await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            if final is None and refinement.done():
+                refined = refinement.result()
+                if refined.strip() == request.text.strip():
+                    # Refinement changed nothing, so the raw translation is already final
+                    final = provisional
+                else:
+                    final = asyncio.ensure_future(
+                        simple_translate(refined, request.source_language, request.target_language)
+                    )
+
+            # Only worth sending while the final translation is still pending
+            if provisional.done() and not sent_provisional and final is not provisional and not (final and final.done()):
+                sent_provisional = True
+                yield format_sse("provisional", {"original_text": request.text, "translated_text": provisional.result()})
+
+        yield format_sse("final", {"original_text": request.text, "refined_text": refined, "translated_text": final.result()})
+    finally:
+        for task in (provisional, refinement, final):
+            if task is not None:
+                task.cancel()
+
 @router.post("/translate")
-def translate_text(request: TranslateRequest):
-    refined = refine_medical_text(request.text)
-    translated = simple_translate(refined, request.source_language, request.target_language)
+async def translate_text(request: TranslateRequest):
+    if request.fast_mode:
+        return StreamingResponse(
+            fast_translation_events(request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    refined = await refine_medical_text(request.text)
+    translated = await simple_translate(refined, request.source_language, request.target_language)
+
     return {
         "original_text": request.text,
         "refined_text": refined,
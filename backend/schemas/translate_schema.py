@@ -4,3 +4,5 @@ class TranslateRequest(BaseModel):
     text: str
     source_language: str
     target_language: str
+    # Stream a provisional translation of the raw text before the refined one
+    fast_mode: bool = False
@@ -0,0 +1,72 @@
+"""
+Async facade over the blocking MedicalDatabase.
+
+Every call is dispatched to a dedicated thread pool sized to the SQLite
+connection pool, so a slow disk write never runs on the event loop thread.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMedicalDatabase:
+    """Executor-backed async wrapper around MedicalDatabase"""
+
+    def __init__(self, database, max_workers: Optional[int] = None):
+        self.database = database
+        # One worker per pooled reader plus one for the writer
+        pool_size = getattr(getattr(database, 'pool', None), 'pool_size', 4)
+        self.max_workers = max_workers or pool_size + 1
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="afiyalink-db"
+        )
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def search_symptom(self, symptom: str) -> Optional[Dict]:
+        """Search for symptom information without blocking the event loop"""
+        return await self._run(self.database.search_symptom, symptom)
+
+    async def get_emergency_protocol(self, condition: str) -> Optional[Dict]:
+        """Get emergency protocol without blocking the event loop"""
+        return await self._run(self.database.get_emergency_protocol, condition)
+
+    async def log_interaction(self, user_id: str, query: str, response: str, risk_level: str, emergency_alert: bool):
+        """Log user interaction without blocking the event loop"""
+        # Emergency rows are never held back by backpressure, so they are always enqueued inline
+        if self.database.log_writer.may_block and not emergency_alert:
+            await self._run(self.database.log_interaction, user_id, query, response, risk_level, emergency_alert)
+        else:
+            # Non-blocking enqueue into the write-behind buffer
+            self.database.log_interaction(user_id, query, response, risk_level, emergency_alert)
+
+    async def log_interactions(self, rows: List[Tuple[str, str, str, str, bool]]):
+        """Write a group of interactions in one transaction off the event loop"""
+        await self._run(self.database.log_interactions, rows)
+
+    async def flush_logs(self, timeout: float = 5.0) -> bool:
+        """Wait for the interaction log buffer to drain"""
+        return await self._run(self.database.flush_logs, timeout)
+
+    def get_pool_stats(self) -> Dict:
+        return self.database.get_pool_stats()
+
+    def get_log_writer_stats(self) -> Dict:
+        return self.database.get_log_writer_stats()
+
+    def get_reference_index_stats(self) -> Dict:
+        return self.database.get_reference_index_stats()
+
+    async def close(self):
+        """Drain pending work, then release the executor and pooled connections"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+        self.database.close()
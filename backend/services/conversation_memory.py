@@ -0,0 +1,273 @@
+"""
+Per-user conversation memory for multi-turn context.
+
+Each exchange is kept as a compact slotted Turn (the user's message and the
+reply shown to them). Two interchangeable stores are provided:
+
+- ConversationStore keeps sessions in process: every session holds at most
+  `max_turns` turns, sessions idle for longer than the TTL expire, and the
+  least recently used sessions are evicted beyond `max_sessions` or the
+  global `max_bytes` budget.
+- SQLiteConversationStore keeps turns in the `conversation_turns` table, so
+  every uvicorn worker using the same database sees the same sessions. It
+  applies the same per-session cap; turns older than the TTL are ignored
+  and purged periodically. Its calls block, so async callers should run
+  them in a thread (see `blocking`).
+
+history_within_budget() picks the most recent turns that fit a prompt's
+token budget.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CREATE_CONVERSATION_TURNS_SQL = '''
+    CREATE TABLE IF NOT EXISTS conversation_turns (
+        id INTEGER PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        user_text TEXT NOT NULL,
+        reply TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+'''
+
+CREATE_CONVERSATION_TURNS_INDEX_SQL = '''
+    CREATE INDEX IF NOT EXISTS idx_conversation_turns_session
+    ON conversation_turns (session_id, id)
+'''
+
+# Rough per-turn bookkeeping overhead on top of the text itself
+TURN_OVERHEAD_BYTES = 64
+
+
+@dataclass(frozen=True, slots=True)
+class Turn:
+    user_text: str
+    reply: str
+    created_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.user_text.encode('utf-8')) + len(self.reply.encode('utf-8')) + TURN_OVERHEAD_BYTES
+
+
+class _Session:
+    __slots__ = ('turns', 'size', 'last_seen')
+
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Turn] = deque(maxlen=max_turns)
+        self.size = 0
+        self.last_seen = 0.0
+
+
+class ConversationStore:
+    """In-process session store with per-session caps, TTL and LRU eviction"""
+
+    blocking = False
+
+    def __init__(self, max_turns: int = 10, max_sessions: int = 10000,
+                 max_bytes: int = 16 * 1024 * 1024, ttl: float = 1800.0):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.appended = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def append(self, session_id: str, user_text: str, reply: str):
+        turn = Turn(user_text, reply, time.monotonic())
+        if turn.size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._purge_expired(turn.created_at)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(self.max_turns)
+            else:
+                self._sessions.move_to_end(session_id)
+
+            if len(session.turns) == session.turns.maxlen:
+                dropped = session.turns[0]
+                session.size -= dropped.size
+                self._bytes -= dropped.size
+            session.turns.append(turn)
+            session.size += turn.size
+            session.last_seen = turn.created_at
+            self._bytes += turn.size
+            self.appended += 1
+
+            while self._sessions and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+                _, oldest = self._sessions.popitem(last=False)
+                self._bytes -= oldest.size
+                self.evictions += 1
+
+    def recent(self, session_id: str, limit: Optional[int] = None) -> List[Turn]:
+        """Up to `limit` most recent turns, oldest first; [] for an unknown or expired session"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            if now - session.last_seen > self.ttl:
+                self._drop(session_id)
+                self.expirations += 1
+                return []
+            self._sessions.move_to_end(session_id)
+            session.last_seen = now
+            turns = list(session.turns)
+        return turns[-limit:] if limit else turns
+
+    def clear(self, session_id: str):
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _drop(self, session_id: str):
+        # Caller holds self._lock
+        session = self._sessions.pop(session_id)
+        self._bytes -= session.size
+
+    def _purge_expired(self, now: float):
+        # Sessions are in last-use order, so the expired ones are at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen <= self.ttl:
+                break
+            self._drop(session_id)
+            self.expirations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'sessions': len(self._sessions),
+                'bytes': self._bytes,
+                'max_sessions': self.max_sessions,
+                'max_bytes': self.max_bytes,
+                'max_turns': self.max_turns,
+                'ttl_seconds': self.ttl,
+                'appended': self.appended,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class SQLiteConversationStore:
+    """Session store in SQLite, shared by every worker using the same database"""
+
+    blocking = True
+
+    _INSERT_SQL = 'INSERT INTO conversation_turns (session_id, user_text, reply, created_at) VALUES (?, ?, ?, ?)'
+    _TRIM_SQL = '''
+        DELETE FROM conversation_turns
+        WHERE session_id = ? AND id NOT IN (
+            SELECT id FROM conversation_turns WHERE session_id = ? ORDER BY id DESC LIMIT ?
+        )
+    '''
+    _SELECT_SQL = '''
+        SELECT user_text, reply, created_at FROM conversation_turns
+        WHERE session_id = ? AND created_at >= ?
+        ORDER BY id DESC LIMIT ?
+    '''
+    _PURGE_SQL = 'DELETE FROM conversation_turns WHERE created_at < ?'
+
+    def __init__(self, pool, max_turns: int = 10, ttl: float = 1800.0, purge_every: int = 500):
+        self.pool = pool
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._lock = threading.Lock()
+
+        self.appended = 0
+        self.expirations = 0
+        self.failures = 0
+
+    def append(self, session_id: str, user_text: str, reply: str):
+        # Wall-clock time: created_at is compared across processes
+        now = time.time()
+        with self._lock:
+            self.appended += 1
+            purge = self.appended % self.purge_every == 0
+
+        try:
+            with self.pool.writer() as conn:
+                conn.execute(self._INSERT_SQL, (session_id, user_text, reply, now))
+                conn.execute(self._TRIM_SQL, (session_id, session_id, self.max_turns))
+                if purge:
+                    expired = conn.execute(self._PURGE_SQL, (now - self.ttl,)).rowcount
+                    with self._lock:
+                        self.expirations += expired
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            logger.warning(f"Conversation turn write failed: {e}")
+
+    def recent(self, session_id: str, limit: Optional[int] = None) -> List[Turn]:
+        """Up to `limit` most recent unexpired turns, oldest first"""
+        try:
+            with self.pool.reader() as conn:
+                rows = conn.execute(
+                    self._SELECT_SQL, (session_id, time.time() - self.ttl, limit or self.max_turns)
+                ).fetchall()
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            logger.warning(f"Conversation history lookup failed: {e}")
+            return []
+        return [Turn(user_text, reply, created_at) for user_text, reply, created_at in reversed(rows)]
+
+    def clear(self, session_id: str):
+        with self.pool.writer() as conn:
+            conn.execute('DELETE FROM conversation_turns WHERE session_id = ?', (session_id,))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'backend': 'sqlite',
+                'max_turns': self.max_turns,
+                'ttl_seconds': self.ttl,
+                'appended': self.appended,
+                'expirations': self.expirations,
+                'failures': self.failures,
+            }
+
+
+def history_within_budget(turns: Sequence[Turn], max_tokens: int,
+                          count_tokens: Callable[[str], int]) -> List[Turn]:
+    """The most recent turns whose text fits in `max_tokens`, oldest first.
+
+    Turns are taken newest to oldest until the next one would not fit; if
+    not even the newest fits, its reply is cut short so some context remains.
+    """
+    selected: List[Turn] = []
+    remaining = max_tokens
+    for turn in reversed(turns):
+        cost = count_tokens(turn.user_text) + count_tokens(turn.reply)
+        if cost <= remaining:
+            selected.append(turn)
+            remaining -= cost
+            continue
+        if not selected:
+            reply_budget = remaining - count_tokens(turn.user_text)
+            if reply_budget > 0:
+                # About four characters per token, matching estimate_tokens
+                selected.append(Turn(turn.user_text, turn.reply[:reply_budget * 4].rstrip() + " ...", turn.created_at))
+        break
+    selected.reverse()
+    return selected
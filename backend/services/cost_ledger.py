@@ -0,0 +1,223 @@
+"""
+Token-based AI cost ledger keyed by UTC day and provider.
+
+Spend is recorded in the shared `ai_cost_ledger` table, so every uvicorn
+worker on the host sees the same daily total. Before a provider call the
+worst-case cost is reserved inside a BEGIN IMMEDIATE transaction that also
+checks the daily limit, so concurrent workers can never overshoot the budget
+together; once the call returns the reservation is settled to the real cost
+computed from the provider's token usage (or a local estimate). A new UTC
+day simply starts new rows.
+
+Without a connection pool the ledger keeps the same bookkeeping in process
+memory (single worker only). The in-process lock only guards that memory and
+the cached total; database writes are serialized by SQLite itself, so a
+reader of the cached total never waits behind another worker's transaction.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CREATE_LEDGER_SQL = '''
+    CREATE TABLE IF NOT EXISTS ai_cost_ledger (
+        day TEXT NOT NULL,
+        provider TEXT NOT NULL,
+        requests INTEGER NOT NULL DEFAULT 0,
+        prompt_tokens INTEGER NOT NULL DEFAULT 0,
+        completion_tokens INTEGER NOT NULL DEFAULT 0,
+        cost REAL NOT NULL DEFAULT 0,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (day, provider)
+    )
+'''
+
+_UPSERT_SQL = '''
+    INSERT INTO ai_cost_ledger (day, provider, requests, prompt_tokens, completion_tokens, cost, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(day, provider) DO UPDATE SET
+        requests = requests + excluded.requests,
+        prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+        completion_tokens = completion_tokens + excluded.completion_tokens,
+        cost = cost + excluded.cost,
+        updated_at = excluded.updated_at
+'''
+
+_DAY_TOTAL_SQL = "SELECT COALESCE(SUM(cost), 0) FROM ai_cost_ledger WHERE day = ?"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)"""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def utc_day() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+class BudgetExceeded(Exception):
+    """Reserving a call's cost would take today's spend over the daily limit"""
+
+
+class CostLedger:
+    """Daily AI spend per provider with reserve-then-settle budget enforcement"""
+
+    def __init__(self, pool=None, daily_limit: float = 10.0, cache_ttl: float = 1.0,
+                 day: Callable[[], str] = utc_day):
+        self.pool = pool
+        self.daily_limit = daily_limit
+        self.cache_ttl = cache_ttl
+        self.day = day
+
+        self._lock = threading.Lock()
+        self._memory: Dict[Tuple[str, str], list] = {}
+        self._cached_day: Optional[str] = None
+        self._cached_total = 0.0
+        self._cached_at = 0.0
+        self.rejected = 0
+
+    # Storage
+
+    def _add(self, conn, day: str, provider: str, requests: int, prompt_tokens: int,
+             completion_tokens: int, cost: float):
+        if conn is None:
+            row = self._memory.setdefault((day, provider), [0, 0, 0, 0.0])
+            row[0] += requests
+            row[1] += prompt_tokens
+            row[2] += completion_tokens
+            row[3] += cost
+        else:
+            conn.execute(_UPSERT_SQL, (day, provider, requests, prompt_tokens, completion_tokens, cost))
+
+    def _day_total(self, conn, day: str) -> float:
+        if conn is None:
+            return sum(row[3] for (row_day, _), row in self._memory.items() if row_day == day)
+        return conn.execute(_DAY_TOTAL_SQL, (day,)).fetchone()[0]
+
+    def _remember(self, day: str, total: float):
+        with self._lock:
+            self._cached_day, self._cached_total, self._cached_at = day, total, time.monotonic()
+
+    def _write(self, day: str, provider: str, requests: int, prompt_tokens: int,
+               completion_tokens: int, cost: float):
+        if self.pool is None:
+            with self._lock:
+                self._add(None, day, provider, requests, prompt_tokens, completion_tokens, cost)
+                total = self._day_total(None, day)
+        else:
+            with self.pool.writer() as conn:
+                self._add(conn, day, provider, requests, prompt_tokens, completion_tokens, cost)
+                total = self._day_total(conn, day)
+        self._remember(day, total)
+
+    # Budget enforcement
+
+    def reserve(self, provider: str, amount: float) -> str:
+        """Reserve `amount` against today's budget; returns the day it was booked on.
+
+        Raises BudgetExceeded if the reservation would go over the daily limit.
+        """
+        day = self.day()
+        if self.pool is None:
+            with self._lock:
+                total = self._day_total(None, day)
+                if total + amount <= self.daily_limit:
+                    self._add(None, day, provider, 0, 0, 0, amount)
+        else:
+            with self.pool.writer() as conn:
+                # Serializes the check-and-reserve across every worker process
+                conn.execute("BEGIN IMMEDIATE")
+                total = self._day_total(conn, day)
+                if total + amount <= self.daily_limit:
+                    self._add(conn, day, provider, 0, 0, 0, amount)
+
+        if total + amount > self.daily_limit:
+            with self._lock:
+                self.rejected += 1
+            self._remember(day, total)
+            raise BudgetExceeded(f"Daily AI budget of ${self.daily_limit:.2f} reached")
+        self._remember(day, total + amount)
+        return day
+
+    def settle(self, day: str, provider: str, reserved: float, cost: float,
+               prompt_tokens: int, completion_tokens: int):
+        """Replace a reservation with the call's real cost and token usage"""
+        self._write(day, provider, 1, prompt_tokens, completion_tokens, cost - reserved)
+
+    def release(self, day: str, provider: str, reserved: float):
+        """Drop a reservation for a call that was never billed"""
+        self._write(day, provider, 0, 0, 0, -reserved)
+
+    # Reporting
+
+    def cached_spent_today(self) -> Optional[float]:
+        """Today's spend if read or written within `cache_ttl` seconds, else None (no I/O)"""
+        with self._lock:
+            if self._cached_day == self.day() and time.monotonic() - self._cached_at < self.cache_ttl:
+                return self._cached_total
+        return None
+
+    def last_spent_today(self) -> float:
+        """Today's spend as last read or written, however old (no I/O); for reporting"""
+        with self._lock:
+            return self._cached_total if self._cached_day == self.day() else 0.0
+
+    def spent_today(self) -> float:
+        """Today's spend, cached for `cache_ttl` seconds for cheap soft checks.
+
+        May read SQLite (never behind a writer, WAL readers do not block);
+        call it from a worker thread when the cache is stale.
+        """
+        cached = self.cached_spent_today()
+        if cached is not None:
+            return cached
+
+        day = self.day()
+        if self.pool is None:
+            with self._lock:
+                total = self._day_total(None, day)
+        else:
+            with self.pool.reader() as conn:
+                total = self._day_total(conn, day)
+        self._remember(day, total)
+        return total
+
+    def within_budget(self) -> bool:
+        return self.spent_today() < self.daily_limit
+
+    def summary(self, day: Optional[str] = None) -> Dict:
+        """Per-provider requests, tokens and cost for one UTC day (default today)"""
+        day = day or self.day()
+        if self.pool is None:
+            with self._lock:
+                rows = [(provider,) + tuple(row) for (row_day, provider), row in self._memory.items() if row_day == day]
+        else:
+            with self.pool.reader() as conn:
+                rows = conn.execute(
+                    "SELECT provider, requests, prompt_tokens, completion_tokens, cost "
+                    "FROM ai_cost_ledger WHERE day = ? ORDER BY provider", (day,)
+                ).fetchall()
+
+        providers = {
+            provider: {
+                'requests': requests,
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'cost': cost,
+            }
+            for provider, requests, prompt_tokens, completion_tokens, cost in rows
+        }
+        total = sum(entry['cost'] for entry in providers.values())
+        return {
+            'day': day,
+            'total_cost': total,
+            'daily_limit': self.daily_limit,
+            'remaining': max(0.0, self.daily_limit - total),
+            'rejected_reservations': self.rejected,
+            'shared': self.pool is not None,
+            'providers': providers,
+        }
@@ -0,0 +1,155 @@
+"""
+Bulk loader for external medical reference datasets (CSV or JSON).
+
+A dataset file is loaded in a single transaction and only when its version
+(by default the SHA-256 of the file) differs from the one recorded in
+`dataset_versions`. Per-row triggers and secondary indexes are detached for
+the load and rebuilt once at the end.
+
+Usage (from the backend directory):
+    python -m services.dataset_loader symptoms data/symptoms.csv --db afiyalink.db
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from services import migrations, symptom_search
+
+logger = logging.getLogger(__name__)
+
+# Loadable tables: insert columns and the subset that must be present
+TABLES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    'symptoms': (
+        ('symptom', 'description', 'possible_causes', 'self_care_advice', 'when_to_see_doctor',
+         'emergency_indicators', 'severity_level', 'cultural_considerations', 'reliability_score'),
+        ('symptom', 'description', 'possible_causes', 'self_care_advice', 'when_to_see_doctor',
+         'severity_level'),
+    ),
+    'emergency_protocols': (
+        ('condition', 'immediate_actions', 'warning_signs', 'emergency_numbers', 'cultural_considerations'),
+        ('condition', 'immediate_actions', 'warning_signs', 'emergency_numbers'),
+    ),
+}
+
+
+class DatasetError(ValueError):
+    """Raised for unreadable or invalid dataset files"""
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Yield dict records from a .csv file or a .json list (or {"records": [...]})"""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8') as handle:
+            yield from csv.DictReader(handle)
+    elif extension == '.json':
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        if isinstance(data, dict):
+            data = data.get('records', [])
+        if not isinstance(data, list):
+            raise DatasetError(f"{path}: expected a list of records")
+        yield from data
+    else:
+        raise DatasetError(f"Unsupported dataset format: {extension}")
+
+
+def _rows(table: str, records: Iterator[Dict]) -> Iterator[tuple]:
+    columns, required = TABLES[table]
+    for line, record in enumerate(records, start=1):
+        missing = [column for column in required if not record.get(column)]
+        if missing:
+            raise DatasetError(f"Record {line} is missing {', '.join(missing)}")
+        row = [record.get(column) or None for column in columns]
+        if table == 'symptoms':
+            score = record.get('reliability_score')
+            row[-1] = float(score) if score not in (None, '') else 1.0
+        yield tuple(row)
+
+
+def _secondary_indexes(cursor: sqlite3.Cursor, table: str) -> List[Tuple[str, str]]:
+    # sql is NULL for automatic (UNIQUE / PRIMARY KEY) indexes, which cannot be dropped
+    return cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,)
+    ).fetchall()
+
+
+def bulk_load(pool, table: str, path: str, version: Optional[str] = None, replace: bool = False) -> bool:
+    """Load a dataset file into `table`; returns False if this version is already loaded"""
+    if table not in TABLES:
+        raise DatasetError(f"Unknown table: {table}")
+    columns, _ = TABLES[table]
+    version = version or file_checksum(path)
+    placeholders = ', '.join('?' for _ in columns)
+
+    def apply(cursor: sqlite3.Cursor) -> int:
+        fts = table == 'symptoms' and migrations.table_exists(cursor.connection, 'symptoms_fts')
+        indexes = _secondary_indexes(cursor, table)
+
+        migrations.drop_reference_version_triggers(cursor)
+        if fts:
+            symptom_search.drop_fts_triggers(cursor)
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+
+        if replace:
+            cursor.execute(f"DELETE FROM {table}")
+        before = cursor.connection.total_changes
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            _rows(table, read_records(path))
+        )
+        loaded = cursor.connection.total_changes - before
+
+        # Build indexes once over the loaded data
+        for _, sql in indexes:
+            cursor.execute(sql)
+        if fts:
+            symptom_search.rebuild_fts(cursor)
+            symptom_search.create_fts_schema(cursor)
+        migrations.create_reference_version_triggers(cursor)
+        migrations.bump_reference_version(cursor)
+        return loaded
+
+    return migrations.seed_dataset(pool, f"{table}:{os.path.basename(path)}", version, apply)
+
+
+def main():
+    from services.db_pool import SQLitePool
+
+    parser = argparse.ArgumentParser(description="Bulk-load a medical reference dataset")
+    parser.add_argument('table', choices=sorted(TABLES))
+    parser.add_argument('path')
+    parser.add_argument('--db', default='afiyalink.db')
+    parser.add_argument('--version', help="dataset version (defaults to the file checksum)")
+    parser.add_argument('--replace', action='store_true', help="delete existing rows first")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    pool = SQLitePool(args.db)
+    try:
+        migrations.run_migrations(pool)
+        if not bulk_load(pool, args.table, args.path, args.version, args.replace):
+            print(f"{args.path} is already loaded at this version")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+SQLite connection pool for the AfiyaLink medical database.
+
+Read connections are long-lived and handed out from a bounded pool, while all
+writes go through one dedicated writer connection guarded by a lock. The
+database runs in WAL mode so readers never block on the writer.
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the pool timeout"""
+
+
+class WaitTimeStats:
+    """Rolling window of pool wait times (seconds)"""
+
+    def __init__(self, window: int = 2048):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.total_acquisitions = 0
+        self.timeouts = 0
+
+    def record(self, wait: float):
+        with self._lock:
+            self._samples.append(wait)
+            self.total_acquisitions += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = sorted(self._samples)
+            acquisitions = self.total_acquisitions
+            timeouts = self.timeouts
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            index = min(len(samples) - 1, int(round(p * (len(samples) - 1))))
+            return samples[index] * 1000
+
+        return {
+            'acquisitions': acquisitions,
+            'timeouts': timeouts,
+            'wait_ms_avg': (sum(samples) / len(samples) * 1000) if samples else 0.0,
+            'wait_ms_p50': percentile(0.50),
+            'wait_ms_p95': percentile(0.95),
+            'wait_ms_p99': percentile(0.99),
+            'wait_ms_max': samples[-1] * 1000 if samples else 0.0,
+        }
+
+
+class SQLitePool:
+    """Pooled read connections plus a single writer connection"""
+
+    def __init__(self, db_path: str, pool_size: int = 4, timeout: float = 5.0,
+                 statement_cache_size: int = 128, busy_timeout_ms: int = 5000):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.statement_cache_size = statement_cache_size
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.Lock()
+
+        self.read_waits = WaitTimeStats()
+        self.write_waits = WaitTimeStats()
+        self._closed = False
+
+        # The writer is opened eagerly so WAL mode is set before any reader exists
+        self._writer = self._connect()
+        journal_mode = self._writer.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if str(journal_mode).lower() != 'wal':
+            logger.warning(f"SQLite WAL mode unavailable, using {journal_mode} journal")
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection tuned for long-lived reuse"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+        )
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # REPLACE conflicts must fire DELETE triggers so derived tables stay in sync
+        conn.execute("PRAGMA recursive_triggers=ON")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        if self._closed:
+            raise PoolTimeoutError("Connection pool is closed")
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Grow lazily up to pool_size
+        with self._readers_lock:
+            if len(self._all_readers) < self.pool_size:
+                conn = self._connect(read_only=True)
+                self._all_readers.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            self.read_waits.record_timeout()
+            raise PoolTimeoutError(f"No read connection available after {self.timeout}s")
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read connection from the pool"""
+        started = time.perf_counter()
+        conn = self._acquire_reader()
+        self.read_waits.record(time.perf_counter() - started)
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Hold the single writer connection; commits on success, rolls back on error"""
+        started = time.perf_counter()
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            self.write_waits.record_timeout()
+            raise PoolTimeoutError(f"Writer connection busy for more than {self.timeout}s")
+        self.write_waits.record(time.perf_counter() - started)
+
+        try:
+            if self._closed or self._writer is None:
+                raise PoolTimeoutError("Connection pool is closed")
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+        finally:
+            self._writer_lock.release()
+
+    def stats(self) -> Dict:
+        """Pool sizing and wait-time statistics"""
+        with self._readers_lock:
+            open_readers = len(self._all_readers)
+
+        return {
+            'pool_size': self.pool_size,
+            'open_readers': open_readers,
+            'idle_readers': self._idle.qsize(),
+            'reader': self.read_waits.snapshot(),
+            'writer': self.write_waits.snapshot(),
+        }
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        self._closed = True
+
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+        with self._readers_lock:
+            for conn in self._all_readers:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass
+            self._all_readers.clear()
+
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
@@ -0,0 +1,210 @@
+"""
+Write-behind writer for the interaction_logs table.
+
+Chat turns enqueue their log row into a bounded in-memory buffer and return
+immediately. A background thread groups queued rows into a single
+executemany transaction per batch, flushing whenever the batch fills up or
+the flush window elapses.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+LogRow = Tuple[str, str, str, str, bool]
+
+INSERT_INTERACTION_SQL = '''
+    INSERT INTO interaction_logs
+        (user_id, query, response, risk_level, emergency_alert)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Backpressure policies when the buffer is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK)
+
+
+class InteractionLogWriter:
+    """Bounded queue plus background batch flusher for interaction logs"""
+
+    def __init__(self, pool, max_batch_size: int = 500, flush_interval: float = 0.05,
+                 max_queue_size: int = 10000, overflow_policy: str = OVERFLOW_DROP_OLDEST,
+                 block_timeout: float = 1.0):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+
+        self._queue: Deque[LogRow] = deque()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._stopping = False
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="afiyalink-log-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def may_block(self) -> bool:
+        """True if submit() can wait for buffer space"""
+        return self.overflow_policy == OVERFLOW_BLOCK
+
+    def submit(self, user_id: str, query: str, response: str, risk_level: str, emergency_alert: bool) -> bool:
+        """Queue one row; returns False if it was dropped by the backpressure policy"""
+        row = (user_id, query, response, risk_level, emergency_alert)
+
+        with self._cond:
+            if self._stopping:
+                self.dropped += 1
+                return False
+
+            # Emergency rows are part of the audit trail and are never shed
+            if len(self._queue) >= self.max_queue_size and not emergency_alert:
+                if self.overflow_policy == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+
+                if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+                    self._drop_oldest_non_emergency()
+
+                elif self.overflow_policy == OVERFLOW_BLOCK:
+                    self._cond.notify_all()
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._queue) >= self.max_queue_size and not self._stopping:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not self._cond.wait(remaining):
+                            break
+                    if len(self._queue) >= self.max_queue_size:
+                        self.dropped += 1
+                        return False
+
+            self._queue.append(row)
+            self.submitted += 1
+            if len(self._queue) >= self.max_batch_size:
+                self._cond.notify_all()
+            return True
+
+    def _drop_oldest_non_emergency(self):
+        for index, queued in enumerate(self._queue):
+            if not queued[4]:
+                del self._queue[index]
+                self.dropped += 1
+                return
+
+    def _take_batch(self) -> List[LogRow]:
+        count = min(len(self._queue), self.max_batch_size)
+        batch = [self._queue.popleft() for _ in range(count)]
+        self._in_flight = len(batch)
+        # Wake producers waiting for space under the block policy
+        self._cond.notify_all()
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.max_batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                if not self._queue:
+                    if self._stopping:
+                        return
+                    continue
+                batch = self._take_batch()
+
+            self._write(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _write(self, batch: List[LogRow]) -> bool:
+        started = time.perf_counter()
+        try:
+            with self.pool.writer() as conn:
+                conn.executemany(INSERT_INTERACTION_SQL, batch)
+            ok = True
+        except Exception as e:
+            ok = False
+            logger.error(f"Failed to write {len(batch)} interaction logs: {e}")
+        with self._cond:
+            if ok:
+                self.written += len(batch)
+                self.batches += 1
+            else:
+                self.failed += len(batch)
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return ok
+
+    def write_rows(self, rows: List[LogRow]) -> bool:
+        """Write rows now, in one transaction, bypassing the buffer.
+
+        For callers that already hold a group of rows (batch requests).
+        Returns False if the transaction failed; the rows are not retried.
+        """
+        if not rows:
+            return True
+        with self._cond:
+            self.submitted += len(rows)
+        return self._write(list(rows))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued so far has been written"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._cond.wait(min(remaining, self.flush_interval))
+                self._cond.notify_all()
+        return True
+
+    def stats(self) -> Dict:
+        with self._cond:
+            queue_depth = len(self._queue)
+        return {
+            'queue_depth': queue_depth,
+            'max_queue_size': self.max_queue_size,
+            'overflow_policy': self.overflow_policy,
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_flush_ms': self.last_flush_ms,
+        }
+
+    def close(self, timeout: float = 5.0):
+        """Stop accepting rows, flush what is queued and stop the flusher thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Interaction log writer did not finish flushing within {timeout}s")
+        with self._cond:
+            lost = len(self._queue)
+        if lost:
+            logger.error(f"{lost} interaction logs were not written before shutdown")
@@ -0,0 +1,130 @@
+"""
+On-first-use loading of optional heavy dependencies.
+
+NLP models and provider SDKs are wrapped in LazyResource instead of being
+imported at module import, so the server can start accepting traffic before
+they are loaded. A resource is built the first time it is needed (or by the
+background warm-up, whichever comes first); a failed load is remembered and
+reported as unavailable rather than retried on every call.
+"""
+
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Generic, Iterable, Iterator, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class LazyResource(Generic[T]):
+    """Value built by `factory` on first use; thread-safe, loaded at most once"""
+
+    def __init__(self, name: str, factory: Callable[[], Optional[T]]):
+        self.name = name
+        self.factory = factory
+        self._value: Optional[T] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.error: Optional[str] = None
+        self.load_seconds = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def failed(self) -> bool:
+        """True once a load was attempted and produced nothing"""
+        return self._loaded and self._value is None
+
+    def get(self) -> Optional[T]:
+        """The resource, loading it on this thread if needed; None if unavailable"""
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                started = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    self.error = f"{type(e).__name__}: {e}"
+                    logger.info(f"{self.name} not available ({self.error})")
+                self.load_seconds = time.perf_counter() - started
+                self._loaded = True
+        return self._value
+
+    async def aget(self) -> Optional[T]:
+        """get() that loads in a worker thread instead of on the event loop"""
+        if self._loaded:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+    def stats(self) -> Dict:
+        return {
+            'loaded': self._loaded,
+            'available': self._loaded and self._value is not None,
+            'load_ms': self.load_seconds * 1000,
+            'error': self.error,
+        }
+
+
+def lazy_import(name: str, module: str, attribute: Optional[str] = None) -> LazyResource:
+    """LazyResource for a module (or one of its attributes) imported on first use"""
+    def load():
+        imported = importlib.import_module(module)
+        return getattr(imported, attribute) if attribute else imported
+
+    return LazyResource(name, load)
+
+
+class LazyGroup(Mapping[str, T]):
+    """Read-only name -> LazyResource map that hides resources that failed to load.
+
+    `name in group` and len() count every resource not yet known to be
+    unavailable, so checking for a provider never triggers a load;
+    indexing loads on the calling thread, `await group.aget(name)` in a
+    worker thread.
+    """
+
+    def __init__(self, resources: Iterable[LazyResource]):
+        self._resources: Dict[str, LazyResource] = {resource.name: resource for resource in resources}
+
+    def __getitem__(self, name: str) -> T:
+        value = self._resources[name].get()
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name: object) -> bool:
+        resource = self._resources.get(name)
+        return resource is not None and not resource.failed
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, resource in self._resources.items() if not resource.failed)
+
+    def __len__(self) -> int:
+        return sum(1 for resource in self._resources.values() if not resource.failed)
+
+    async def aget(self, name: str) -> T:
+        value = await self._resources[name].aget()
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def resources(self) -> Iterable[LazyResource]:
+        return self._resources.values()
+
+
+async def warm_up(resources: Iterable[LazyResource]) -> Dict[str, Dict]:
+    """Load every resource concurrently in worker threads; returns their stats"""
+    resources = list(resources)
+    started = time.perf_counter()
+    await asyncio.gather(*(resource.aget() for resource in resources))
+    available = [resource.name for resource in resources if not resource.failed]
+    logger.info(f"Warm-up loaded {len(available)}/{len(resources)} components in "
+                f"{time.perf_counter() - started:.2f}s: {', '.join(available) or 'none'}")
+    return {resource.name: resource.stats() for resource in resources}
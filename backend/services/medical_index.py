@@ -0,0 +1,194 @@
+"""
+In-process index over the read-mostly reference tables (symptoms and
+emergency_protocols).
+
+Rows are loaded once into compact tuples kept in ranking order, with a hash
+map for exact matches, a sorted key list for prefix matches and a trigram
+posting index for substring matches. The index reloads itself when the
+database file changes and the reference data version (bumped by triggers)
+has moved.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SYMPTOM_COLUMNS = (
+    'id', 'symptom', 'description', 'possible_causes', 'self_care_advice', 'when_to_see_doctor',
+    'emergency_indicators', 'severity_level', 'cultural_considerations', 'reliability_score'
+)
+PROTOCOL_COLUMNS = (
+    'id', 'condition', 'immediate_actions', 'warning_signs', 'emergency_numbers', 'cultural_considerations'
+)
+
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_SUBSTRING = "substring"
+
+
+class TextIndex:
+    """Exact / prefix / substring lookups over selected columns of a row set"""
+
+    def __init__(self, columns: Sequence[str], rows: Iterable[tuple], search_fields: Sequence[str],
+                 score_field: Optional[str] = None):
+        self.columns = tuple(columns)
+        id_pos = self.columns.index('id')
+        field_pos = [self.columns.index(name) for name in search_fields]
+
+        # Store rows in ranking order so a smaller position means a better rank
+        if score_field:
+            score_pos = self.columns.index(score_field)
+            rank_key = lambda row: (-(row[score_pos] or 0.0), row[id_pos])
+        else:
+            rank_key = lambda row: row[id_pos]
+        self.rows: List[tuple] = sorted((tuple(row) for row in rows), key=rank_key)
+
+        self._texts: List[Tuple[str, ...]] = []
+        self._exact: Dict[str, List[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        keys: List[Tuple[str, int]] = []
+
+        for position, row in enumerate(self.rows):
+            texts = tuple((row[pos] or '').lower() for pos in field_pos)
+            self._texts.append(texts)
+            for text in texts:
+                self._exact.setdefault(text, []).append(position)
+                keys.append((text, position))
+                for i in range(len(text) - 2):
+                    self._trigrams.setdefault(text[i:i + 3], set()).add(position)
+
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._key_positions = [position for _, position in keys]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def exact(self, query: str) -> List[int]:
+        return self._exact.get(query.lower(), [])
+
+    def prefix(self, query: str) -> List[int]:
+        query = query.lower()
+        start = bisect.bisect_left(self._keys, query)
+        end = bisect.bisect_left(self._keys, query + '\U0010ffff', start)
+        return sorted(set(self._key_positions[start:end]))
+
+    def substring(self, query: str) -> List[int]:
+        query = query.lower()
+        if len(query) < 3:
+            candidates: Iterable[int] = range(len(self.rows))
+        else:
+            postings = []
+            for i in range(len(query) - 2):
+                posting = self._trigrams.get(query[i:i + 3])
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set.intersection(*postings) if len(postings) > 1 else postings[0]
+
+        return sorted(position for position in candidates
+                      if any(query in text for text in self._texts[position]))
+
+    def search(self, query: str, mode: str = MATCH_SUBSTRING, limit: int = 1) -> List[Dict]:
+        """Return up to `limit` matching rows as dicts, best ranked first"""
+        if mode == MATCH_EXACT:
+            positions = self.exact(query)
+        elif mode == MATCH_PREFIX:
+            positions = self.prefix(query)
+        elif mode == MATCH_SUBSTRING:
+            positions = self.substring(query)
+        else:
+            raise ValueError(f"Unknown match mode: {mode}")
+
+        return [dict(zip(self.columns, self.rows[position])) for position in positions[:limit]]
+
+
+class MedicalReferenceIndex:
+    """Hot-reloading index over the symptoms and emergency_protocols tables"""
+
+    def __init__(self, pool, check_interval: float = 1.0):
+        self.pool = pool
+        self.check_interval = check_interval
+        self.symptoms = TextIndex(SYMPTOM_COLUMNS, [], ('symptom', 'description'), 'reliability_score')
+        self.protocols = TextIndex(PROTOCOL_COLUMNS, [], ('condition',))
+
+        self._reload_lock = threading.Lock()
+        self._file_signature: Optional[tuple] = None
+        self._data_version: Optional[int] = None
+        self._last_check = 0.0
+        self.reloads = 0
+
+    def _signature(self) -> tuple:
+        signature = []
+        for suffix in ('', '-wal'):
+            try:
+                stat = os.stat(self.pool.db_path + suffix)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _read_version(self, conn) -> int:
+        return conn.execute("SELECT version FROM reference_data_version WHERE id = 1").fetchone()[0]
+
+    def load(self):
+        """(Re)build both indexes from the database"""
+        self._file_signature = self._signature()
+        with self.pool.reader() as conn:
+            version = self._read_version(conn)
+            symptom_rows = conn.execute(f"SELECT {', '.join(SYMPTOM_COLUMNS)} FROM symptoms").fetchall()
+            protocol_rows = conn.execute(f"SELECT {', '.join(PROTOCOL_COLUMNS)} FROM emergency_protocols").fetchall()
+
+        # Build off to the side, then swap references atomically
+        symptoms = TextIndex(SYMPTOM_COLUMNS, symptom_rows, ('symptom', 'description'), 'reliability_score')
+        protocols = TextIndex(PROTOCOL_COLUMNS, protocol_rows, ('condition',))
+        self.symptoms, self.protocols = symptoms, protocols
+        self._data_version = version
+        self.reloads += 1
+        logger.info(f"Reference index loaded: {len(symptoms)} symptoms, {len(protocols)} protocols")
+
+    def refresh(self, force: bool = False):
+        """Reload if the database file changed and the reference data moved"""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+        if not self._reload_lock.acquire(blocking=False):
+            return  # another thread is already checking
+
+        try:
+            self._last_check = now
+            signature = self._signature()
+            if not force and signature == self._file_signature:
+                return
+            self._file_signature = signature
+
+            with self.pool.reader() as conn:
+                version = self._read_version(conn)
+            if force or version != self._data_version:
+                self.load()
+        except Exception as e:
+            logger.error(f"Reference index reload failed: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def search_symptoms(self, query: str, mode: str = MATCH_SUBSTRING, limit: int = 1) -> List[Dict]:
+        self.refresh()
+        return self.symptoms.search(query, mode, limit)
+
+    def search_protocols(self, query: str, mode: str = MATCH_SUBSTRING, limit: int = 1) -> List[Dict]:
+        self.refresh()
+        return self.protocols.search(query, mode, limit)
+
+    def stats(self) -> Dict:
+        return {
+            'symptoms': len(self.symptoms),
+            'emergency_protocols': len(self.protocols),
+            'data_version': self._data_version,
+            'reloads': self.reloads,
+        }
@@ -0,0 +1,213 @@
+"""
+Single-pass analysis of a user message.
+
+normalize() puts a message into one canonical form: case folded, French
+accents and Arabic diacritics removed, Arabic/Urdu letter variants (alef
+and hamza forms, yeh, kaf, heh, teh marbuta) unified, Eastern Arabic digits
+made ASCII and typographic apostrophes made plain. Plain ASCII text only
+needs lower-casing.
+
+MessageAnalyzer compiles every entry of the lexicon (data/lexicon.json):
+emergency keywords, high-risk patterns, symptom aliases, intent and routing
+keywords, into one SafetyScanner. A message is then normalized once and
+scanned once, whatever the size of the lexicon, and the resulting Analysis
+carries what triage, symptom extraction, intent classification and
+rule-based routing each used to compute with their own pass.
+"""
+
+import json
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from services.safety_scanner import Match, SafetyScanner
+
+LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "lexicon.json"
+
+# Keyword prefix/suffix marking an entry that only matches at the start/end of a word
+WORD_START = '^'
+WORD_END = '$'
+
+# Latin combining accents, Arabic harakat, superscript alef, Quranic marks and tatweel
+_MARKS = re.compile('[\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+
+_LETTERS = str.maketrans({
+    'ٱ': 'ا',  # alef wasla -> alef (other hamza/madda forms decompose to alef)
+    'ى': 'ي',  # alef maksura -> yeh
+    'ی': 'ي',  # Farsi/Urdu yeh -> yeh
+    'ک': 'ك',  # keheh (Urdu kaf) -> kaf
+    'ہ': 'ه',  # heh goal (Urdu) -> heh
+    'ە': 'ه',  # ae -> heh
+    'ة': 'ه',  # teh marbuta -> heh
+    'ۃ': 'ه',  # teh marbuta goal -> heh
+    '’': "'", '‘': "'", 'ʼ': "'",
+    'œ': 'oe', 'æ': 'ae',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06f0 + digit): str(digit) for digit in range(10)},
+})
+
+_TOKEN = re.compile(r"\w+(?:['-]\w+)*")
+
+
+def _fold(text: str) -> str:
+    return _MARKS.sub('', unicodedata.normalize('NFKD', text)).translate(_LETTERS)
+
+
+def normalize(text: str) -> str:
+    """Canonical form of a message that every lexicon entry is matched against"""
+    if text.isascii():
+        return text.lower()
+    return _fold(text.casefold())
+
+
+def normalize_pattern(pattern: str) -> str:
+    """normalize() for a regular expression: letters are folded but case is kept (\\D is not \\d)"""
+    return pattern if pattern.isascii() else _fold(pattern)
+
+
+def tokenize(normalized: str) -> List[str]:
+    return _TOKEN.findall(normalized)
+
+
+@dataclass(frozen=True)
+class Lexicon:
+    emergency: Tuple[str, ...]
+    high_risk: Tuple[str, ...]
+    symptoms: Mapping[str, Tuple[str, ...]]                # canonical name -> aliases, in report order
+    intents: Tuple[Tuple[str, Tuple[str, ...]], ...]       # (intent, keywords), in priority order
+    default_intent: str
+    routes: Tuple[Tuple[str, Tuple[str, ...]], ...]        # (route, keywords), in priority order
+    default_route: str
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Lexicon":
+        def ranked(section: Dict) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+            return tuple((name, tuple(section['keywords'].get(name, ()))) for name in section['order'])
+
+        return cls(
+            emergency=tuple(data['emergency']),
+            high_risk=tuple(data['high_risk']),
+            symptoms=MappingProxyType({name: tuple(aliases) for name, aliases in data['symptoms'].items()}),
+            intents=ranked(data['intents']),
+            default_intent=data['intents']['default'],
+            routes=ranked(data['routes']),
+            default_route=data['routes']['default'],
+        )
+
+    def __len__(self) -> int:
+        """Number of entries"""
+        return (len(self.emergency) + len(self.high_risk)
+                + sum(1 + len(aliases) for aliases in self.symptoms.values())
+                + sum(len(keywords) for _, keywords in self.intents + self.routes))
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(path: Path = LEXICON_PATH) -> Lexicon:
+    """The lexicon in `path`, parsed once per process"""
+    return Lexicon.from_dict(json.loads(Path(path).read_text(encoding='utf-8')))
+
+
+@dataclass(slots=True)
+class Analysis:
+    text: str                       # the normalized message
+    tokens: List[str]
+    emergency: List[Match]
+    high_risk: List[Match]
+    symptoms: List[str]             # canonical names, in lexicon order
+    intent_scores: Dict[str, int]   # keyword hits per intent
+    intent: str
+    route_scores: Dict[str, int]    # keyword hits per rule-based response route
+    route: str
+
+
+class MessageAnalyzer:
+    """Every message rule of a lexicon compiled into one scanner"""
+
+    # Scanner categories: "emergency", "high_risk", "symptom:<name>", "intent:<name>", "route:<name>"
+    _EMERGENCY = 0
+    _HIGH_RISK = 1
+    _SYMPTOM = 2
+    _INTENT = 3
+    _ROUTE = 4
+
+    def __init__(self, lexicon: Lexicon):
+        self.lexicon = lexicon
+        self._kinds: Dict[str, Tuple[int, str]] = {'emergency': (self._EMERGENCY, ''), 'high_risk': (self._HIGH_RISK, '')}
+        self._word_start = set()
+        self._word_end = set()
+        keywords: Dict[str, List[str]] = {}
+
+        def add(category: str, kind: int, name: str, entries: Iterable[str]):
+            self._kinds[category] = (kind, name)
+            words = keywords.setdefault(category, [])
+            for entry in entries:
+                word = normalize(entry.lstrip(WORD_START).rstrip(WORD_END))
+                if entry.startswith(WORD_START):
+                    self._word_start.add((category, word))
+                if entry.endswith(WORD_END):
+                    self._word_end.add((category, word))
+                if word and word not in words:
+                    words.append(word)
+
+        add('emergency', self._EMERGENCY, '', lexicon.emergency)
+        for name, aliases in lexicon.symptoms.items():
+            add(f"symptom:{name}", self._SYMPTOM, name, (name, *aliases))
+        for name, words in lexicon.intents:
+            add(f"intent:{name}", self._INTENT, name, words)
+        for name, words in lexicon.routes:
+            add(f"route:{name}", self._ROUTE, name, words)
+
+        self._symptom_rank = {name: rank for rank, name in enumerate(lexicon.symptoms)}
+        self.scanner = SafetyScanner(
+            keywords=keywords,
+            patterns={'high_risk': [normalize_pattern(pattern) for pattern in lexicon.high_risk]}
+        )
+
+    def analyze(self, text: str) -> Analysis:
+        normalized = normalize(text)
+        return self._analysis(normalized, self.scanner.scan(normalized))
+
+    def analyze_many(self, texts: Sequence[str]) -> List[Analysis]:
+        """analyze() for a batch of messages with one scan over all of them"""
+        normalized = [normalize(text) for text in texts]
+        return [self._analysis(text, hits) for text, hits in zip(normalized, self.scanner.scan_many(normalized))]
+
+    def _analysis(self, text: str, hits: List[Match]) -> Analysis:
+        emergency: List[Match] = []
+        high_risk: List[Match] = []
+        symptoms = set()
+        intent_scores: Dict[str, int] = {}
+        route_scores: Dict[str, int] = {}
+
+        for hit in hits:
+            if hit.start and (hit.category, hit.rule) in self._word_start and text[hit.start - 1].isalnum():
+                continue
+            if hit.end < len(text) and (hit.category, hit.rule) in self._word_end and text[hit.end].isalnum():
+                continue
+            kind, name = self._kinds[hit.category]
+            if kind == self._EMERGENCY:
+                emergency.append(hit)
+            elif kind == self._HIGH_RISK:
+                high_risk.append(hit)
+            elif kind == self._SYMPTOM:
+                symptoms.add(name)
+            elif kind == self._INTENT:
+                intent_scores[name] = intent_scores.get(name, 0) + 1
+            else:
+                route_scores[name] = route_scores.get(name, 0) + 1
+
+        return Analysis(
+            text=text,
+            tokens=tokenize(text),
+            emergency=emergency,
+            high_risk=high_risk,
+            symptoms=sorted(symptoms, key=self._symptom_rank.__getitem__),
+            intent_scores=intent_scores,
+            intent=next((name for name, _ in self.lexicon.intents if name in intent_scores), self.lexicon.default_intent),
+            route_scores=route_scores,
+            route=next((name for name, _ in self.lexicon.routes if name in route_scores), self.lexicon.default_route),
+        )
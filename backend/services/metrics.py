@@ -0,0 +1,278 @@
+"""
+Latency histograms and counters exposed in the Prometheus text format.
+
+Instrumentation is attached from the outside: instrument() replaces a
+method on one object with a timed wrapper, so with metrics switched off
+nothing is wrapped and the request path runs exactly the original code.
+Histograms use fixed buckets (cheap to update under a lock) and estimate
+p50/p95/p99 by interpolating inside the bucket a quantile falls in.
+Collectors add values that other components already count (cache hits,
+pool waits) at scrape time instead of on every request.
+"""
+
+import functools
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; dense around the ranges of local work (sub-ms) and provider calls (seconds)
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (name, type, help, [(labels, value), ...]) produced by a collector at scrape time
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class _HistogramSeries:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Bucketed distribution per label combination"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # One slot per bucket plus the +Inf overflow
+                series = self._series[label_values] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    def quantile(self, q: float, *label_values: str) -> Optional[float]:
+        """Estimate from the buckets; None without observations"""
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None or not series.count:
+                return None
+            counts = list(series.counts)
+            count = series.count
+        return self._estimate(q, counts, count)
+
+    def summary(self) -> Dict[Tuple[str, ...], Dict]:
+        """Count, sum and estimated quantiles per label combination"""
+        with self._lock:
+            snapshot = [(labels, list(series.counts), series.total, series.count)
+                        for labels, series in self._series.items()]
+        return {
+            labels: {'count': count, 'sum': total,
+                     **{f"p{round(q * 100)}": self._estimate(q, counts, count) for q in QUANTILES}}
+            for labels, counts, total, count in snapshot
+        }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def _estimate(self, q: float, counts: List[int], count: int) -> float:
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]  # beyond the last bound: report the bound
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series.counts), series.total, series.count)
+                        for labels, series in self._series.items()]
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        quantile_lines = [f"# HELP {self.name}_quantile {self.help} (p50/p95/p99 estimated from the buckets)",
+                          f"# TYPE {self.name}_quantile gauge"]
+        for label_values, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if math.isinf(bound) else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, label_values, le)} {cumulative}")
+            labels = _labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+            for q in QUANTILES:
+                quantile = _labels(self.label_names, label_values, f'quantile="{q}"')
+                quantile_lines.append(f"{self.name}_quantile{quantile} {_number(self._estimate(q, counts, count))}")
+        return lines + quantile_lines if snapshot else lines
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}" for labels, value in values)
+        return lines
+
+
+class MetricsRegistry:
+    """Owns every metric and renders them all for a scrape"""
+
+    def __init__(self, prefix: str = 'afiyalink'):
+        self.prefix = prefix
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        full_name = f"{self.prefix}_{name}"
+        if full_name not in self._metrics:
+            self._metrics[full_name] = Histogram(full_name, help_text, label_names, buckets)
+        return self._metrics[full_name]
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        full_name = f"{self.prefix}_{name}"
+        if full_name not in self._metrics:
+            self._metrics[full_name] = Counter(full_name, help_text, label_names)
+        return self._metrics[full_name]
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """Register a callable returning metric families, called on every scrape"""
+        self._collectors.append(collector)
+
+    def summary(self) -> Dict[str, Dict[str, Dict]]:
+        """Histogram summaries keyed by metric name, then by comma-joined label values"""
+        return {
+            name: {','.join(labels): values for labels, values in metric.summary().items()}
+            for name, metric in self._metrics.items() if isinstance(metric, Histogram)
+        }
+
+    def reset(self):
+        """Forget every observation (collectors are unaffected)"""
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                full_name = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{full_name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def timed(func: Callable, histogram: Histogram, label_values: Sequence[str] = (),
+          label_from_args: Optional[Callable[..., str]] = None,
+          outcomes: Optional[Counter] = None) -> Callable:
+    """Wrap `func` (sync or async) so each call is observed in `histogram`.
+
+    `label_from_args(*args, **kwargs)` adds one label computed from the
+    call's arguments. With `outcomes`, every call is also counted under an
+    extra "success", "error" or "cancelled" label.
+    """
+    static = tuple(label_values)
+
+    def labels_for(args, kwargs) -> Tuple[str, ...]:
+        return static + (label_from_args(*args, **kwargs),) if label_from_args else static
+
+    def record(labels: Tuple[str, ...], started: float, outcome: str):
+        histogram.observe(time.perf_counter() - started, *labels)
+        if outcomes is not None:
+            outcomes.inc(*labels, outcome)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            labels = labels_for(args, kwargs)
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception:
+                record(labels, started, 'error')
+                raise
+            except BaseException:
+                record(labels, started, 'cancelled')
+                raise
+            record(labels, started, 'success')
+            return result
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        labels = labels_for(args, kwargs)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            record(labels, started, 'error')
+            raise
+        record(labels, started, 'success')
+        return result
+    return wrapper
+
+
+def instrument(target: object, method: str, histogram: Histogram, *label_values: str, **options):
+    """Replace `target.method` with a timed() wrapper of itself (this object only)"""
+    setattr(target, method, timed(getattr(target, method), histogram, label_values, **options))
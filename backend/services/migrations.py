@@ -0,0 +1,227 @@
+"""
+Schema migrations and versioned reference-data seeding.
+
+Applied schema migrations are recorded in `schema_migrations` and loaded
+datasets in `dataset_versions`. Startup first checks both with a plain read,
+so an up-to-date database is never written to; only when something is
+missing does a worker take the write lock (BEGIN IMMEDIATE), re-check under
+the lock and apply the change, so concurrent workers never apply it twice.
+"""
+
+import logging
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+from services import symptom_search
+from services.conversation_memory import CREATE_CONVERSATION_TURNS_INDEX_SQL, CREATE_CONVERSATION_TURNS_SQL
+from services.cost_ledger import CREATE_LEDGER_SQL
+from services.translation_memory import CREATE_TRANSLATION_MEMORY_SQL
+
+logger = logging.getLogger(__name__)
+
+Migration = Tuple[int, str, Callable[[sqlite3.Cursor], None]]
+
+
+def _create_base_tables(cursor: sqlite3.Cursor):
+    # Symptoms table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS symptoms (
+                                                           id INTEGER PRIMARY KEY,
+                                                           symptom TEXT UNIQUE NOT NULL,
+                                                           description TEXT NOT NULL,
+                                                           possible_causes TEXT NOT NULL,
+                                                           self_care_advice TEXT NOT NULL,
+                                                           when_to_see_doctor TEXT NOT NULL,
+                                                           emergency_indicators TEXT,
+                                                           severity_level TEXT NOT NULL,
+                                                           cultural_considerations TEXT,
+                                                           reliability_score REAL DEFAULT 1.0
+                   )
+                   ''')
+
+    # Emergency protocols table
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS emergency_protocols (
+                                                                      id INTEGER PRIMARY KEY,
+                                                                      condition TEXT UNIQUE NOT NULL,
+                                                                      immediate_actions TEXT NOT NULL,
+                                                                      warning_signs TEXT NOT NULL,
+                                                                      emergency_numbers TEXT NOT NULL,
+                                                                      cultural_considerations TEXT
+                   )
+                   ''')
+
+    # Interaction logs
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS interaction_logs (
+                                                                   id INTEGER PRIMARY KEY,
+                                                                   user_id TEXT,
+                                                                   query TEXT,
+                                                                   response TEXT,
+                                                                   risk_level TEXT,
+                                                                   emergency_alert BOOLEAN,
+                                                                   timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                   )
+                   ''')
+
+
+def create_reference_version_triggers(cursor: sqlite3.Cursor):
+    """Bump reference_data_version on any change to symptoms or protocols"""
+    for table in ('symptoms', 'emergency_protocols'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                           CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version
+                           AFTER {event} ON {table}
+                           BEGIN
+                               UPDATE reference_data_version SET version = version + 1 WHERE id = 1;
+                           END
+                           ''')
+
+
+def drop_reference_version_triggers(cursor: sqlite3.Cursor):
+    for table in ('symptoms', 'emergency_protocols'):
+        for event in ('insert', 'update', 'delete'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_{event}_version")
+
+
+def bump_reference_version(cursor: sqlite3.Cursor):
+    cursor.execute("UPDATE reference_data_version SET version = version + 1 WHERE id = 1")
+
+
+def _create_reference_version(cursor: sqlite3.Cursor):
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS reference_data_version (
+                       id INTEGER PRIMARY KEY CHECK (id = 1),
+                       version INTEGER NOT NULL
+                   )
+                   ''')
+    cursor.execute("INSERT OR IGNORE INTO reference_data_version (id, version) VALUES (1, 0)")
+    create_reference_version_triggers(cursor)
+
+
+def _create_symptoms_fts(cursor: sqlite3.Cursor):
+    symptom_search.create_fts_schema(cursor)
+
+
+def _create_ai_cost_ledger(cursor: sqlite3.Cursor):
+    cursor.execute(CREATE_LEDGER_SQL)
+
+
+def _create_translation_memory(cursor: sqlite3.Cursor):
+    cursor.execute(CREATE_TRANSLATION_MEMORY_SQL)
+
+
+def _create_conversation_turns(cursor: sqlite3.Cursor):
+    cursor.execute(CREATE_CONVERSATION_TURNS_SQL)
+    cursor.execute(CREATE_CONVERSATION_TURNS_INDEX_SQL)
+
+
+# Append-only: never edit or reorder an entry once it has shipped
+MIGRATIONS: List[Migration] = [
+    (1, 'base_tables', _create_base_tables),
+    (2, 'reference_data_version', _create_reference_version),
+    (3, 'symptoms_fts', _create_symptoms_fts),
+    (4, 'ai_cost_ledger', _create_ai_cost_ledger),
+    (5, 'translation_memory', _create_translation_memory),
+    (6, 'conversation_turns', _create_conversation_turns),
+]
+
+
+def _ensure_bookkeeping(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS dataset_versions (
+            name TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            row_count INTEGER,
+            loaded_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    if not table_exists(conn, 'schema_migrations'):
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations").fetchone()[0]
+
+
+def dataset_version(conn: sqlite3.Connection, name: str) -> Optional[str]:
+    if not table_exists(conn, 'dataset_versions'):
+        return None
+    row = conn.execute("SELECT version FROM dataset_versions WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def run_migrations(pool, migrations: List[Migration] = None) -> int:
+    """Apply pending migrations; returns how many were applied by this process"""
+    migrations = migrations or MIGRATIONS
+    latest = max(version for version, _, _ in migrations)
+
+    with pool.reader() as conn:
+        if schema_version(conn) >= latest:
+            return 0
+
+    applied = 0
+    with pool.writer() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        _ensure_bookkeeping(conn)
+        current = schema_version(conn)  # another worker may have won the race
+
+        cursor = conn.cursor()
+        for version, name, apply in migrations:
+            if version <= current:
+                continue
+            apply(cursor)
+            cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+            logger.info(f"Applied schema migration {version}: {name}")
+            applied += 1
+
+    return applied
+
+
+def seed_dataset(pool, name: str, version: str, apply: Callable[[sqlite3.Cursor], int]) -> bool:
+    """Run `apply` once per dataset version; returns True if it ran.
+
+    `apply` receives a cursor inside the write transaction and returns the
+    number of rows it loaded.
+    """
+    version = str(version)
+    with pool.reader() as conn:
+        if dataset_version(conn, name) == version:
+            return False
+
+    with pool.writer() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        _ensure_bookkeeping(conn)
+        if dataset_version(conn, name) == version:
+            return False
+
+        row_count = apply(conn.cursor())
+        conn.execute('''
+            INSERT INTO dataset_versions (name, version, row_count, loaded_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(name) DO UPDATE SET
+                version = excluded.version,
+                row_count = excluded.row_count,
+                loaded_at = excluded.loaded_at
+        ''', (name, version, row_count))
+
+    logger.info(f"Loaded dataset {name} version {version} ({row_count} rows)")
+    return True
+
+
+def fts_enabled(pool) -> bool:
+    with pool.reader() as conn:
+        return table_exists(conn, 'symptoms_fts')
@@ -0,0 +1,98 @@
+"""
+Registry of prompt templates loaded once and pre-parsed.
+
+A template file is read the first time it is requested and split into
+literal text and `{name}` placeholders, so rendering is a single join with
+no file I/O. In dev mode the file's mtime is checked on each lookup and the
+template is re-parsed when it changes, so prompt edits show up without a
+restart.
+"""
+
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+
+
+class PromptTemplate:
+    """Template text split into alternating literal and placeholder parts"""
+
+    __slots__ = ('name', 'source', 'mtime', '_parts', 'placeholders')
+
+    def __init__(self, name: str, source: str, mtime: Optional[float] = None):
+        self.name = name
+        self.source = source
+        self.mtime = mtime
+        # Even indexes are literal text, odd indexes are placeholder names
+        self._parts: List[str] = _PLACEHOLDER_RE.split(source)
+        self.placeholders = frozenset(self._parts[1::2])
+
+    def render(self, **values: str) -> str:
+        parts = self._parts[:]
+        for index in range(1, len(parts), 2):
+            name = parts[index]
+            # Unknown placeholders are left as written, like str.replace would
+            parts[index] = values[name] if name in values else "{" + name + "}"
+        return "".join(parts)
+
+
+class PromptRegistry:
+    """Loads prompt files from one directory and caches their parsed form"""
+
+    def __init__(self, directory: Path, reload: bool = False,
+                 loader: Optional[Callable[[str], str]] = None):
+        self.directory = Path(directory)
+        self.reload = reload
+        self.loader = loader or (lambda path: Path(path).read_text())
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _mtime(self, path: Path) -> Optional[float]:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _load(self, name: str) -> PromptTemplate:
+        path = self._path(name)
+        mtime = self._mtime(path)
+        template = PromptTemplate(name, self.loader(str(path)), mtime)
+        self.loads += 1
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        template = self._templates.get(name)
+        if template is not None and not self.reload:
+            return template
+
+        with self._lock:
+            template = self._templates.get(name)
+            if template is None or (self.reload and self._mtime(self._path(name)) != template.mtime):
+                if template is not None:
+                    logger.info(f"Reloading prompt template {name}")
+                template = self._load(name)
+                self._templates[name] = template
+            return template
+
+    def render(self, name: str, **values: str) -> str:
+        return self.get(name).render(**values)
+
+    def preload(self, *names: str):
+        for name in names:
+            self.get(name)
+
+    def snapshot(self) -> Dict:
+        return {
+            'templates': sorted(self._templates),
+            'loads': self.loads,
+            'reload': self.reload,
+        }
@@ -0,0 +1,299 @@
+"""
+Latency-aware routing across AI providers.
+
+Each provider keeps a rolling window of call latencies and outcomes. Calls go
+to the provider with the lowest expected latency (median latency inflated by
+its error rate); if the primary has not answered by its own p95, a hedged
+request is sent to the next provider and whichever succeeds first wins, the
+other is cancelled. Providers that keep failing are taken out of rotation by
+a circuit breaker until a cool-down has passed, after which a single trial
+request decides whether they come back.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class NoProviderAvailable(Exception):
+    """Every candidate provider is excluded by its circuit breaker"""
+
+
+class ProviderSkipped(Exception):
+    """Raised by a request callable that decided not to call the provider at all"""
+
+
+class AllProvidersFailed(Exception):
+    """Every provider that was tried raised an error"""
+
+    def __init__(self, errors: Dict[str, BaseException]):
+        self.errors = errors
+        super().__init__("; ".join(f"{name}: {error!r}" for name, error in errors.items()))
+
+
+class ProviderStats:
+    """Rolling latency and error-rate window for one provider"""
+
+    def __init__(self, window: int = 200):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+
+    def record_success(self, latency: Optional[float] = None):
+        if latency is not None:
+            self._latencies.append(latency)
+        self._outcomes.append(True)
+        self.requests += 1
+
+    def record_failure(self):
+        self._outcomes.append(False)
+        self.requests += 1
+        self.failures += 1
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    def snapshot(self) -> Dict:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return value * 1000 if value is not None else None
+
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'samples': self.samples,
+            'error_rate': self.error_rate,
+            'latency_ms_p50': ms(self.percentile(0.50)),
+            'latency_ms_p95': ms(self.percentile(0.95)),
+            'latency_ms_p99': ms(self.percentile(0.99)),
+        }
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; one trial request after the cool-down"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.times_opened = 0
+
+    def available(self) -> bool:
+        """Whether a request could be sent now (does not claim the trial slot)"""
+        if self.state == BREAKER_CLOSED:
+            return True
+        if self.state == BREAKER_OPEN:
+            return self.clock() - self.opened_at >= self.cooldown
+        return not self.trial_in_flight
+
+    def acquire(self) -> bool:
+        """Claim permission to send a request"""
+        if self.state == BREAKER_OPEN:
+            if self.clock() - self.opened_at < self.cooldown:
+                return False
+            self.state = BREAKER_HALF_OPEN
+            self.trial_in_flight = False
+        if self.state == BREAKER_HALF_OPEN:
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                self.times_opened += 1
+            self.state = BREAKER_OPEN
+            self.opened_at = self.clock()
+            self.trial_in_flight = False
+
+    def record_cancelled(self):
+        # A cancelled hedge loser says nothing about the provider's health
+        self.trial_in_flight = False
+
+
+class ProviderRouter:
+    """Ranks providers by observed latency and races hedged requests"""
+
+    def __init__(self, providers: Sequence[str], window: int = 200, min_samples: int = 20,
+                 hedging: bool = True, hedge_default_delay: float = 2.0, hedge_min_delay: float = 0.25,
+                 failure_threshold: int = 5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.providers = list(providers)
+        self.min_samples = min_samples
+        self.hedging = hedging
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.clock = clock
+
+        self.stats = {name: ProviderStats(window) for name in self.providers}
+        self.breakers = {name: CircuitBreaker(failure_threshold, cooldown, clock) for name in self.providers}
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def expected_latency(self, name: str) -> float:
+        """Median latency inflated by the error rate; a prior until enough samples exist"""
+        stats = self.stats[name]
+        if stats.samples < self.min_samples:
+            return self.hedge_default_delay
+        return stats.percentile(0.50) / max(1.0 - stats.error_rate, 0.05)
+
+    def rank(self, candidates: Sequence[str]) -> List[str]:
+        """Candidates whose breaker allows a call, best first (stable for ties)"""
+        with self._lock:
+            usable = [name for name in candidates if name in self.stats and self.breakers[name].available()]
+            return sorted(usable, key=self.expected_latency)
+
+    def hedge_delay(self, name: str) -> float:
+        """How long to wait on `name` before sending a hedged request"""
+        stats = self.stats[name]
+        if stats.samples < self.min_samples:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, stats.percentile(0.95))
+
+    def acquire(self, name: str) -> bool:
+        """Claim a call slot from the provider's circuit breaker"""
+        with self._lock:
+            return self.breakers[name].acquire()
+
+    def record_success(self, name: str, latency: Optional[float] = None):
+        with self._lock:
+            self.stats[name].record_success(latency)
+            self.breakers[name].record_success()
+
+    def record_failure(self, name: str):
+        with self._lock:
+            self.stats[name].record_failure()
+            breaker = self.breakers[name]
+            was_open = breaker.state == BREAKER_OPEN
+            breaker.record_failure()
+            if breaker.state == BREAKER_OPEN and not was_open:
+                logger.warning(f"Circuit breaker opened for AI provider {name}")
+
+    def record_cancelled(self, name: str):
+        with self._lock:
+            self.breakers[name].record_cancelled()
+
+    async def call(self, candidates: Sequence[str],
+                   request: Callable[[str], Awaitable[T]]) -> Tuple[str, T, List[str]]:
+        """Run `request(provider)` against the best provider, hedging slow ones.
+
+        Returns (winning provider, its result, every provider that was
+        started). Providers are tried one after another on failure; a hedge
+        is only ever one request ahead of the slowest outstanding one.
+        """
+        queue = self.rank(candidates)
+        if not queue:
+            raise NoProviderAvailable("All AI providers are unavailable")
+
+        errors: Dict[str, BaseException] = {}
+        started: List[str] = []
+        hedged: List[str] = []
+        pending: Dict[asyncio.Future, Tuple[str, float]] = {}
+
+        def launch_next() -> bool:
+            while queue:
+                name = queue.pop(0)
+                if self.acquire(name):
+                    task = asyncio.ensure_future(request(name))
+                    pending[task] = (name, self.clock())
+                    started.append(name)
+                    return True
+            return False
+
+        try:
+            launch_next()
+            while pending:
+                timeout = None
+                if self.hedging and queue and len(pending) == 1:
+                    (name, started_at), = pending.values()
+                    timeout = max(0.0, started_at + self.hedge_delay(name) - self.clock())
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The primary is slower than its p95: race a second provider
+                    if launch_next():
+                        self.hedges_sent += 1
+                        hedged.append(started[-1])
+                    continue
+
+                for task in done:
+                    name, started_at = pending.pop(task)
+                    error = task.exception()
+                    if isinstance(error, ProviderSkipped):
+                        # Not the provider's fault, e.g. no budget left for it
+                        self.record_cancelled(name)
+                        errors[name] = error
+                        continue
+                    if error is not None:
+                        self.record_failure(name)
+                        errors[name] = error
+                        continue
+
+                    self.record_success(name, self.clock() - started_at)
+                    if name in hedged:
+                        self.hedges_won += 1
+                    return name, task.result(), started
+
+                if not pending:
+                    launch_next()
+
+            raise AllProvidersFailed(errors)
+        finally:
+            for task, (name, _) in pending.items():
+                task.cancel()
+                self.record_cancelled(name)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            providers = {}
+            for name in self.providers:
+                breaker = self.breakers[name]
+                providers[name] = {
+                    **self.stats[name].snapshot(),
+                    'circuit': breaker.state,
+                    'circuit_opened': breaker.times_opened,
+                    'hedge_delay_ms': self.hedge_delay(name) * 1000,
+                }
+            return {
+                'hedging': self.hedging,
+                'hedges_sent': self.hedges_sent,
+                'hedges_won': self.hedges_won,
+                'providers': providers,
+            }
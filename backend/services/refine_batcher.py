@@ -0,0 +1,109 @@
+"""
+Micro-batching queue for the translation refinement LLM call.
+
+Callers await `submit(text)`. Queued texts are grouped into batches, and a
+batch is dispatched as soon as it reaches `max_batch_size` or the oldest
+text has waited `max_wait` seconds. Each batch is handed to an async
+handler that returns one result per text, in order, and every result is
+resolved onto the future of the text it belongs to. Batches run as
+independent tasks, so a slow upstream call does not hold up the next batch.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[List[str]], Awaitable[List[str]]]
+
+
+class RefineBatcher:
+    """Bounded-wait batch queue in front of a list-in, list-out async handler"""
+
+    def __init__(self, handler: BatchHandler, max_batch_size: int = 8, max_wait: float = 0.02):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.loop = asyncio.get_running_loop()
+
+        self._queue: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+        self.submitted = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.failed = 0
+
+    async def submit(self, text: str) -> str:
+        """Queue one text and wait for its refined version"""
+        future = self.loop.create_future()
+        self._queue.append((text, future))
+        self.submitted += 1
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush(partial=False)
+        elif self._timer is None:
+            # The window starts when the oldest queued text arrived
+            self._timer = self.loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self, partial: bool = True):
+        """Dispatch every full batch, plus the remainder when the wait window is over"""
+        # Callers that were cancelled while queued are not sent upstream
+        self._queue = [(text, future) for text, future in self._queue if not future.done()]
+
+        while len(self._queue) >= self.max_batch_size or (partial and self._queue):
+            batch, self._queue = self._queue[:self.max_batch_size], self._queue[self.max_batch_size:]
+            task = self.loop.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._timer is not None and (partial or not self._queue):
+            self._timer.cancel()
+            self._timer = None
+        if self._queue and self._timer is None:
+            self._timer = self.loop.call_later(self.max_wait, self._flush)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        texts = [text for text, _ in batch]
+        try:
+            results = await self.handler(texts)
+            if len(results) != len(texts):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(texts)} texts")
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Refinement batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.batched_items += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        return {
+            'queue_depth': len(self._queue),
+            'batches_in_flight': len(self._tasks),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'submitted': self.submitted,
+            'batches': self.batches,
+            'average_batch_size': self.batched_items / self.batches if self.batches else 0.0,
+            'failed': self.failed,
+        }
+
+    async def close(self):
+        """Dispatch whatever is queued and wait for batches in flight"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
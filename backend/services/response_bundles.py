@@ -0,0 +1,92 @@
+"""
+Pre-translated, pre-serialized emergency and fallback responses.
+
+The texts for every supported language live in data/emergency_responses.json
+and are loaded once at import. Each (kind, language) pair becomes an
+immutable ResponseBundle holding the text plus the encoded JSON body of a
+health-chat response, split around the two per-request fields
+(response_time and request_id), so answering an emergency costs a lookup
+and a byte join instead of model validation and JSON encoding.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+BUNDLES_PATH = Path(__file__).resolve().parent.parent / "data" / "emergency_responses.json"
+
+SUPPORTED_LANGUAGES = ('en', 'ar', 'fr', 'ur')
+
+# Static HealthChatResponse fields for each kind, in the model's field order
+RESPONSE_FIELDS = {
+    'emergency': {
+        'intent': 'emergency',
+        'confidence': 1.0,
+        'risk_level': 'critical',
+        'emergency_alert': True,
+        'requires_human_intervention': True,
+    },
+    'fallback': {
+        'intent': 'system_fallback',
+        'confidence': 1.0,
+        'risk_level': 'low',
+        'emergency_alert': False,
+        'requires_human_intervention': True,
+    },
+    'error': {
+        'intent': 'error',
+        'confidence': 0.0,
+        'risk_level': 'low',
+        'emergency_alert': False,
+        'requires_human_intervention': True,
+    },
+}
+
+
+@dataclass(frozen=True)
+class ResponseBundle:
+    kind: str
+    language: str
+    text: str
+    json_head: bytes    # '{"response": ..., "cost_estimate": 0.0, "response_time": '
+    sse_message: bytes  # complete 'message' server-sent event carrying the text
+
+    def render_json(self, response_time: float, request_id: str) -> bytes:
+        """Full HealthChatResponse JSON body; request_id must be JSON-safe (req_<digits>)"""
+        return b'%s%r, "request_id": "%s"}' % (self.json_head, response_time, request_id.encode())
+
+
+def _build(kind: str, language: str, text: str) -> ResponseBundle:
+    fields = {'response': text, **RESPONSE_FIELDS[kind], 'used_ai_model': None, 'cost_estimate': 0.0}
+    body = json.dumps(fields, ensure_ascii=False)
+    return ResponseBundle(
+        kind=kind,
+        language=language,
+        text=text,
+        json_head=(body[:-1] + ', "response_time": ').encode('utf-8'),
+        sse_message=f"event: message\ndata: {json.dumps({'text': text}, ensure_ascii=False)}\n\n".encode('utf-8'),
+    )
+
+
+def load_bundles(path: Path = BUNDLES_PATH) -> Mapping[Tuple[str, str], ResponseBundle]:
+    """Read-only map of (kind, language) -> bundle; every kind must cover every supported language"""
+    raw = json.loads(path.read_text(encoding='utf-8'))
+    bundles = {}
+    for kind in RESPONSE_FIELDS:
+        texts = raw[kind]
+        missing = [language for language in SUPPORTED_LANGUAGES if language not in texts]
+        if missing:
+            raise ValueError(f"{path.name}: '{kind}' has no text for {', '.join(missing)}")
+        for language in SUPPORTED_LANGUAGES:
+            bundles[kind, language] = _build(kind, language, "\n".join(texts[language]))
+    return MappingProxyType(bundles)
+
+
+BUNDLES = load_bundles()
+
+
+def bundle(kind: str, language: str) -> ResponseBundle:
+    """Bundle for `language`, or the English one for an unsupported language"""
+    return BUNDLES.get((kind, language)) or BUNDLES[kind, 'en']
@@ -0,0 +1,326 @@
+"""
+Cache of validated AI answers to health questions.
+
+Entries are keyed on the normalized question plus language and cultural
+background. Lookups first try an exact match on the normalized text, then
+a similarity match: TF-IDF cosine over the normalized tokens, using an
+inverted index to find neighbours that share at least one term. A similar
+entry is only reused if it mentions exactly the same symptoms and the same
+negations, so "headache" never answers "headache and fever" and "fever"
+never answers "no fever". Entries expire after a TTL and the least
+recently used ones are evicted beyond the entry and byte limits.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+STOPWORDS = frozenset({
+    'a', 'an', 'the', 'i', 'im', 'me', 'my', 'mine', 'is', 'am', 'are', 'was', 'were', 'be', 'been',
+    'have', 'has', 'had', 'having', 'do', 'does', 'did', 'got', 'get', 'getting', 'of', 'to', 'in',
+    'on', 'for', 'with', 'and', 'or', 'it', 'its', 'this', 'that', 'so', 'very', 'really', 'some',
+    'since', 'today', 'please', 'can', 'could', 'you', 'what', 'should', 'just', 'bit', 'little',
+    'at', 'by', 'from', 'about', 'how', 'any', 'also', 'now', 'lately', 'recently', 'there', 'would',
+})
+
+NEGATIONS = frozenset({'no', 'not', 'without', 'never', 'none', 'nor', 'dont', 'cant', 'isnt', 'didnt'})
+
+# Common paraphrases folded onto one canonical phrase before tokenizing
+CANONICAL_PHRASES = (
+    (r"\bhead (?:hurts|is hurting|aches|is aching|ache|pain)\b", "headache"),
+    (r"\b(?:stomach|tummy|belly) (?:hurts|is hurting|aches|ache|pain)\b", "stomach ache"),
+    (r"\b(?:tummy|belly)ache\b", "stomach ache"),
+    (r"\bstomachache\b", "stomach ache"),
+    (r"\bthroat (?:hurts|is sore|is hurting)\b", "sore throat"),
+    (r"\bback (?:hurts|is hurting|aches)\b", "back pain"),
+    (r"\bfeel(?:ing)? (?:sick to my stomach|queasy)\b", "nausea"),
+    (r"\b(?:high )?temperature\b", "fever"),
+    (r"\b(?:tired|exhausted|worn out)\b", "fatigue"),
+    (r"\blight ?headed\b", "dizzy"),
+    (r"\bdo not\b", "dont"),
+    (r"\bcan ?not\b", "cant"),
+)
+_CANONICAL_RE = [(re.compile(pattern), replacement) for pattern, replacement in CANONICAL_PHRASES]
+
+
+def _singular(token: str) -> str:
+    if len(token) > 4 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def normalize(text: str) -> List[str]:
+    """Lower-case, fold paraphrases and plurals, drop punctuation and stopwords"""
+    text = text.lower().replace("'", "").replace("’", "")
+    for pattern, replacement in _CANONICAL_RE:
+        text = pattern.sub(replacement, text)
+    return [_singular(token) for token in _TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+
+@dataclass
+class CacheEntry:
+    key: Tuple[str, str, str]
+    response: str
+    cost: float
+    symptoms: FrozenSet[str]
+    negations: FrozenSet[str]
+    term_counts: Dict[str, int]
+    created_at: float
+    size: int
+    hits: int = 0
+
+
+@dataclass
+class CacheLookup:
+    response: str
+    cost_saved: float
+    tier: str          # "exact" or "similar"
+    similarity: float
+
+
+@dataclass
+class CacheStats:
+    exact_hits: int = 0
+    similar_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    rejected_unsafe: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    cost_saved: float = 0.0
+
+
+class ResponseCache:
+    """Exact plus TF-IDF similarity cache with TTL and LRU eviction"""
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 8 * 1024 * 1024,
+                 ttl: float = 6 * 3600, similarity_threshold: float = 0.8):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[Tuple[str, str, str], CacheEntry]" = OrderedDict()
+        self._postings: Dict[Tuple[str, str], Dict[str, Set[Tuple[str, str, str]]]] = {}
+        self._document_frequency: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._partition_sizes: Dict[Tuple[str, str], int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    @staticmethod
+    def _partition(language: str, cultural_background: str) -> Tuple[str, str]:
+        return language.lower(), cultural_background.lower()
+
+    def _key(self, tokens: List[str], language: str, cultural_background: str) -> Tuple[str, str, str]:
+        return (' '.join(tokens),) + self._partition(language, cultural_background)
+
+    def get(self, query: str, language: str, cultural_background: str,
+            symptoms: Iterable[str] = ()) -> Optional[CacheLookup]:
+        """Cached answer for an equivalent question, or None"""
+        tokens = normalize(query)
+        if not tokens:
+            return None
+        key = self._key(tokens, language, cultural_background)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(entry)
+                self.stats.expirations += 1
+                entry = None
+
+            if entry is not None:
+                return self._hit(entry, "exact", 1.0)
+
+            match = self._nearest(tokens, key[1:], frozenset(symptoms), self._negations(tokens), now)
+            if match is not None:
+                entry, similarity = match
+                return self._hit(entry, "similar", similarity)
+
+            self.stats.misses += 1
+            return None
+
+    def put(self, query: str, language: str, cultural_background: str, response: str,
+            cost: float, symptoms: Iterable[str] = ()) -> bool:
+        """Store an answer that already passed response validation"""
+        tokens = normalize(query)
+        if not tokens or not response:
+            return False
+        key = self._key(tokens, language, cultural_background)
+
+        term_counts: Dict[str, int] = {}
+        for token in tokens:
+            term_counts[token] = term_counts.get(token, 0) + 1
+
+        entry = CacheEntry(
+            key=key,
+            response=response,
+            cost=cost,
+            symptoms=frozenset(symptoms),
+            negations=self._negations(tokens),
+            term_counts=term_counts,
+            created_at=time.monotonic(),
+            size=len(response.encode('utf-8')) + len(key[0]),
+        )
+        if entry.size > self.max_bytes:
+            return False
+
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._remove(existing)
+            self._add(entry)
+            self.stats.stores += 1
+            self._evict()
+        return True
+
+    def record_rejected(self):
+        """Count an answer that was not cached because it failed validation"""
+        with self._lock:
+            self.stats.rejected_unsafe += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._document_frequency.clear()
+            self._partition_sizes.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Internal helpers - callers hold self._lock
+
+    @staticmethod
+    def _negations(tokens: List[str]) -> FrozenSet[str]:
+        # Negated term = the token right after a negation word
+        return frozenset(
+            tokens[index + 1] for index, token in enumerate(tokens[:-1]) if token in NEGATIONS
+        ) | frozenset(token for token in tokens if token in NEGATIONS)
+
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created_at > self.ttl
+
+    def _hit(self, entry: CacheEntry, tier: str, similarity: float) -> CacheLookup:
+        self._entries.move_to_end(entry.key)
+        entry.hits += 1
+        if tier == "exact":
+            self.stats.exact_hits += 1
+        else:
+            self.stats.similar_hits += 1
+        self.stats.cost_saved += entry.cost
+        return CacheLookup(entry.response, entry.cost, tier, similarity)
+
+    def _add(self, entry: CacheEntry):
+        partition = entry.key[1:]
+        postings = self._postings.setdefault(partition, {})
+        frequency = self._document_frequency.setdefault(partition, {})
+        for term in entry.term_counts:
+            postings.setdefault(term, set()).add(entry.key)
+            frequency[term] = frequency.get(term, 0) + 1
+        self._partition_sizes[partition] = self._partition_sizes.get(partition, 0) + 1
+        self._entries[entry.key] = entry
+        self._bytes += entry.size
+
+    def _remove(self, entry: CacheEntry):
+        partition = entry.key[1:]
+        postings = self._postings.get(partition, {})
+        frequency = self._document_frequency.get(partition, {})
+        for term in entry.term_counts:
+            keys = postings.get(term)
+            if keys is not None:
+                keys.discard(entry.key)
+                if not keys:
+                    del postings[term]
+            if term in frequency:
+                frequency[term] -= 1
+                if frequency[term] <= 0:
+                    del frequency[term]
+        self._partition_sizes[partition] -= 1
+        del self._entries[entry.key]
+        self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, oldest = next(iter(self._entries.items()))
+            self._remove(oldest)
+            self.stats.evictions += 1
+
+    def _vector(self, term_counts: Dict[str, int], frequency: Dict[str, int], documents: int) -> Dict[str, float]:
+        vector = {}
+        for term, count in term_counts.items():
+            idf = math.log((1 + documents) / (1 + frequency.get(term, 0))) + 1.0
+            vector[term] = count * idf
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def _nearest(self, tokens: List[str], partition: Tuple[str, str], symptoms: FrozenSet[str],
+                 negations: FrozenSet[str], now: float) -> Optional[Tuple[CacheEntry, float]]:
+        postings = self._postings.get(partition)
+        if not postings:
+            return None
+
+        candidates: Set[Tuple[str, str, str]] = set()
+        for token in set(tokens):
+            candidates.update(postings.get(token, ()))
+        if not candidates:
+            return None
+
+        frequency = self._document_frequency[partition]
+        documents = self._partition_sizes.get(partition, 0)
+        query_counts: Dict[str, int] = {}
+        for token in tokens:
+            query_counts[token] = query_counts.get(token, 0) + 1
+        query_vector = self._vector(query_counts, frequency, documents)
+
+        best: Optional[Tuple[CacheEntry, float]] = None
+        expired: List[CacheEntry] = []
+        for key in candidates:
+            entry = self._entries[key]
+            if self._expired(entry, now):
+                expired.append(entry)
+                continue
+            # Never reuse an answer about different symptoms or negations
+            if entry.symptoms != symptoms or entry.negations != negations:
+                continue
+            vector = self._vector(entry.term_counts, frequency, documents)
+            similarity = sum(weight * vector.get(term, 0.0) for term, weight in query_vector.items())
+            if similarity >= self.similarity_threshold and (best is None or similarity > best[1]):
+                best = (entry, similarity)
+
+        for entry in expired:
+            self._remove(entry)
+            self.stats.expirations += 1
+        return best
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stats = self.stats
+            lookups = stats.exact_hits + stats.similar_hits + stats.misses
+            hits = stats.exact_hits + stats.similar_hits
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'lookups': lookups,
+                'exact_hits': stats.exact_hits,
+                'similar_hits': stats.similar_hits,
+                'misses': stats.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'stores': stats.stores,
+                'rejected_unsafe': stats.rejected_unsafe,
+                'evictions': stats.evictions,
+                'expirations': stats.expirations,
+                'cost_saved': stats.cost_saved,
+            }
@@ -0,0 +1,404 @@
+"""
+Compiled single-pass matching engine for safety validation.
+
+Keyword rules and the literal prefixes of regex rules are compiled into one
+keyword trie, itself driven by a single lookahead regex so the scan for
+candidate positions runs inside the C regex engine. Regex rules are then
+only tried at positions where their literal prefix occurred; rules without a
+usable prefix are folded into one combined alternation per category (each
+rule in its own named group). Every hit reports the rule that fired.
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Regex rules need at least this many literal leading characters to be
+# triggered from the keyword trie instead of scanned on their own
+MIN_TRIGGER_LENGTH = 3
+
+_REGEX_META = set('.^$*+?{}[]|()')
+_QUANTIFIERS = set('*+?{')
+
+
+@dataclass(frozen=True)
+class Match:
+    category: str
+    rule: str
+    start: int
+    end: int
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """Whether `pattern` has a `|` outside any group or character class"""
+    depth = 0
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+            # A ']' right after '[' or '[^' is a literal member of the class
+            if pattern.startswith('^', index + 1):
+                index += 1
+            if pattern.startswith(']', index + 1):
+                index += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return True
+        index += 1
+    return False
+
+
+def head_before_gap(pattern: str) -> Optional[str]:
+    """Part of `pattern` before its first unbounded gap (`.*` or `.+`), None without one.
+
+    A gap inside a group cuts before that whole group, so the head is always
+    a complete regex that every match of `pattern` must start with.
+    """
+    depth = 0
+    in_class = False
+    group_start = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            index += 2
+            continue
+        if in_class:
+            if char == ']':
+                in_class = False
+        elif char == '[':
+            in_class = True
+            if pattern.startswith('^', index + 1):
+                index += 1
+            if pattern.startswith(']', index + 1):
+                index += 1
+        elif char == '(':
+            if depth == 0:
+                group_start = index
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '.' and pattern[index + 1:index + 2] in ('*', '+'):
+            return pattern[:group_start] if depth else pattern[:index]
+        index += 1
+    return None
+
+
+def literal_prefix(pattern: str) -> str:
+    """Leading characters every match of `pattern` must start with"""
+    if _has_top_level_alternation(pattern):
+        return ''  # each branch starts differently
+    prefix: List[str] = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == '\\':
+            if index + 1 >= len(pattern) or pattern[index + 1].isalnum():
+                break  # character class escape such as \d or \b
+            char = pattern[index + 1]
+            step = 2
+        elif char in _REGEX_META:
+            break
+        else:
+            step = 1
+
+        following = pattern[index + step] if index + step < len(pattern) else ''
+        if following in _QUANTIFIERS:
+            break  # this character is optional or repeated
+        prefix.append(char)
+        index += step
+    return ''.join(prefix)
+
+
+class KeywordTrie:
+    """Multi-keyword matcher reporting every (possibly overlapping) occurrence.
+
+    The trie is also compiled into a single lookahead regex, so finding the
+    positions where any keyword can start happens in the C regex engine; the
+    trie is then walked in Python only at those positions.
+    """
+
+    _TERMINAL = None
+
+    def __init__(self, entries: Iterable[Tuple[str, object]]):
+        self._root: Dict = {}
+        self.size = 0
+        for keyword, payload in entries:
+            if not keyword:
+                continue
+            node = self._root
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node.setdefault(self._TERMINAL, []).append(payload)
+            self.size += 1
+
+        self._starts = re.compile(f"(?={self._compile(self._root)})") if self._root else None
+
+    def _compile(self, node: Dict) -> str:
+        # A keyword can start here as soon as any terminal is reachable,
+        # so branches stop at the first terminal on their path
+        branches = []
+        for char, child in node.items():
+            if char is self._TERMINAL:
+                continue
+            if self._TERMINAL in child:
+                branches.append(re.escape(char))
+            else:
+                branches.append(re.escape(char) + self._compile(child))
+        return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+    def __len__(self) -> int:
+        return self.size
+
+    def iter_matches(self, text: str):
+        """Yield (payload, start, end) for every keyword occurrence"""
+        if self._starts is None:
+            return
+        terminal = self._TERMINAL
+        for found in self._starts.finditer(text):
+            start = found.start()
+            node = self._root
+            for index in range(start, len(text)):
+                node = node.get(text[index])
+                if node is None:
+                    break
+                for payload in node.get(terminal, ()):
+                    yield payload, start, index + 1
+
+
+class RegexCategory:
+    """One combined alternation for a category's untriggered regex rules"""
+
+    def __init__(self, category: str, patterns: Sequence[str], flags: int = 0):
+        self.category = category
+        self._group_rules: Dict[str, str] = {}
+        parts = []
+        for index, pattern in enumerate(patterns):
+            group = f"r{index}"
+            self._group_rules[group] = pattern
+            parts.append(f"(?P<{group}>{pattern})")
+        self._regex = re.compile('|'.join(parts), flags) if parts else None
+
+    def iter_matches(self, text: str):
+        if self._regex is None:
+            return
+        for found in self._regex.finditer(text):
+            yield Match(self.category, self._group_rules[found.lastgroup], found.start(), found.end())
+
+
+class SafetyScanner:
+    """Keyword trie with regex prefilters plus per-category fallback alternations"""
+
+    _KEYWORD = 0
+    _REGEX = 1
+
+    def __init__(self, keywords: Dict[str, Sequence[str]], patterns: Dict[str, Sequence[str]], flags: int = 0):
+        self.categories = set(keywords) | set(patterns)
+        self.patterns = {category: list(rules) for category, rules in patterns.items()}
+        self.flags = flags
+        entries: List[Tuple[str, tuple]] = []
+
+        for category, words in keywords.items():
+            for word in words:
+                word = word.lower()
+                entries.append((word, (self._KEYWORD, category, word, None)))
+
+        untriggered: Dict[str, List[str]] = {}
+        for category, rules in patterns.items():
+            for rule in rules:
+                prefix = literal_prefix(rule)
+                if len(prefix) >= MIN_TRIGGER_LENGTH and not flags & re.IGNORECASE:
+                    entries.append((prefix, (self._REGEX, category, rule, re.compile(rule, flags))))
+                else:
+                    untriggered.setdefault(category, []).append(rule)
+
+        self._trie = KeywordTrie(entries)
+        self._fallbacks = [RegexCategory(category, rules, flags) for category, rules in untriggered.items()]
+
+    def scan(self, text: str, categories: Optional[Iterable[str]] = None) -> List[Match]:
+        """Every keyword and pattern hit in lower-cased `text`, in text order"""
+        wanted = set(categories) if categories is not None else self.categories
+        hits: List[Match] = []
+
+        for (kind, category, rule, compiled), start, end in self._trie.iter_matches(text):
+            if category not in wanted:
+                continue
+            if kind == self._KEYWORD:
+                hits.append(Match(category, rule, start, end))
+            else:
+                found = compiled.match(text, start)
+                if found:
+                    hits.append(Match(category, rule, found.start(), found.end()))
+
+        for fallback in self._fallbacks:
+            if fallback.category in wanted:
+                hits.extend(fallback.iter_matches(text))
+
+        hits.sort(key=lambda hit: (hit.start, hit.end))
+        return hits
+
+    def scan_many(self, texts: Sequence[str], categories: Optional[Iterable[str]] = None) -> List[List[Match]]:
+        """scan() over a batch of lower-cased texts in a single pass.
+
+        The texts are joined with newlines, which no rule matches across, and
+        each hit is handed back to its own text with offsets relative to it.
+        """
+        if not texts:
+            return []
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+
+        results: List[List[Match]] = [[] for _ in texts]
+        for hit in self.scan('\n'.join(texts), categories):
+            index = bisect_right(starts, hit.start) - 1
+            offset = starts[index]
+            results[index].append(Match(hit.category, hit.rule, hit.start - offset, hit.end - offset))
+        return results
+
+    @staticmethod
+    def by_category(hits: Iterable[Match]) -> Dict[str, List[Match]]:
+        grouped: Dict[str, List[Match]] = {}
+        for hit in hits:
+            grouped.setdefault(hit.category, []).append(hit)
+        return grouped
+
+
+class UnsafeStreamError(Exception):
+    """Raised by guarded_stream when a streamed response violates a safety rule"""
+
+    def __init__(self, violations: List[Match]):
+        self.violations = violations
+        super().__init__(f"Unsafe content in stream: {', '.join(hit.rule for hit in violations)}")
+
+
+class StreamingSafetyValidator:
+    """Incremental response validation for token-streamed output.
+
+    Chunks are appended to a buffer and only the newly reachable region is
+    rescanned: rules never match across a newline, so the scan restarts at
+    the beginning of the current line (capped at `max_window` characters).
+    The last `holdback` characters are withheld until more text arrives, so
+    a forbidden phrase shorter than that is never partially shown before the
+    stream is aborted. Forbidden rules with an unbounded gap (`ignore .*
+    symptoms`) can match further than any holdback: once the part before the
+    gap has appeared on the current line, everything from there on is
+    withheld until the line ends or the stream finishes.
+    """
+
+    def __init__(self, scanner: SafetyScanner, forbidden_category: str = 'forbidden_advice',
+                 disclaimer_category: str = 'disclaimer', holdback: int = 64, max_window: int = 4096):
+        self.scanner = scanner
+        self.forbidden_category = forbidden_category
+        self.disclaimer_category = disclaimer_category
+        self.holdback = holdback
+        self.max_window = max_window
+        heads = (head_before_gap(rule) for rule in scanner.patterns.get(forbidden_category, ()))
+        heads = [head for head in heads if head is not None]
+        self._open_rules = re.compile('|'.join(f"(?:{head})" for head in heads), scanner.flags) if heads else None
+
+        self._text = ''
+        self._emitted = 0
+        self.aborted = False
+        self.finished = False
+        self.has_disclaimer = False
+        self.violations: List[Match] = []
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def is_safe(self) -> bool:
+        """Valid only after finish(): no violation and a disclaimer was present"""
+        return self.finished and not self.aborted and self.has_disclaimer
+
+    def _scan_from(self, position: int):
+        line_start = self._text.rfind('\n', 0, position) + 1
+        start = max(line_start, len(self._text) - self.max_window)
+        window = self._text[start:].lower()
+        hits = self.scanner.by_category(
+            self.scanner.scan(window, (self.forbidden_category, self.disclaimer_category))
+        )
+        if hits.get(self.disclaimer_category):
+            self.has_disclaimer = True
+        if hits.get(self.forbidden_category):
+            self.aborted = True
+            self.violations.extend(hits[self.forbidden_category])
+
+    def _unresolved_from(self) -> int:
+        """Start of the earliest open gap rule on the current line, else the end of the text"""
+        if self._open_rules is None:
+            return len(self._text)
+        start = max(self._text.rfind('\n') + 1, len(self._text) - self.max_window)
+        found = self._open_rules.search(self._text[start:].lower())
+        return start + found.start() if found else len(self._text)
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; returns the text that is now safe to emit ('' once aborted)"""
+        if self.aborted or self.finished or not chunk:
+            return ''
+
+        previous_end = len(self._text)
+        self._text += chunk
+        self._scan_from(previous_end)
+        if self.aborted:
+            return ''
+
+        release_to = min(len(self._text) - self.holdback, self._unresolved_from())
+        if release_to <= self._emitted:
+            return ''
+        # Prefer not to split a word across releases
+        boundary = self._text.rfind(' ', self._emitted, release_to)
+        if boundary > self._emitted:
+            release_to = boundary + 1
+        released = self._text[self._emitted:release_to]
+        self._emitted = release_to
+        return released
+
+    def finish(self) -> str:
+        """End of stream: returns any withheld text that is safe to emit"""
+        if self.finished:
+            return ''
+        self.finished = True
+        if self.aborted:
+            return ''
+        released = self._text[self._emitted:]
+        self._emitted = len(self._text)
+        return released
+
+
+async def guarded_stream(validator: StreamingSafetyValidator, chunks):
+    """Pass an async iterator of chunks through `validator`.
+
+    Yields only validated text; on the first violation the upstream iterator
+    is closed (cancelling the provider call) and UnsafeStreamError is raised.
+    """
+    try:
+        async for chunk in chunks:
+            released = validator.feed(chunk)
+            if validator.aborted:
+                raise UnsafeStreamError(validator.violations)
+            if released:
+                yield released
+        tail = validator.finish()
+        if tail:
+            yield tail
+    finally:
+        close = getattr(chunks, 'aclose', None)
+        if close is not None:
+            await close()
@@ -0,0 +1,70 @@
+"""
+Request coalescing for identical concurrent async calls.
+
+The first caller for a key starts the work as a task; callers arriving while
+it is in flight await the same task instead of starting their own. A caller
+being cancelled never cancels the work for the others; only when every
+waiter has gone is the shared task cancelled. Exceptions reach every waiter.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class _Call(Generic[T]):
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Collapse concurrent calls with the same key onto one in-flight task"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: str, work: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run `work()` once per key among concurrent callers.
+
+        Returns (result, shared) where `shared` is True for callers that
+        joined a call started by someone else.
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            call = _Call(asyncio.ensure_future(work()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executions += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up: stop the upstream work and let the next caller start afresh
+                self._forget(key, call)
+                call.task.cancel()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._calls),
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+        }
@@ -0,0 +1,135 @@
+"""
+FTS5 full-text search over the symptoms knowledge base.
+
+`symptoms_fts` is an external-content FTS5 table over symptom, description,
+possible_causes and emergency_indicators, kept in sync with `symptoms` by
+triggers. Results are ranked by BM25 relevance weighted by the row's
+reliability_score.
+"""
+
+import logging
+import re
+import sqlite3
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+FTS_COLUMNS = ('symptom', 'description', 'possible_causes', 'emergency_indicators')
+
+# Per-column BM25 weights, in FTS_COLUMNS order
+BM25_WEIGHTS = (10.0, 4.0, 2.0, 2.0)
+
+RESULT_COLUMNS = (
+    'symptom', 'description', 'possible_causes', 'self_care_advice', 'when_to_see_doctor',
+    'emergency_indicators', 'severity_level', 'cultural_considerations', 'reliability_score'
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# bm25() is negative (more negative = more relevant), so negate it before weighting
+SEARCH_SQL = f'''
+    SELECT {', '.join('s.' + column for column in RESULT_COLUMNS)},
+           -bm25(symptoms_fts, {', '.join(str(weight) for weight in BM25_WEIGHTS)}) * s.reliability_score AS score
+    FROM symptoms_fts
+    JOIN symptoms s ON s.id = symptoms_fts.rowid
+    WHERE symptoms_fts MATCH ?
+    ORDER BY score DESC
+    LIMIT ?
+'''
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    """Check whether this SQLite build has the FTS5 extension"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_fts_schema(cursor: sqlite3.Cursor) -> bool:
+    """Create the FTS5 table and sync triggers; returns False if FTS5 is unavailable"""
+    if not fts5_available(cursor.connection):
+        logger.warning("SQLite FTS5 not available - full-text symptom search disabled")
+        return False
+
+    existed = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'symptoms_fts'"
+    ).fetchone() is not None
+
+    columns = ', '.join(FTS_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS symptoms_fts USING fts5(
+            {columns},
+            content='symptoms',
+            content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS symptoms_fts_insert AFTER INSERT ON symptoms BEGIN
+            INSERT INTO symptoms_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS symptoms_fts_delete AFTER DELETE ON symptoms BEGIN
+            INSERT INTO symptoms_fts (symptoms_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS symptoms_fts_update AFTER UPDATE ON symptoms BEGIN
+            INSERT INTO symptoms_fts (symptoms_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO symptoms_fts (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+    ''')
+
+    # Index rows that were already in the table before FTS existed
+    if not existed:
+        rebuild_fts(cursor)
+    return True
+
+
+def drop_fts_triggers(cursor: sqlite3.Cursor):
+    """Detach the sync triggers, e.g. before a bulk load followed by rebuild_fts"""
+    for event in ('insert', 'delete', 'update'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS symptoms_fts_{event}")
+
+
+def rebuild_fts(cursor: sqlite3.Cursor):
+    """Rebuild the full-text index from the symptoms table"""
+    cursor.execute("INSERT INTO symptoms_fts (symptoms_fts) VALUES ('rebuild')")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased, de-duplicated word tokens (underscores split words)"""
+    return list(dict.fromkeys(_TOKEN_RE.findall(text.replace('_', ' ').lower())))
+
+
+def build_match_query(tokens: List[str], operator: str = 'AND') -> str:
+    """Quote every token so user text can never inject FTS5 query syntax"""
+    return f' {operator} '.join(f'"{token}"' for token in tokens)
+
+
+def search(conn: sqlite3.Connection, text: str, limit: int = 5) -> List[Dict]:
+    """Top-k symptoms for free text, best first.
+
+    All tokens must match; if nothing does, any token may match.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return []
+
+    rows = conn.execute(SEARCH_SQL, (build_match_query(tokens, 'AND'), limit)).fetchall()
+    if not rows and len(tokens) > 1:
+        rows = conn.execute(SEARCH_SQL, (build_match_query(tokens, 'OR'), limit)).fetchall()
+
+    results = []
+    for row in rows:
+        result = dict(zip(RESULT_COLUMNS, row))
+        result['search_score'] = row[-1]
+        results.append(result)
+    return results
@@ -0,0 +1,181 @@
+"""
+Translation memory for repeated texts.
+
+Translations are stored in the `translation_memory` table keyed by
+(SHA-256 of the source text, source language, target language), with an
+in-process LRU in front so repeated lookups do not touch SQLite at all.
+Canned responses can be pre-warmed at startup, so most non-English replies
+are served without a network round trip to the translation provider.
+
+Without a connection pool the memory is process-local only.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CREATE_TRANSLATION_MEMORY_SQL = '''
+    CREATE TABLE IF NOT EXISTS translation_memory (
+        text_hash TEXT NOT NULL,
+        source_language TEXT NOT NULL,
+        target_language TEXT NOT NULL,
+        translation TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (text_hash, source_language, target_language)
+    )
+'''
+
+_SELECT_SQL = '''
+    SELECT translation FROM translation_memory
+    WHERE text_hash = ? AND source_language = ? AND target_language = ?
+'''
+
+_UPSERT_SQL = '''
+    INSERT INTO translation_memory (text_hash, source_language, target_language, translation)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(text_hash, source_language, target_language) DO UPDATE SET
+        translation = excluded.translation,
+        created_at = CURRENT_TIMESTAMP
+'''
+
+MemoryKey = Tuple[str, str, str]
+Translate = Callable[[str, str, str], Awaitable[Optional[str]]]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TranslationMemory:
+    """SQLite-backed translation store with an in-process LRU"""
+
+    def __init__(self, pool=None, max_entries: int = 5000):
+        self.pool = pool
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[MemoryKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def _key(text: str, source: str, target: str) -> MemoryKey:
+        return text_hash(text), source.lower(), target.lower()
+
+    def _remember(self, key: MemoryKey, translation: str):
+        # Caller holds self._lock
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _get_memory(self, key: MemoryKey) -> Optional[str]:
+        with self._lock:
+            translation = self._lru.get(key)
+            if translation is not None:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+            return translation
+
+    def _get_disk(self, key: MemoryKey) -> Optional[str]:
+        row = None
+        if self.pool is not None:
+            try:
+                with self.pool.reader() as conn:
+                    row = conn.execute(_SELECT_SQL, key).fetchone()
+            except Exception as e:
+                logger.warning(f"Translation memory lookup failed: {e}")
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[0])
+            self.disk_hits += 1
+        return row[0]
+
+    def get(self, text: str, source: str, target: str) -> Optional[str]:
+        """Stored translation, or None"""
+        key = self._key(text, source, target)
+        translation = self._get_memory(key)
+        return translation if translation is not None else self._get_disk(key)
+
+    async def lookup(self, text: str, source: str, target: str) -> Optional[str]:
+        """get() that only leaves the event loop when SQLite has to be read"""
+        key = self._key(text, source, target)
+        translation = self._get_memory(key)
+        if translation is not None:
+            return translation
+        if self.pool is None:
+            return self._get_disk(key)  # no I/O, just records the miss
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def put(self, text: str, source: str, target: str, translation: str):
+        key = self._key(text, source, target)
+        with self._lock:
+            self._remember(key, translation)
+            self.stores += 1
+
+        if self.pool is not None:
+            try:
+                with self.pool.writer() as conn:
+                    conn.execute(_UPSERT_SQL, key + (translation,))
+            except Exception as e:
+                logger.warning(f"Translation memory write failed: {e}")
+
+    async def translate(self, text: str, source: str, target: str, translate: Translate) -> Optional[str]:
+        """Translation from memory, else from `translate(text, source, target)` and remembered.
+
+        A None result from `translate` means it failed and is not stored.
+        """
+        if source.lower() == target.lower() or not text:
+            return text
+
+        translation = await self.lookup(text, source, target)
+        if translation is not None:
+            return translation
+
+        translation = await translate(text, source, target)
+        if translation is not None:
+            await asyncio.to_thread(self.put, text, source, target, translation)
+        return translation
+
+    async def prewarm(self, texts: Iterable[str], source: str, targets: Iterable[str],
+                      translate: Translate, concurrency: int = 4) -> int:
+        """Translate every text not yet in memory; returns how many were added"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def warm(text: str, target: str) -> bool:
+            async with semaphore:
+                if await self.lookup(text, source, target) is not None:
+                    return False
+                translation = await translate(text, source, target)
+                if translation is None:
+                    return False
+                await asyncio.to_thread(self.put, text, source, target, translation)
+                return True
+
+        targets = list(targets)
+        results = await asyncio.gather(*(warm(text, target) for text in dict.fromkeys(texts) if text for target in targets))
+        return sum(results)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'entries_in_memory': len(self._lru),
+                'max_entries': self.max_entries,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'stores': self.stores,
+                'persistent': self.pool is not None,
+            }
@@ -1,26 +1,73 @@
-from openai import OpenAI
-from translate import Translator
+import asyncio
+import httpx
+import json
 import logging
+import re
+from collections import OrderedDict
 from pathlib import Path
+from textwrap import wrap
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 import os
 
+from services.lazy_loader import LazyResource
+from services.prompt_registry import PromptRegistry
+from services.refine_batcher import RefineBatcher
+from services.translation_memory import TranslationMemory
+
 # Load environment variables
 load_dotenv()
 # Get API key from .env
 api_key = os.getenv("OPENROUTER_API_KEY")
 base_url = os.getenv("OPENROUTER_BASE_URL")
 text_refining_model = os.getenv("TEXT_REFINING_MODEL")
+# Re-read prompt files when they change on disk (development only)
+dev_mode = os.getenv("DEV_MODE", "false").lower() in ('1', 'true', 'yes')
+
+# Opt-in micro-batching of refinement calls. A batch packs texts from
+# different users into one prompt, so text written to manipulate the model in
+# one item can change the refined output of another; replies that do not
+# return exactly one result per input id are discarded. Leave this off unless
+# the throughput gain is worth that isolation trade-off.
+refine_batching_enabled = os.getenv("REFINE_BATCHING_ENABLED", "false").lower() in ('1', 'true', 'yes')
+refine_batch_max_size = int(os.getenv("REFINE_BATCH_MAX_SIZE", "8"))
+refine_batch_max_wait = float(os.getenv("REFINE_BATCH_MAX_WAIT_MS", "20")) / 1000
+refine_batch_max_chars = int(os.getenv("REFINE_BATCH_MAX_CHARS", "400"))
+
+# Upper bound on concurrent requests to each upstream
+refine_max_concurrency = int(os.getenv("REFINE_MAX_CONCURRENCY", "16"))
+translate_max_concurrency = int(os.getenv("TRANSLATE_MAX_CONCURRENCY", "8"))
+refine_timeout = float(os.getenv("REFINE_TIMEOUT", "20"))
+translate_timeout = float(os.getenv("TRANSLATE_TIMEOUT", "10"))
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# OpenAI (OpenRouter) client
-client = OpenAI(
-    base_url=base_url,
-    api_key=api_key
+# Without a key refinement is skipped
+if not api_key:
+    logging.warning("OPENROUTER_API_KEY is not set; medical text refinement is disabled")
+
+# MyMemory translation API (the `translate` package's default provider)
+MYMEMORY_URL = "https://api.mymemory.translated.net/get"
+MYMEMORY_MAX_LENGTH = 1000
+translate_http = httpx.AsyncClient(
+    timeout=translate_timeout,
+    limits=httpx.Limits(max_connections=translate_max_concurrency, max_keepalive_connections=translate_max_concurrency)
 )
 
+refine_slots = asyncio.Semaphore(refine_max_concurrency)
+translate_slots = asyncio.Semaphore(translate_max_concurrency)
+
+SYSTEM_PROMPT = "You are a clinical language specialist. You rewrite informal health descriptions into formal clinical language only."
+
+REFINEMENT_PROMPT = "text_input_refinement.txt"
+BATCH_REFINEMENT_PROMPT = "text_input_refinement_batch.txt"
+TRANSLATOR_POOL_SIZE = 64
+
+_batcher: Optional[RefineBatcher] = None
+# Set by the app at startup to reuse translations across requests
+translation_memory: Optional[TranslationMemory] = None
+
 def load_prompt_template(file_path: str) -> str:
     try:
         return Path(file_path).read_text()
@@ -28,35 +75,197 @@ def load_prompt_template(file_path: str) -> str:
         logging.error(f"Failed to load prompt template: {e}")
         return ""
 
-def refine_medical_text(raw_text: str) -> str:
-    template_path = "prompts/text_input_refinement.txt"
-    template = load_prompt_template(template_path)
+prompts = PromptRegistry(Path(__file__).resolve().parent.parent / "prompts", reload=dev_mode,
+                         loader=load_prompt_template)
+prompts.preload(REFINEMENT_PROMPT, BATCH_REFINEMENT_PROMPT)
 
-    prompt = template.replace("{input}", raw_text)
+def _create_client():
+    if not api_key:
+        return None
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(
+        base_url=base_url,
+        api_key=api_key,
+        timeout=refine_timeout
+    )
 
-    try:
-        response = client.chat.completions.create(
+# OpenAI (OpenRouter) client; the SDK is only imported when refinement is first used
+client = LazyResource('openrouter_client', _create_client)
+
+async def _complete(prompt: str, **kwargs) -> str:
+    refine_client = await client.aget()
+    if refine_client is None:
+        raise RuntimeError("refinement client is not configured")
+    async with refine_slots:
+        response = await refine_client.chat.completions.create(
             model=text_refining_model,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are a clinical language specialist. You rewrite informal health descriptions into formal clinical language only."
+                    "content": SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
                     "content": prompt
                 }
-            ]
+            ],
+            **kwargs
         )
-        return response.choices[0].message.content.strip()
+    return response.choices[0].message.content.strip()
+
+async def _refine_one(raw_text: str) -> str:
+    prompt = prompts.render(REFINEMENT_PROMPT, input=raw_text)
+
+    try:
+        return await _complete(prompt)
     except Exception as e:
         logging.error(f"[OpenAI API Error] {e}")
         return raw_text
 
-def simple_translate(text: str, source: str, target: str) -> str:
+def _parse_batch_results(content: str, count: int) -> Dict[int, str]:
+    """Map of input id -> refined text from a batch completion.
+
+    Raises ValueError unless the reply has exactly one non-empty result for
+    each input id: a reply with missing, extra or duplicate entries is not
+    trusted for any item.
+    """
+    # Models sometimes wrap JSON in a markdown fence
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", content, re.DOTALL)
+    if fenced:
+        content = fenced.group(1)
+
+    payload = json.loads(content)
+    entries = payload.get("results") if isinstance(payload, dict) else payload
+    if not isinstance(entries, list):
+        raise ValueError("batch result has no results list")
+
+    if len(entries) != count:
+        raise ValueError(f"batch result has {len(entries)} entries for {count} inputs")
+
+    results: Dict[int, str] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError("batch result entry is not an object")
+        item_id, text = entry.get("id"), entry.get("text")
+        if not (isinstance(item_id, int) and 0 <= item_id < count) or item_id in results:
+            raise ValueError(f"batch result has an unexpected id: {item_id!r}")
+        if not (isinstance(text, str) and text.strip()):
+            raise ValueError(f"batch result {item_id} has no text")
+        results[item_id] = text.strip()
+    return results
+
+async def refine_medical_texts(raw_texts: List[str]) -> List[str]:
+    """Refine several texts with one structured completion.
+
+    If the reply cannot be parsed or its ids and count do not match the
+    inputs, every text is refined with an individual call instead.
+    """
+    if len(raw_texts) == 1:
+        return [await _refine_one(raw_texts[0])]
+
+    inputs = json.dumps([{"id": index, "text": text} for index, text in enumerate(raw_texts)], ensure_ascii=False)
+    prompt = prompts.render(BATCH_REFINEMENT_PROMPT, inputs=inputs)
+
+    results: Dict[int, str] = {}
     try:
-        translator = Translator(from_lang=source, to_lang=target)
-        return translator.translate(text)
+        results = _parse_batch_results(await _complete(prompt, response_format={"type": "json_object"}), len(raw_texts))
+    except Exception as e:
+        logging.error(f"[Batch refinement error] {e}; refining {len(raw_texts)} texts individually")
+
+    missing = [index for index in range(len(raw_texts)) if index not in results]
+    refined = await asyncio.gather(*(_refine_one(raw_texts[index]) for index in missing))
+    results.update(zip(missing, refined))
+    return [results[index] for index in range(len(raw_texts))]
+
+def _get_batcher() -> RefineBatcher:
+    global _batcher
+    # The batcher's timers belong to the loop that created it
+    if _batcher is None or _batcher.loop is not asyncio.get_running_loop():
+        _batcher = RefineBatcher(
+            refine_medical_texts,
+            max_batch_size=refine_batch_max_size,
+            max_wait=refine_batch_max_wait
+        )
+    return _batcher
+
+def refine_batching_stats() -> Optional[Dict]:
+    return _batcher.stats() if _batcher is not None else None
+
+async def refine_medical_text(raw_text: str) -> str:
+    # Only short texts are worth packing together; long ones go straight through
+    if not refine_batching_enabled or len(raw_text) > refine_batch_max_chars:
+        return await _refine_one(raw_text)
+
+    try:
+        return await _get_batcher().submit(raw_text)
+    except Exception as e:
+        logging.error(f"[Batch refinement error] {e}")
+        return raw_text
+
+class AsyncTranslator:
+    """MyMemory client for one language pair over the shared HTTP client"""
+
+    def __init__(self, from_lang: str, to_lang: str):
+        self.from_lang = from_lang
+        self.to_lang = to_lang
+        self.params = {'langpair': f"{from_lang}|{to_lang}"}
+
+    async def _translate_chunk(self, text: str) -> str:
+        async with translate_slots:
+            response = await translate_http.get(MYMEMORY_URL, params={**self.params, 'q': text})
+        response.raise_for_status()
+        data = response.json()
+
+        # Quota and language-pair errors come back as HTTP 200, with the
+        # error message in place of the translation
+        status = data.get('responseStatus')
+        if str(status) != '200':
+            raise RuntimeError(f"MyMemory error {status}: {data.get('responseDetails') or data['responseData']['translatedText']}")
+
+        translation = data['responseData']['translatedText']
+        if translation:
+            return translation
+        matches = data.get('matches')
+        if not matches:
+            raise RuntimeError("MyMemory returned no translation")
+        return matches[0]['translation']
+
+    async def translate(self, text: str) -> str:
+        if self.from_lang == self.to_lang:
+            return text
+        chunks = wrap(text, MYMEMORY_MAX_LENGTH, replace_whitespace=False)
+        return ' '.join(await asyncio.gather(*(self._translate_chunk(chunk) for chunk in chunks)))
+
+_translators: "OrderedDict[tuple, AsyncTranslator]" = OrderedDict()
+
+def get_translator(source: str, target: str) -> AsyncTranslator:
+    """Shared translator for a language pair, built on first use"""
+    key = (source, target)
+    translator = _translators.get(key)
+    if translator is None:
+        translator = _translators[key] = AsyncTranslator(source, target)
+        if len(_translators) > TRANSLATOR_POOL_SIZE:
+            _translators.popitem(last=False)
+    else:
+        _translators.move_to_end(key)
+    return translator
+
+async def _provider_translate(text: str, source: str, target: str) -> str:
+    return await get_translator(source, target).translate(text)
+
+async def simple_translate(text: str, source: str, target: str) -> str:
+    try:
+        if translation_memory is not None:
+            return await translation_memory.translate(text, source, target, _provider_translate)
+        return await _provider_translate(text, source, target)
     except Exception as e:
         logging.error(f"[Translation Error] {e}")
         return f"[Translation Error] {e}"
+
+async def close():
+    """Release upstream connections at shutdown"""
+    if _batcher is not None:
+        await _batcher.close()
+    await translate_http.aclose()
+    if client.loaded and client.get() is not None:
+        await client.get().close()
@@ -0,0 +1,51 @@
+import pytest
+
+from services.message_analyzer import MessageAnalyzer, load_lexicon, normalize
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return MessageAnalyzer(load_lexicon())
+
+
+def test_normalize_folds_accents_and_arabic_letter_variants():
+    assert normalize("Fièvre SUPÉRIEURE") == "fievre superieure"
+    assert normalize("أَلَمٌ") == normalize("ألم") == "الم"
+    assert normalize("مریض ہے") == "مريض هے"
+
+
+@pytest.mark.parametrize('message, symptoms, intent, route', [
+    ("I have a headache and back pain", ['headache', 'pain', 'back pain'], 'symptom_check', 'symptom'),
+    ("Can I book an appointment?", [], 'appointment', 'appointment'),
+    # Arabic: "pain" is only a whole word, never the article ال plus a word starting with م
+    ("أريد حجز موعد في المستشفى", [], 'appointment', 'appointment'),
+    ("أين أجد الماء", [], 'general_health', 'general'),
+    ("المسلم", [], 'general_health', 'general'),
+    ("عندي ألم في رأسي", ['pain'], 'symptom_check', 'symptom'),
+    ("الألم في ظهري لا يتوقف", ['pain'], 'symptom_check', 'symptom'),
+    ("عندي صداع وحمى", ['headache', 'fever'], 'general_health', 'general'),
+    ("أحتاج دواء للسعال", ['cough'], 'medication', 'medication'),
+    # Urdu
+    ("مجھے سر درد اور بخار ہے", ['headache', 'fever', 'pain'], 'symptom_check', 'symptom'),
+    ("مجھے چکر آ رہے ہیں", ['dizzy'], 'general_health', 'general'),
+    ("ڈاکٹر سے ملنا ہے", [], 'general_health', 'appointment'),
+    ("مجھے دوائی چاہیے", [], 'medication', 'medication'),
+])
+def test_analysis(analyzer, message, symptoms, intent, route):
+    analysis = analyzer.analyze(message)
+    assert (analysis.symptoms, analysis.intent, analysis.route) == (symptoms, intent, route)
+
+
+@pytest.mark.parametrize('message', [
+    "I think I am having a heart attack",
+    "ألم في الصدر",
+    "سینے میں درد ہو رہا ہے",
+    "J'ai une douleur thoracique",
+])
+def test_emergency_in_every_language(analyzer, message):
+    assert analyzer.analyze(message).emergency
+
+
+def test_analyze_many_matches_analyze(analyzer):
+    messages = ["أريد حجز موعد في المستشفى", "chest pain", "عندي ألم", "مجھے بخار ہے"]
+    assert analyzer.analyze_many(messages) == [analyzer.analyze(message) for message in messages]
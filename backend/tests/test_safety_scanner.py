@@ -0,0 +1,68 @@
+import re
+
+from services.safety_scanner import SafetyScanner, StreamingSafetyValidator, head_before_gap, literal_prefix
+
+
+def test_literal_prefix_stops_at_regex_syntax():
+    assert literal_prefix('severe .* pain') == 'severe '
+    assert literal_prefix(r"can\'?t (breathe|see)") == 'can'
+    assert literal_prefix(r'\bpain') == ''
+
+
+def test_literal_prefix_of_top_level_alternation_is_empty():
+    assert literal_prefix('overdose|poisoned') == ''
+    assert literal_prefix('(overdose|poisoned) again') == ''
+    assert literal_prefix('took (an overdose|poison)') == 'took '
+    assert literal_prefix('over[|]dose') == 'over'
+
+
+def test_alternation_pattern_matches_every_branch():
+    pattern = 'overdose|poisoned'
+    scanner = SafetyScanner({}, {'x': [pattern]})
+    for text in ('i took an overdose', 'i was poisoned'):
+        assert re.search(pattern, text)
+        assert [hit.rule for hit in scanner.scan(text)] == [pattern]
+
+
+def _stream(validator, chunks):
+    released = []
+    for chunk in chunks:
+        released.append(validator.feed(chunk))
+        if validator.aborted:
+            break
+    else:
+        released.append(validator.finish())
+    return ''.join(released)
+
+
+FORBIDDEN = [r'ignore .* (chest pain|bleeding|symptoms)', r"don'?t (see|visit|call) .* doctor"]
+
+
+def test_head_before_gap():
+    assert head_before_gap(FORBIDDEN[0]) == 'ignore '
+    assert head_before_gap(FORBIDDEN[1]) == "don'?t (see|visit|call) "
+    assert head_before_gap('this is (definitely|certainly) (not|nothing)') is None
+    assert head_before_gap('a(b.*c)d') == 'a'
+
+
+def test_stream_withholds_long_gap_match_until_it_resolves():
+    scanner = SafetyScanner({'disclaimer': ['consult']}, {'forbidden_advice': FORBIDDEN})
+    text = ("Honestly you can ignore the mild twinges and occasional discomfort you have been "
+            "noticing lately, along with the chest pain.")
+    validator = StreamingSafetyValidator(scanner)
+    released = _stream(validator, [text[index:index + 8] for index in range(0, len(text), 8)])
+    assert validator.aborted
+    assert 'ignore' not in released
+    assert released == 'Honestly you can '
+
+
+def test_stream_releases_gap_head_once_the_line_ends():
+    scanner = SafetyScanner({'disclaimer': ['consult']}, {'forbidden_advice': FORBIDDEN})
+    text = "You should not ignore a fever that lasts for days.\n" + "Please consult a doctor. " * 6
+    validator = StreamingSafetyValidator(scanner)
+    released = ''
+    for index in range(0, len(text), 8):
+        released += validator.feed(text[index:index + 8])
+    assert released.startswith("You should not ignore a fever that lasts for days.\n")
+    released += validator.finish()
+    assert released == text and validator.is_safe
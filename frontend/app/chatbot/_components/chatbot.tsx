@@ -25,8 +25,23 @@ export default function HomePage() {
     setInput("");
     setLoading(true);
 
+    // The bot reply is appended on the first text frame and then updated in place
+    let botText = "";
+    let botStarted = false;
+    const showBotText = (text: string) => {
+      const first = !botStarted;
+      botStarted = true;
+      botText = text;
+      setLoading(false);
+      setMessages((prev) =>
+        first
+          ? [...prev, { sender: "bot", text }]
+          : [...prev.slice(0, -1), { sender: "bot", text }]
+      );
+    };
+
     try {
-      const response = await fetch("http://localhost:8000/api/v1/health-chat", {
+      const response = await fetch("http://localhost:8000/api/v1/health-chat/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
@@ -37,12 +52,45 @@ export default function HomePage() {
         }),
       });
 
-      const data = await response.json();
+      if (!response.ok || !response.body) {
+        throw new Error(`Chat request failed: ${response.status}`);
+      }
 
-      setMessages((prev) => [
-        ...prev,
-        { sender: "bot", text: data.response || "⚠️ No response received" },
-      ]);
+      // Server-Sent Events: frames are separated by a blank line
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+          const frame = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+
+          let event = "message";
+          let data = "";
+          for (const line of frame.split("\n")) {
+            if (line.startsWith("event: ")) event = line.slice(7);
+            else if (line.startsWith("data: ")) data += line.slice(6);
+          }
+          if (!data) continue;
+          const payload = JSON.parse(data);
+
+          if (event === "token") {
+            showBotText(botText + payload.text);
+          } else if (event === "message" || event === "error") {
+            showBotText(payload.text);
+          }
+        }
+      }
+
+      if (!botStarted) {
+        showBotText("⚠️ No response received");
+      }
     } catch (error) {
       console.error("Chat error:", error);
       setMessages((prev) => [